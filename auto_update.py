@@ -2,98 +2,184 @@
 """
 Insurio Website Auto-Update Script
 Automatically applies all copy changes to HTML files
+
+Every edit is declared as a Rule in RULES below. Rules are grouped by the
+file they target, so each file is read once, has every rule applied to the
+in-memory text in a single pass, and written at most once; all changed files
+are committed together as one crash-safe batch (see batch_writer.py). Files that are
+unchanged since their rules were last applied are skipped (see manifest.py).
+With --watch the rules and manifest stay loaded and saved pages are updated
+as they change (see watch.py).
 """
 
 import os
 import sys
 import re
+import time
+import argparse
+from fnmatch import fnmatch
 from pathlib import Path
 
-class InsurioUpdater:
-    def __init__(self, repo_path):
-        self.repo_path = Path(repo_path)
-        self.changes_made = []
-        self.errors = []
-        
-    def log_change(self, file, description):
-        self.changes_made.append(f"✓ {file}: {description}")
-        
-    def log_error(self, file, description):
-        self.errors.append(f"✗ {file}: {description}")
-    
-    def read_file(self, filepath):
-        """Read file content"""
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            self.log_error(filepath, f"Failed to read: {e}")
-            return None
-    
-    def write_file(self, filepath, content):
-        """Write file content"""
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        except Exception as e:
-            self.log_error(filepath, f"Failed to write: {e}")
-            return False
-    
-    def update_footer_logo(self, filepath):
-        """Update footer logo to use logo-white.webp"""
-        content = self.read_file(filepath)
-        if content is None:
-            return False
-        
-        original = content
-        
-        # Replace both possible logo paths
-        content = re.sub(
-            r'<img src="\.\.\/images\/logo\.webp" alt="Insurio">',
-            '<img src="/images/logo-white.webp" alt="Insurio" style="height:44px;width:auto">',
-            content
-        )
-        content = re.sub(
-            r'<img src="images\/logo\.webp" alt="Insurio">',
-            '<img src="/images/logo-white.webp" alt="Insurio" style="height:44px;width:auto">',
-            content
-        )
-        
-        # Remove the filter style if it exists (it's in CSS, not inline)
-        # This is just a safety check
-        
-        if content != original:
-            if self.write_file(filepath, content):
-                self.log_change(filepath, "Updated footer logo")
-                return True
-        else:
-            self.log_error(filepath, "Footer logo pattern not found")
-            return False
-    
-    def update_homepage(self):
-        """Update homepage (index.html)"""
-        filepath = self.repo_path / "index.html"
-        content = self.read_file(filepath)
-        if content is None:
-            return False
-        
-        changes = 0
-        
-        # Update 1: Hero description
-        old_hero = r'<p class="hero-description">Not the bank\. Get coverage that\'s portable, stays level, and pays your family directly—not the lender\'s balance sheet\. Exposed the truth about bank mortgage insurance\.</p>'
-        new_hero = '<p class="hero-description">For Canadian homeowners with a mortgage, backed by Canada\'s leading insurers. Get coverage that\'s portable, stays level, and pays your family directly—not the lender\'s balance sheet.</p>'
-        
-        if re.search(old_hero, content):
-            content = re.sub(old_hero, new_hero, content)
-            changes += 1
-        
-        # Update 2: Add timing section after Trust Bar
-        # Find the closing of trust-bar section followed by stats section
-        trust_bar_pattern = r'(</section>\s*\n\s*<!-- Stats -->)'
-        timing_section = '''</section>
-
-        <!-- Why This Matters Now -->
+from batch_writer import BatchWriteError, BatchWriter
+from html_index import HtmlIndex, apply_splices, splice
+from manifest import Manifest, content_hash, file_state, ruleset_version
+from parallel import map_files, resolve_jobs
+from run_report import RunReport, new_file_stats, rule_stats
+from update_nav import SKIP_DIRS, find_html_files
+from watch import Watcher
+
+
+class Rule:
+    """
+    A single copy edit.
+
+    files       -- fnmatch patterns, relative to the repo root, of the pages
+                   this rule applies to
+    pattern     -- regex, compiled once when the rule is declared
+    replacement -- replacement passed to re.sub (backreferences allowed)
+    unless      -- idempotency guard: skip the rule if this text is already
+                   present in the page
+    count       -- maximum substitutions (0 = all)
+    """
+
+    def __init__(self, name, files, pattern, replacement, unless=None, count=0, flags=0):
+        self.name = name
+        self.files = tuple(files)
+        self.pattern = re.compile(pattern, flags)
+        self.replacement = replacement
+        self.unless = unless
+        self.count = count
+
+    def matches(self, rel_path):
+        return any(fnmatch(rel_path, pattern) for pattern in self.files)
+
+    def apply(self, content, stats=None):
+        """
+        Apply the rule to content. Returns (content, number_of_substitutions).
+        If stats (a run_report file stats dict) is given, the search and the
+        substitution are timed separately and recorded against the rule.
+        """
+        if stats is None:
+            if self.unless and self.unless in content:
+                return content, 0
+            return self.pattern.subn(self.replacement, content, count=self.count)
+
+        profile = rule_stats(stats, self.name)
+        profile['attempts'] += 1
+        if self.unless and self.unless in content:
+            profile['guarded'] += 1
+            return content, 0
+
+        start = time.perf_counter()
+        found = self.pattern.search(content)
+        searched = time.perf_counter()
+        profile['search_s'] += searched - start
+        if found is None:
+            return content, 0
+
+        content, count = self.pattern.subn(self.replacement, content, count=self.count)
+        profile['substitute_s'] += time.perf_counter() - searched
+        profile['hits'] += 1
+        profile['substitutions'] += count
+        return content, count
+
+    def signature(self):
+        """Everything that affects the rule's output, for manifest versioning."""
+        return (self.name, self.pattern.pattern, self.pattern.flags,
+                self.replacement, self.unless, self.count)
+
+    def __repr__(self):
+        return f"Rule({self.name!r})"
+
+
+class SelectorRule:
+    """
+    A structural edit that targets elements by selector (see html_index.py)
+    instead of a regex, so it does not depend on the whitespace between tags.
+
+    selector -- e.g. 'section.trust-bar', '<!-- Stats -->', 'div.container:has(table)'
+    action   -- 'replace', 'inner', 'before', 'after', 'prepend' or 'append'
+    html     -- markup to splice in
+    unless / count -- as for Rule
+    """
+
+    def __init__(self, name, files, selector, action, html, unless=None, count=0):
+        self.name = name
+        self.files = tuple(files)
+        self.selector = selector
+        self.action = action
+        self.html = html
+        self.unless = unless
+        self.count = count
+
+    def matches(self, rel_path):
+        return any(fnmatch(rel_path, pattern) for pattern in self.files)
+
+    def splices(self, index, stats=None):
+        """Offset splices for this rule against a page's HtmlIndex (profiled into stats if given)."""
+        profile = rule_stats(stats, self.name) if stats is not None else None
+        if profile:
+            profile['attempts'] += 1
+        if self.unless and self.unless in index.text:
+            if profile:
+                profile['guarded'] += 1
+            return []
+
+        start = time.perf_counter()
+        nodes = index.select(self.selector)
+        if self.count:
+            nodes = nodes[:self.count]
+        searched = time.perf_counter()
+        result = [splice(node, self.action, self.html) for node in nodes]
+
+        if profile:
+            profile['search_s'] += searched - start
+            profile['substitute_s'] += time.perf_counter() - searched
+            profile['hits'] += 1 if result else 0
+            profile['substitutions'] += len(result)
+        return result
+
+    def signature(self):
+        return (self.name, self.selector, self.action, self.html, self.unless, self.count)
+
+    def __repr__(self):
+        return f"SelectorRule({self.name!r})"
+
+
+FOOTER_FILES = (
+    "index.html",
+    "404.html",
+    "for-clients/index.html",
+    "compare/index.html",
+    "partners/index.html",
+    "contact/index.html",
+    "privacy/index.html",
+    "terms/index.html",
+)
+
+
+RULES = [
+    # Footer logo (all pages)
+    Rule(
+        "Updated footer logo",
+        FOOTER_FILES,
+        r'<img src="(?:\.\./)?images/logo\.webp" alt="Insurio">',
+        '<img src="/images/logo-white.webp" alt="Insurio" style="height:44px;width:auto">',
+    ),
+
+    # Homepage (index.html)
+    Rule(
+        "Updated hero description",
+        ["index.html"],
+        r'<p class="hero-description">Not the bank\. Get coverage that\'s portable, stays level, and pays your family directly—not the lender\'s balance sheet\. Exposed the truth about bank mortgage insurance\.</p>',
+        '<p class="hero-description">For Canadian homeowners with a mortgage, backed by Canada\'s leading insurers. Get coverage that\'s portable, stays level, and pays your family directly—not the lender\'s balance sheet.</p>',
+    ),
+    SelectorRule(
+        "Added timing section after trust bar",
+        ["index.html"],
+        '<!-- Stats -->',
+        'before',
+        '''<!-- Why This Matters Now -->
         <section style="padding:60px 0;background:var(--slate-50)">
             <div class="container">
                 <div style="max-width:800px;margin:0 auto;text-align:center">
@@ -102,106 +188,43 @@ class InsurioUpdater:
             </div>
         </section>
 
-        <!-- Stats -->'''
-        
-        if re.search(trust_bar_pattern, content) and 'Why This Matters Now' not in content:
-            content = re.sub(trust_bar_pattern, timing_section, content)
-            changes += 1
-        
-        if changes > 0:
-            if self.write_file(filepath, content):
-                self.log_change("index.html", f"Made {changes} content updates")
-                return True
-        else:
-            self.log_error("index.html", "Could not find patterns to update")
-            return False
-    
-    def update_for_clients(self):
-        """Update for-clients/index.html"""
-        filepath = self.repo_path / "for-clients" / "index.html"
-        if not filepath.exists():
-            self.log_error(str(filepath), "File not found")
-            return False
-            
-        content = self.read_file(filepath)
-        if content is None:
-            return False
-        
-        changes = 0
-        
-        # Update 1: Add coverage guidance
-        coverage_pattern = r'(Most clients combine these coverages based on their mortgage amount, income, and family situation\.</p>\s*</div>\s*\n\s*<div class="problem-grid">)'
-        coverage_addition = r'Most clients combine these coverages based on their mortgage amount, income, and family situation.</p>\n                </div>\n\n                <p style="font-size:17px;color:var(--slate-600);line-height:1.7;margin-bottom:32px;text-align:center">Most clients start with life insurance as the foundation and add disability or critical illness coverage based on their income, family situation, and existing coverage.</p>\n\n                <div class="problem-grid">'
-        
-        if re.search(coverage_pattern, content):
-            content = re.sub(coverage_pattern, coverage_addition, content)
-            changes += 1
-        
-        # Update 2: Update process description
-        old_process = r'<p>We make it easy to understand your options and decide on your terms\.</p>'
-        new_process = '<p>We make it easy to understand your options and decide on your terms. Quotes are personalized based on your age, health, and coverage amount—final pricing is confirmed after underwriting.</p>'
-        
-        if re.search(old_process, content):
-            content = re.sub(old_process, new_process, content)
-            changes += 1
-        
-        if changes > 0:
-            if self.write_file(filepath, content):
-                self.log_change("for-clients/index.html", f"Made {changes} content updates")
-                return True
-        else:
-            self.log_error("for-clients/index.html", "Could not find patterns to update")
-            return False
-    
-    def update_compare(self):
-        """Update compare/index.html"""
-        filepath = self.repo_path / "compare" / "index.html"
-        if not filepath.exists():
-            self.log_error(str(filepath), "File not found")
-            return False
-            
-        content = self.read_file(filepath)
-        if content is None:
-            return False
-        
-        # Add disclaimer after comparison table
-        table_end_pattern = r'(</table>\s*</div>\s*</div>\s*</div>\s*</section>\s*\n\s*<!-- Warning Section -->)'
-        disclaimer = '''</table>
-                </div>
-                
-                <p style="text-align:center;font-size:14px;color:var(--slate-500);margin-top:32px;max-width:800px;margin-left:auto;margin-right:auto">This comparison reflects typical bank creditor insurance structures. Specific terms and conditions vary by lender. Individual mortgage protection policies are underwritten by Canada's leading life insurers and subject to individual underwriting approval.</p>
-            </div>
-        </section>
+        ''',
+        unless='Why This Matters Now',
+    ),
 
-        <!-- Warning Section -->'''
-        
-        if re.search(table_end_pattern, content) and 'typical bank creditor insurance structures' not in content:
-            content = re.sub(table_end_pattern, disclaimer, content, count=1)
-            if self.write_file(filepath, content):
-                self.log_change("compare/index.html", "Added disclaimer after comparison table")
-                return True
-        else:
-            self.log_error("compare/index.html", "Could not find pattern or already updated")
-            return False
-    
-    def update_partners(self):
-        """Update partners/index.html"""
-        filepath = self.repo_path / "partners" / "index.html"
-        if not filepath.exists():
-            self.log_error(str(filepath), "File not found")
-            return False
-            
-        content = self.read_file(filepath)
-        if content is None:
-            return False
-        
-        changes = 0
-        
-        # Update 1: Add de-risk section after hero
-        hero_end_pattern = r'(</section>\s*\n\s*<section class="trust-bar">)'
-        derisk_section = '''</section>
-
-        <!-- De-Risk Message -->
+    # For Clients (for-clients/index.html)
+    Rule(
+        "Added coverage guidance",
+        ["for-clients/index.html"],
+        r'(Most clients combine these coverages based on their mortgage amount, income, and family situation\.</p>\s*</div>\s*\n\s*<div class="problem-grid">)',
+        r'Most clients combine these coverages based on their mortgage amount, income, and family situation.</p>\n                </div>\n\n                <p style="font-size:17px;color:var(--slate-600);line-height:1.7;margin-bottom:32px;text-align:center">Most clients start with life insurance as the foundation and add disability or critical illness coverage based on their income, family situation, and existing coverage.</p>\n\n                <div class="problem-grid">',
+    ),
+    Rule(
+        "Updated process description",
+        ["for-clients/index.html"],
+        r'<p>We make it easy to understand your options and decide on your terms\.</p>',
+        '<p>We make it easy to understand your options and decide on your terms. Quotes are personalized based on your age, health, and coverage amount—final pricing is confirmed after underwriting.</p>',
+    ),
+
+    # Compare (compare/index.html)
+    SelectorRule(
+        "Added disclaimer after comparison table",
+        ["compare/index.html"],
+        'div.container:has(table.comparison-table)',
+        'append',
+        '''    <p style="text-align:center;font-size:14px;color:var(--slate-500);margin-top:32px;max-width:800px;margin-left:auto;margin-right:auto">This comparison reflects typical bank creditor insurance structures. Specific terms and conditions vary by lender. Individual mortgage protection policies are underwritten by Canada's leading life insurers and subject to individual underwriting approval.</p>
+            ''',
+        unless='typical bank creditor insurance structures',
+        count=1,
+    ),
+
+    # Partners (partners/index.html)
+    SelectorRule(
+        "Added de-risk section after hero",
+        ["partners/index.html"],
+        'section.trust-bar',
+        'before',
+        '''<!-- De-Risk Message -->
         <section style="padding:48px 0;background:var(--navy-50)">
             <div class="container">
                 <div style="max-width:900px;margin:0 auto;text-align:center">
@@ -210,138 +233,260 @@ class InsurioUpdater:
             </div>
         </section>
 
-        <section class="trust-bar">'''
-        
-        if re.search(hero_end_pattern, content) and 'De-Risk Message' not in content:
-            content = re.sub(hero_end_pattern, derisk_section, content, count=1)
-            changes += 1
-        
-        # Update 2: Add compensation structure box
-        partner_types_pattern = r'(<p>If your clients need mortgage protection, we should be working together\.</p>\s*</div>)'
-        compensation_box = r'<p>If your clients need mortgage protection, we should be working together.</p>\n                    <div style="max-width:800px;margin:24px auto 0;padding:20px 24px;background:var(--slate-50);border-radius:12px;border:1px solid var(--slate-200)">\n                        <p style="font-size:15px;color:var(--slate-700);line-height:1.7;margin:0"><strong>Compensation structure:</strong> Licensed insurance professionals may receive commission where permitted by their license and provincial regulations. Non-licensed referral partners receive a flat referral fee that is not contingent on policy approval or issuance.</p>\n                    </div>\n                </div>'
-        
-        if re.search(partner_types_pattern, content) and 'Compensation structure' not in content:
-            content = re.sub(partner_types_pattern, compensation_box, content)
-            changes += 1
-        
-        # Update 3: Add pilot program line before form
-        form_pattern = r'(<div>\s*<div class="form-card">\s*<form id="partnerForm")'
-        pilot_line = r'<div>\n                        <p style="font-size:15px;color:var(--slate-600);line-height:1.7;margin-bottom:24px;text-align:center">Insurio is currently onboarding a select group of referral partners as we expand the program across Canada.</p>\n                        \n                        <div class="form-card">\n                            <form id="partnerForm"'
-        
-        if re.search(form_pattern, content) and 'currently onboarding a select group' not in content:
-            content = re.sub(form_pattern, pilot_line, content)
-            changes += 1
-        
-        if changes > 0:
-            if self.write_file(filepath, content):
-                self.log_change("partners/index.html", f"Made {changes} content updates")
-                return True
-        else:
-            self.log_error("partners/index.html", "Could not find patterns to update")
-            return False
-    
-    def update_contact(self):
-        """Update contact/index.html"""
-        filepath = self.repo_path / "contact" / "index.html"
-        if not filepath.exists():
-            self.log_error(str(filepath), "File not found")
-            return False
-            
-        content = self.read_file(filepath)
-        if content is None:
-            return False
-        
-        changes = 0
-        
-        # Update 1: Hero heading
-        old_heading = r'<h1>Let\'s talk about <span class="highlight">protection</span></h1>'
-        new_heading = '<h1>Questions about <span class="highlight">mortgage protection?</span></h1>'
-        
-        if re.search(old_heading, content):
-            content = re.sub(old_heading, new_heading, content)
-            changes += 1
-        
-        # Update 2: Hero description
-        old_desc = r'<p class="hero-description" style="margin-left:auto;margin-right:auto">Get a personalized quote or ask us anything\. No obligation, fast response, real conversation\.</p>'
-        new_desc = '<p class="hero-description" style="margin-left:auto;margin-right:auto">Request a personalized quote or ask us about coverage options. No obligation, fast response.</p>'
-        
-        if re.search(old_desc, content):
-            content = re.sub(old_desc, new_desc, content)
-            changes += 1
-        
-        if changes > 0:
-            if self.write_file(filepath, content):
-                self.log_change("contact/index.html", f"Made {changes} content updates")
-                return True
-        else:
-            self.log_error("contact/index.html", "Could not find patterns to update")
-            return False
-    
+        ''',
+        unless='De-Risk Message',
+        count=1,
+    ),
+    Rule(
+        "Added compensation structure box",
+        ["partners/index.html"],
+        r'(<p>If your clients need mortgage protection, we should be working together\.</p>\s*</div>)',
+        r'<p>If your clients need mortgage protection, we should be working together.</p>\n                    <div style="max-width:800px;margin:24px auto 0;padding:20px 24px;background:var(--slate-50);border-radius:12px;border:1px solid var(--slate-200)">\n                        <p style="font-size:15px;color:var(--slate-700);line-height:1.7;margin:0"><strong>Compensation structure:</strong> Licensed insurance professionals may receive commission where permitted by their license and provincial regulations. Non-licensed referral partners receive a flat referral fee that is not contingent on policy approval or issuance.</p>\n                    </div>\n                </div>',
+        unless='Compensation structure',
+    ),
+    SelectorRule(
+        "Added pilot program line before form",
+        ["partners/index.html"],
+        'div.form-card:has(form#partnerForm)',
+        'before',
+        '<p style="font-size:15px;color:var(--slate-600);line-height:1.7;margin-bottom:24px;text-align:center">Insurio is currently onboarding a select group of referral partners as we expand the program across Canada.</p>\n                        \n                        ',
+        unless='currently onboarding a select group',
+    ),
+
+    # Contact (contact/index.html)
+    Rule(
+        "Updated hero heading",
+        ["contact/index.html"],
+        r'<h1>Let\'s talk about <span class="highlight">protection</span></h1>',
+        '<h1>Questions about <span class="highlight">mortgage protection?</span></h1>',
+    ),
+    Rule(
+        "Updated contact hero description",
+        ["contact/index.html"],
+        r'<p class="hero-description" style="margin-left:auto;margin-right:auto">Get a personalized quote or ask us anything\. No obligation, fast response, real conversation\.</p>',
+        '<p class="hero-description" style="margin-left:auto;margin-right:auto">Request a personalized quote or ask us about coverage options. No obligation, fast response.</p>',
+    ),
+]
+
+
+def apply_rules(content, rules, stats=None):
+    """
+    Apply rules to content in a single in-memory pass.
+    Selector rules are located against one tokenization of the page and
+    spliced in together; regex rules then run, in order, over the result.
+    stats, if given, is a run_report file stats dict to profile into.
+    Returns: (new_content, names_of_rules_that_hit) in registry order
+    """
+    hit = set()
+
+    selector_rules = [rule for rule in rules if isinstance(rule, SelectorRule)]
+    if selector_rules:
+        start = time.perf_counter()
+        index = HtmlIndex(content)
+        if stats is not None:
+            stats['tokenize_s'] += time.perf_counter() - start
+        splices = []
+        for rule in selector_rules:
+            rule_splices = rule.splices(index, stats)
+            if rule_splices:
+                hit.add(rule)
+                splices.extend(rule_splices)
+        content = apply_splices(content, splices)
+
+    for rule in rules:
+        if isinstance(rule, SelectorRule):
+            continue
+        content, count = rule.apply(content, stats)
+        if count:
+            hit.add(rule)
+
+    return content, [rule.name for rule in rules if rule in hit]
+
+
+def update_file(task):
+    """
+    Read a file once and apply all of its rules. The new content is returned,
+    not written, so the caller can commit every changed file as one batch.
+    task is (filepath, rules, known_hash, profile) so it can be shipped to a
+    worker process; known_hash is the manifest hash of the file, if any.
+    Returns: (names of the rules that hit, or None if the content matched
+    known_hash and was left alone; new bytes if any rule hit, else None;
+    manifest state of an unchanged file, else None; run_report file stats
+    if profile is set, else None)
+    """
+    filepath, rules, known_hash, profile = task
+    stats = new_file_stats() if profile else None
+
+    start = time.perf_counter()
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    if stats:
+        stats['read_s'] = time.perf_counter() - start
+        stats['bytes_read'] = len(data)
+
+    if known_hash is not None and content_hash(data) == known_hash:
+        return None, None, file_state(filepath, data), stats
+
+    start = time.perf_counter()
+    content, hits = apply_rules(data.decode('utf-8'), rules, stats)
+    if stats:
+        stats['transform_s'] = time.perf_counter() - start
+
+    if hits:
+        output = content.encode('utf-8')
+        if stats:
+            stats['bytes_written'] = len(output)
+        return hits, output, None, stats
+    return hits, None, file_state(filepath, data), stats
+
+
+class InsurioUpdater:
+    def __init__(self, repo_path, rules=None, jobs=1, force=False, report=None):
+        self.repo_path = Path(repo_path)
+        self.rules = RULES if rules is None else rules
+        self.jobs = jobs
+        self.force = force
+        self.manifest = Manifest(self.repo_path, 'auto_update')
+        if force:
+            self.manifest.clear()
+        # Passing a run_report.RunReport turns on per-rule profiling
+        self.profile = report is not None
+        self.report = report or RunReport('auto_update', self.repo_path)
+        self.changes_made = []
+        self.errors = []
+        self.skipped = []
+
+    def log_change(self, file, description):
+        self.changes_made.append(f"✓ {file}: {description}")
+
+    def log_error(self, file, description):
+        self.errors.append(f"✗ {file}: {description}")
+
+    def rules_by_file(self, paths=None):
+        """Group rules by target file: {relative_path: [rule, ...]} in registry order."""
+        plan = {}
+        for path in find_html_files(self.repo_path) if paths is None else paths:
+            rel_path = Path(path).relative_to(self.repo_path).as_posix()
+            rules = [rule for rule in self.rules if rule.matches(rel_path)]
+            if rules:
+                plan[rel_path] = rules
+        return plan
+
+    def apply_plan(self, plan, jobs=1):
+        """
+        Apply a rules_by_file() plan, one file per task, and log results in path order.
+        Files the manifest says are unchanged since their rules were last applied are skipped.
+        """
+        manifest = self.manifest
+        report = self.report
+        profile = self.profile
+
+        tasks = []
+        versions = {}
+        with report.phase('check'):
+            for rel_path, rules in plan.items():
+                filepath = str(self.repo_path / rel_path)
+                version = versions[filepath] = ruleset_version(*(rule.signature() for rule in rules))
+                if manifest.is_fresh(filepath, version):
+                    self.skipped.append(rel_path)
+                    report.add_file(rel_path, 'skipped')
+                    continue
+                tasks.append((filepath, rules, manifest.known_hash(filepath, version), profile))
+
+        # Changed files are staged next to their targets and committed together
+        writer = BatchWriter()
+        pending = []  # (filepath, rel_path, hits, digest, stats)
+        aborted = None
+
+        with report.phase('process'):
+            for (filepath, _, _, _), result, error in map_files(update_file, tasks, jobs):
+                rel_path = Path(filepath).relative_to(self.repo_path).as_posix()
+                if error:
+                    self.log_error(rel_path, f"Failed: {error}")
+                    report.add_file(rel_path, 'failed', error=error)
+                    continue
+
+                hits, output, state, stats = result
+                if output is not None:
+                    # After a failed stage, later outputs are still listed so they are reported as rolled back
+                    if not aborted:
+                        start = time.perf_counter()
+                        try:
+                            writer.stage(filepath, output)
+                        except BatchWriteError as e:
+                            aborted = e
+                        if stats:
+                            stats['write_s'] = time.perf_counter() - start
+                    pending.append((filepath, rel_path, hits, content_hash(output), stats))
+                    continue
+
+                if hits is None:
+                    manifest.record(filepath, versions[filepath], state)
+                    self.skipped.append(rel_path)
+                    report.add_file(rel_path, 'unchanged', stats)
+                else:
+                    # Not recorded, so the file is checked and reported again on the next run
+                    self.log_error(rel_path, "Could not find patterns to update")
+                    report.add_file(rel_path, 'no-match', stats)
+
+        with report.phase('commit'):
+            if pending and not aborted:
+                try:
+                    writer.commit()
+                except BatchWriteError as e:
+                    aborted = e
+
+        for filepath, rel_path, hits, digest, stats in pending:
+            if aborted:
+                self.log_error(rel_path, f"Not written, all changes rolled back ({aborted})")
+                report.add_file(rel_path, 'failed', stats, error=str(aborted))
+                continue
+            manifest.record(filepath, versions[filepath], file_state(filepath, digest=digest))
+            self.log_change(rel_path, f"Made {len(hits)} content updates ({', '.join(hits)})")
+            report.add_file(rel_path, 'changed', stats)
+
+        with report.phase('save'):
+            manifest.save()
+
     def run_all_updates(self):
         """Run all updates"""
         print("🚀 Starting Insurio Website Auto-Update\n")
-        
+
         # Check if we're in the right directory
         if not (self.repo_path / "index.html").exists():
             print("❌ ERROR: index.html not found. Please run this script from your repo root.")
             print(f"   Current path: {self.repo_path}")
             sys.exit(1)
-        
+
         print("📁 Repository found. Starting updates...\n")
-        
-        # Update all HTML files
-        files_to_update = [
-            ("index.html", self.update_homepage),
-            ("for-clients/index.html", self.update_for_clients),
-            ("compare/index.html", self.update_compare),
-            ("partners/index.html", self.update_partners),
-            ("contact/index.html", self.update_contact),
-        ]
-        
-        # Update footer logos in all files
-        print("🔄 Updating footer logos...")
-        footer_files = [
-            "index.html",
-            "404.html",
-            "for-clients/index.html",
-            "compare/index.html",
-            "partners/index.html",
-            "contact/index.html",
-            "privacy/index.html",
-            "terms/index.html"
-        ]
-        
-        for file in footer_files:
-            filepath = self.repo_path / file
-            if filepath.exists():
-                self.update_footer_logo(filepath)
-        
-        print()
-        
-        # Update content in specific files
-        print("✏️  Updating page content...")
-        for filename, update_func in files_to_update:
-            update_func()
-        
+
+        with self.report.phase('discovery'):
+            plan = self.rules_by_file()
+
+        print(f"✏️  Applying {len(self.rules)} rules to {len(plan)} files (jobs: {resolve_jobs(self.jobs)})...")
+        self.apply_plan(plan, self.jobs)
+        if self.skipped:
+            print(f"⏭️  Skipped {len(self.skipped)} files unchanged since their rules were last applied")
+
         print()
-        
+
         # Print summary
         print("=" * 60)
         print("📊 UPDATE SUMMARY")
         print("=" * 60)
-        
+
         if self.changes_made:
             print(f"\n✅ Successfully made {len(self.changes_made)} changes:\n")
             for change in self.changes_made:
                 print(f"   {change}")
-        
+
         if self.errors:
             print(f"\n⚠️  Encountered {len(self.errors)} issues:\n")
             for error in self.errors:
                 print(f"   {error}")
-        
+
         print("\n" + "=" * 60)
-        
+
         if not self.errors:
             print("✨ All updates completed successfully!")
             print("\n📝 Next steps:")
@@ -353,19 +498,68 @@ class InsurioUpdater:
         else:
             print("⚠️  Some updates had issues. Please review and fix manually.")
             print("   See COPY-PASTE-SNIPPETS.md for manual instructions.")
-        
+
         return len(self.errors) == 0
 
+    def watch(self, poll=False):
+        """Apply the rules to pages as they are saved. Rules and manifest stay loaded between events."""
+        watcher = Watcher(self.repo_path, SKIP_DIRS, use_polling=poll)
+        print(f"\n👀 Watching {self.repo_path} for changes ({watcher.mode}). Press Ctrl+C to stop.")
+        try:
+            for changed in watcher.batches():
+                plan = self.rules_by_file(sorted(path for path in changed if os.path.isfile(path)))
+                if not plan:
+                    continue
+                self.changes_made, self.errors, self.skipped = [], [], []
+                self.report = RunReport('auto_update', self.repo_path)
+                self.apply_plan(plan, self.jobs)
+                if len(self.skipped) == len(plan):
+                    continue  # our own writes coming back, or a save without changes
+                print(f"\n[{time.strftime('%H:%M:%S')}] {len(plan)} changed files with rules")
+                for line in self.changes_made + self.errors:
+                    print(f"   {line}")
+                if self.skipped:
+                    print(f"   ⏭️  {len(self.skipped)} already up to date")
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching.")
+
 
 def main():
-    if len(sys.argv) > 1:
-        repo_path = sys.argv[1]
-    else:
-        repo_path = os.getcwd()
-    
-    updater = InsurioUpdater(repo_path)
+    parser = argparse.ArgumentParser(description='Apply all copy changes to the Insurio HTML files.')
+    parser.add_argument('repo_path', nargs='?', default=os.getcwd(),
+                        help='Root of the website repo (default: current directory)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes (0 = one per CPU, default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='Ignore the incremental manifest and re-scan every file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print per-rule and per-phase timings')
+    parser.add_argument('--report', metavar='FILE',
+                        help='Write a JSON run report (per rule and file stats) to FILE')
+    parser.add_argument('--watch', action='store_true',
+                        help='After the first run, keep applying rules to pages as they are saved')
+    parser.add_argument('--poll', action='store_true',
+                        help='With --watch, poll the tree instead of using inotify')
+    args = parser.parse_args()
+
+    report = None
+    if args.profile or args.report:
+        report = RunReport('auto_update', os.path.abspath(args.repo_path), jobs=resolve_jobs(args.jobs))
+
+    updater = InsurioUpdater(args.repo_path, jobs=args.jobs, force=args.force, report=report)
     success = updater.run_all_updates()
-    
+
+    if args.profile:
+        report.print_profile()
+    if args.report:
+        report.write(args.report)
+        print(f"\n📄 Run report written to {args.report}")
+
+    if args.watch:
+        updater.profile = False
+        updater.watch(poll=args.poll)
+        sys.exit(0)
+
     sys.exit(0 if success else 1)
 
 
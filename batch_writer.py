@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Crash-safe, all-or-nothing batched file writer.
+
+Changed pages are staged to temp files next to their targets, flushed with
+one fsync pass, and then committed with os.replace. If staging or committing
+any file fails, every file already replaced is restored from its backup (a
+hard link, or a copy on filesystems without hard links) and the remaining
+temp files are removed, so an interrupted or failed run never leaves
+half-written pages behind.
+
+Usage:
+    writer = BatchWriter()
+    writer.stage(path, data)      # bytes
+    ...
+    writer.commit()               # raises BatchWriteError after rolling back
+"""
+
+import os
+import shutil
+import tempfile
+
+
+class BatchWriteError(Exception):
+    """A batch could not be committed; no target file was changed."""
+
+    def __init__(self, path, error):
+        super().__init__(f"{path}: {error}")
+        self.path = path
+        self.error = error
+
+
+class BatchWriter:
+    def __init__(self):
+        self.staged = []  # (target, temp_path)
+
+    def __len__(self):
+        return len(self.staged)
+
+    def stage(self, path, data):
+        """Write data to a temp file in path's directory. Nothing is visible until commit()."""
+        path = os.fspath(path)
+        directory, name = os.path.split(path)
+        try:
+            fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory or '.')
+        except OSError as e:
+            self.rollback()
+            raise BatchWriteError(path, e) from e
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            try:
+                os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                pass
+        except BaseException as e:
+            self._discard(temp_path)
+            self.rollback()
+            raise BatchWriteError(path, e) from e
+        self.staged.append((path, temp_path))
+
+    def commit(self):
+        """
+        fsync every staged file, then replace the targets.
+        Returns the list of committed paths. On failure everything is rolled back.
+        """
+        staged, self.staged = self.staged, []
+        committed = []  # (target, backup_path or None)
+        current = None  # target being processed, named in the error
+        try:
+            # One sync pass over all staged data before any target is touched
+            for current, temp_path in staged:
+                fd = os.open(temp_path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+            for current, temp_path in staged:
+                backup = self._backup(current, f"{temp_path}.bak")
+                committed.append((current, backup))
+                os.replace(temp_path, current)
+
+            current = None
+            for directory in sorted({os.path.dirname(path) or '.' for path, _ in staged}):
+                _fsync_dir(directory)
+        except BaseException as e:
+            failed = current or (staged[0][0] if staged else '?')
+            for path, backup in reversed(committed):
+                if backup:
+                    os.replace(backup, path)
+                    # rename() is a no-op when both names are links to the same inode,
+                    # which is the case for a target that was never replaced
+                    self._discard(backup)
+                else:
+                    # The batch created this file, so rolling back removes it
+                    self._discard(path)
+            for _, temp_path in staged:
+                self._discard(temp_path)
+            raise BatchWriteError(failed, e) from e
+
+        for _, backup in committed:
+            if backup:
+                self._discard(backup)
+        return [path for path, _ in staged]
+
+    def rollback(self):
+        """Drop every staged file without touching any target."""
+        staged, self.staged = self.staged, []
+        for _, temp_path in staged:
+            self._discard(temp_path)
+
+    @classmethod
+    def _backup(cls, path, backup):
+        """
+        Keep the current version of path at backup: a hard link where the
+        filesystem supports it, a copy otherwise. None if path does not exist.
+        """
+        try:
+            os.link(path, backup)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            try:
+                shutil.copy2(path, backup)
+            except FileNotFoundError:
+                cls._discard(backup)
+                return None
+            except BaseException:
+                cls._discard(backup)
+                raise
+        return backup
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _fsync_dir(directory):
+    """Persist the renames in directory (not supported on every platform)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
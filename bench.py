@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Benchmark update_nav.py and auto_update.py on synthetic sites.
+
+Generates throwaway sites shaped like ours (header nav, mobile nav, trust
+bar, <!-- Stats --> marker, partner form, footer logo) at several page
+counts and page sizes, then times:
+
+    update_nav  dry   -- preview run on a fresh site
+    update_nav  full  -- --apply on a fresh site
+    update_nav  noop  -- --apply again (everything already done)
+    auto_update full  -- every rule retargeted at every page
+    auto_update noop  -- the same run again
+
+Each scenario runs in its own process so peak RSS is measured per scenario.
+
+Usage:
+    python bench.py                                  # 10, 1k and 50k pages at 16 KB
+    python bench.py --pages 10,1000 --page-kb 8,64   # custom matrix
+    python bench.py --save bench-baseline.json       # record a baseline
+    python bench.py --compare bench-baseline.json    # flag regressions (exit 1)
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PAGE_HEAD = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Synthetic page {n} | Insurio</title>
+    <link rel="stylesheet" href="{prefix}styles.css">
+</head>
+<body>
+    <a href="#main-content" class="skip-link">Skip to main content</a>
+    <header class="header">
+        <div class="header-inner">
+            <a href="/" class="logo">
+                <img src="{prefix}images/logo.webp" alt="Insurio">
+            </a>
+            <nav>
+                <ul class="nav-links">
+                    <li><a href="/for-clients/">For Clients</a></li>
+                    <li><a href="/compare/">Compare</a></li>
+                    <li><a href="/brokers/">For Brokers</a></li>
+                    <li><a href="/contact/">Contact</a></li>
+                </ul>
+            </nav>
+            <button class="mobile-menu-toggle" aria-label="Toggle navigation menu" aria-expanded="false">
+                <span></span>
+                <span></span>
+                <span></span>
+            </button>
+        </div>
+        <nav class="mobile-nav">
+            <ul>
+                <li><a href="/for-clients/">For Clients</a></li>
+                <li><a href="/compare/">Compare</a></li>
+                <li><a href="/brokers/">For Brokers</a></li>
+                <li><a href="/contact/">Contact</a></li>
+            </ul>
+        </nav>
+    </header>
+
+    <main id="main-content">
+        <!-- Hero -->
+        <section class="hero">
+            <div class="container">
+                <h1>Synthetic page {n}</h1>
+                <p class="hero-description">Not the bank. Get coverage that's portable, stays level, and pays your family directly—not the lender's balance sheet. Exposed the truth about bank mortgage insurance.</p>
+            </div>
+        </section>
+
+        <section class="trust-bar">
+            <div class="container">
+                <div class="trust-bar-inner">
+                    <span class="trust-bar-label">Direct partnership with</span>
+                    <img src="{prefix}images/assumption-life-logo.webp" alt="Assumption Life" class="trust-logo" style="height:40px;width:auto">
+                </div>
+            </div>
+        </section>
+
+        <!-- Stats -->
+        <section class="stats" id="stats-section">
+            <div class="container">
+                <div class="stats-grid">
+                    <div class="stat"><div class="stat-number" data-target="100" data-suffix="%">100%</div></div>
+                </div>
+            </div>
+        </section>
+'''
+
+FILLER_SECTION = '''
+        <section class="problem">
+            <div class="container">
+                <div class="section-header">
+                    <h2>Section {i}</h2>
+                    <p>If your clients need mortgage protection, we should be working together.</p>
+                </div>
+                <div class="problem-grid">
+                    <div class="problem-card">
+                        <h3>Bank insurance decreases</h3>
+                        <p style="font-size:14px;color:var(--slate-500);margin:2px 0 0">Your premiums stay the same while the payout shrinks with your mortgage balance. Individual coverage stays level for the entire term and pays your family directly.</p>
+                    </div>
+                </div>
+            </div>
+        </section>
+'''
+
+PAGE_TAIL = '''
+        <section class="partner-form">
+            <div class="container">
+                <div>
+                    <div class="form-card">
+                        <form id="partnerForm" action="https://api.web3forms.com/submit" method="POST">
+                            <input type="text" name="name" required>
+                        </form>
+                    </div>
+                </div>
+            </div>
+        </section>
+    </main>
+
+    <footer>
+        <div class="container">
+            <div class="footer-grid">
+                <div class="footer-brand">
+                    <a href="/" class="logo">
+                        <img src="{prefix}images/logo.webp" alt="Insurio">
+                    </a>
+                    <p>Mortgage protection that's owned by the borrower, not the bank.</p>
+                </div>
+            </div>
+        </div>
+    </footer>
+    <script src="{prefix}js/main.js"></script>
+</body>
+</html>
+'''
+
+
+def render_page(n, prefix, page_kb):
+    """One synthetic page of roughly page_kb kilobytes."""
+    head = PAGE_HEAD.format(n=n, prefix=prefix)
+    tail = PAGE_TAIL.format(prefix=prefix)
+    parts = [head]
+    size = len(head) + len(tail)
+    i = 0
+    while size < page_kb * 1024:
+        section = FILLER_SECTION.format(i=i)
+        parts.append(section)
+        size += len(section)
+        i += 1
+    parts.append(tail)
+    return ''.join(parts)
+
+
+def generate_site(root, pages, page_kb):
+    """Write a synthetic site of `pages` HTML pages under root. Returns total bytes."""
+    total = 0
+    for n in range(pages):
+        if n == 0:
+            rel_dir, prefix = '', ''
+        elif n == 1:
+            rel_dir, prefix = 'partners', '../'
+        else:
+            # Spread pages over subdirectories so no directory gets huge
+            rel_dir, prefix = os.path.join('pages', f"{n // 1000:03d}", f"p{n:06d}"), '../../../'
+        page_dir = os.path.join(root, rel_dir)
+        os.makedirs(page_dir, exist_ok=True)
+        content = render_page(n, prefix, page_kb).encode('utf-8')
+        with open(os.path.join(page_dir, 'index.html'), 'wb') as f:
+            f.write(content)
+        total += len(content)
+    return total
+
+
+def bench_rules():
+    """auto_update's RULES, retargeted at every page so each one does work."""
+    from auto_update import RULES
+    rules = []
+    for rule in RULES:
+        rule = copy.copy(rule)
+        rule.files = ('*',)
+        rules.append(rule)
+    return rules
+
+
+def run_scenario(tool, mode, root, jobs):
+    """Run one scenario in this process with output silenced. Returns elapsed seconds."""
+    sys.path.insert(0, HERE)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        if tool == 'update_nav':
+            import update_nav
+            sys.argv = ['update_nav.py', '--dir', root, '--jobs', str(jobs)]
+            if mode != 'dry':
+                sys.argv.append('--apply')
+            update_nav.main()
+        else:
+            from auto_update import InsurioUpdater
+            InsurioUpdater(root, rules=bench_rules(), jobs=jobs).run_all_updates()
+        return time.perf_counter() - start
+
+
+def peak_rss_kb():
+    """Peak RSS of this process and of its largest worker, in KB."""
+    scale = 1024 if sys.platform == 'darwin' else 1  # macOS reports bytes
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+    return max(own, children)
+
+
+def measure(tool, mode, root, jobs):
+    """Run a scenario in a fresh interpreter. Returns (seconds, peak_rss_kb)."""
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--_scenario', tool, mode, root, str(jobs)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return result['seconds'], result['peak_rss_kb']
+
+
+SCENARIOS = [
+    ('update_nav', 'dry'),
+    ('update_nav', 'full'),
+    ('update_nav', 'noop'),
+    ('auto_update', 'full'),
+    ('auto_update', 'noop'),
+]
+
+
+def run_matrix(page_counts, page_sizes, jobs, repeat):
+    """Run every scenario for every (pages, page_kb). Returns {key: result}."""
+    results = {}
+    for pages in page_counts:
+        for page_kb in page_sizes:
+            best = {}
+            for _ in range(repeat):
+                root = tempfile.mkdtemp(prefix='insurio-bench-')
+                try:
+                    total_bytes = generate_site(root, pages, page_kb)
+                    for tool, mode in SCENARIOS:
+                        seconds, rss = measure(tool, mode, root, jobs)
+                        key = f"{tool}/{mode}/{pages}x{page_kb}kb"
+                        if key not in best or seconds < best[key]['seconds']:
+                            best[key] = {
+                                'pages': pages,
+                                'bytes': total_bytes,
+                                'seconds': round(seconds, 4),
+                                'pages_per_s': round(pages / seconds, 1),
+                                'mb_per_s': round(total_bytes / 1e6 / seconds, 2),
+                                'peak_rss_kb': rss,
+                            }
+                finally:
+                    shutil.rmtree(root, ignore_errors=True)
+            for key, result in best.items():
+                results[key] = result
+                print(f"  {key:<36} {result['seconds']:>9.3f}s {result['pages_per_s']:>11.1f} pages/s "
+                      f"{result['mb_per_s']:>8.2f} MB/s {result['peak_rss_kb'] / 1024:>8.1f} MB RSS")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """List regressions: throughput down or peak RSS up by more than threshold."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get('results', {}).get(key)
+        if not base:
+            continue
+        if result['pages_per_s'] < base['pages_per_s'] * (1 - threshold):
+            regressions.append(f"{key}: {base['pages_per_s']} → {result['pages_per_s']} pages/s")
+        if result['peak_rss_kb'] > base['peak_rss_kb'] * (1 + threshold):
+            regressions.append(f"{key}: peak RSS {base['peak_rss_kb']} → {result['peak_rss_kb']} KB")
+    return regressions
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--_scenario':
+        tool, mode, root, jobs = sys.argv[2:6]
+        seconds = run_scenario(tool, mode, root, int(jobs))
+        print(json.dumps({'seconds': seconds, 'peak_rss_kb': peak_rss_kb()}))
+        return 0
+
+    parser = argparse.ArgumentParser(description='Benchmark update_nav.py and auto_update.py on synthetic sites.')
+    parser.add_argument('--pages', default='10,1000,50000',
+                        help='Comma-separated page counts (default: 10,1000,50000)')
+    parser.add_argument('--page-kb', default='16',
+                        help='Comma-separated approximate page sizes in KB (default: 16)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='--jobs passed to both tools (default: 1)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs per scenario; the fastest is kept (default: 1)')
+    parser.add_argument('--save', metavar='FILE', help='Write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE', help='Compare results against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='Allowed relative regression when comparing (default: 0.15)')
+    args = parser.parse_args()
+
+    page_counts = [int(p) for p in args.pages.split(',')]
+    page_sizes = [int(k) for k in args.page_kb.split(',')]
+
+    print(f"Benchmarking pages={page_counts} page_kb={page_sizes} jobs={args.jobs}\n")
+    results = run_matrix(page_counts, page_sizes, args.jobs, args.repeat)
+
+    if args.save:
+        baseline = {
+            'meta': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'jobs': args.jobs,
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'results': results,
+        }
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n✓ Baseline saved: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n⚠ {len(regressions)} regressions (threshold {args.threshold:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\n✓ No regressions against {args.compare}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+Build the deployable site into dist/.
+
+Every site file is copied to dist/ with the same relative path. HTML, CSS and
+JS are minified on the way (inline <script> and <style> blocks included), and
+every text asset is precompressed next to its output as .gz and, when the
+brotli package is installed, .br, so the CDN can serve the compressed bytes
+as-is.
+
+Stylesheets, scripts, images and fonts get content-hashed names and every
+reference to them is rewritten (see fingerprint.py), so they can be cached
+forever. Raster images also get resized WebP variants, and every <img> gets
+width/height and a srcset (see images.py); a page whose images exceed the
+--image-budget fails the build (checked only when Pillow is installed, since
+without it no smaller variants can be made). Inline styles repeated across
+pages become shared classes in styles.css, styles.css loses the selectors no
+page uses (--no-prune keeps them), and each page inlines the CSS its first
+screen needs and loads the rest asynchronously (--no-critical-css keeps the
+plain stylesheet link; see inline_styles.py and critical_css.py). Assets are
+built first, then stylesheets (which reference images), then pages (which
+reference both).
+
+Files are built in parallel (--jobs) and the build is incremental: a source
+whose bytes are unchanged since it was last built is skipped
+(.insurio-cache/build.json), and outputs whose source was deleted are removed.
+
+Usage:
+    python build.py                 # build into dist/
+    python build.py --jobs 0        # one worker process per CPU
+    python build.py --force         # rebuild everything
+"""
+
+import argparse
+import gzip
+import json
+import os
+import posixpath
+import re
+import sys
+import time
+from pathlib import Path
+
+from critical_css import SITE_STYLESHEET, CriticalCss, inline_critical_css, prune_css
+from fingerprint import (ASSET_MANIFEST, FINGERPRINT_SUFFIXES, hashed_name, rewrite_css_urls,
+                         rewrite_html_refs, write_asset_manifest)
+from images import (IMAGE_SUFFIXES, VARIANT_WIDTHS, Image, encode_variants, image_size, rewrite_images,
+                    variant_cache_dir, variant_name)
+from inline_styles import (UTILITY_STYLESHEET, rewrite_inline_styles, scan_page, scripted_properties,
+                           utility_classes, utility_css)
+from manifest import CACHE_DIR, Manifest, content_hash, file_state, ruleset_version
+from parallel import map_files, resolve_jobs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BUILD_DIR = 'dist'
+
+# Bump when a minifier or one of the rewriting passes changes so every file is rebuilt once
+BUILD_VERSION = 5
+
+# Default per-page image budget (--image-budget)
+IMAGE_BUDGET_KB = 1024
+
+# Only these files are part of the deployed site
+SITE_SUFFIXES = ('.html', '.htm', '.css', '.js', '.json', '.webmanifest', '.xml', '.txt', '.svg',
+                 '.ico', '.webp', '.png', '.jpg', '.jpeg', '.gif', '.avif', '.woff', '.woff2')
+# Google Apps Script sources kept in the repo for reference, not served
+EXCLUDE_FILES = ['*-SCRIPT.js']
+SKIP_DIRS = ['.git', 'node_modules', '__pycache__', '.venv', 'venv', 'partials', BUILD_DIR, CACHE_DIR]
+
+# Text assets worth precompressing (images and fonts are already compressed)
+COMPRESSIBLE = ('.html', '.htm', '.css', '.js', '.json', '.webmanifest', '.xml', '.txt', '.svg', '.ico')
+
+
+# ---------------------------------------------------------------------------
+# Minifiers. All of them are conservative: they drop comments and layout
+# whitespace but never reorder or rewrite code, and strings are copied as-is.
+# ---------------------------------------------------------------------------
+
+CSS_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+CSS_TIGHT_RE = re.compile(r' ?([{};,>]) ?|(:) ')
+
+
+def _tighten_css(css):
+    css = re.sub(r'\s+', ' ', css)
+    return CSS_TIGHT_RE.sub(r'\1\2', css).replace(';}', '}')
+
+
+def minify_css(css):
+    """Strip comments and collapse whitespace around punctuation."""
+    out = []
+    code = []  # code between strings, tightened once comments are gone
+    pos = 0
+    for m in CSS_TOKEN_RE.finditer(css):
+        code.append(css[pos:m.start()])
+        token = m.group()
+        if token.startswith('/*'):
+            code.append(' ')
+        else:
+            out.append(_tighten_css(''.join(code)))
+            out.append(token)
+            code = []
+        pos = m.end()
+    code.append(css[pos:])
+    out.append(_tighten_css(''.join(code)))
+    return ''.join(out).strip()
+
+
+# A '/' after one of these (or at the start) begins a regex literal, not a division
+JS_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = ('return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                     'throw', 'case', 'do', 'else', 'yield', 'await')
+# Whitespace next to these is never significant
+JS_TIGHT = set('{}()[];,:=<>?!&|')
+
+
+def _skip_js_string(js, i):
+    """Index just past the string or template literal starting at i."""
+    quote = js[i]
+    i += 1
+    while i < len(js):
+        if js[i] == '\\':
+            i += 2
+            continue
+        if js[i] == quote:
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_js_regex(js, i):
+    """Index just past the regex literal starting at i (flags included)."""
+    i += 1
+    in_class = False
+    while i < len(js):
+        c = js[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return i
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            break
+        i += 1
+    while i < len(js) and (js[i].isalnum() or js[i] == '_'):
+        i += 1
+    return i
+
+
+def _regex_allowed(out):
+    """True if a '/' following the minified output so far starts a regex literal."""
+    code = ''.join(out[-3:]).rstrip()
+    if not code:
+        return True
+    if code[-1] in JS_REGEX_PREFIX:
+        return True
+    word = re.search(r'[\w$]+$', code)
+    return bool(word) and word.group() in JS_REGEX_KEYWORDS
+
+
+def minify_js(js):
+    """
+    Strip comments, indentation and blank lines. Line breaks are kept so
+    automatic semicolon insertion behaves exactly as in the source.
+    """
+    out = []
+    i = 0
+    n = len(js)
+    while i < n:
+        c = js[i]
+        if c in '"\'`':
+            end = _skip_js_string(js, i)
+            out.append(js[i:end])
+            i = end
+        elif js.startswith('//', i):
+            end = js.find('\n', i)
+            i = n if end < 0 else end
+        elif js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            out.append('\n' if '\n' in js[i:end] else ' ')
+            i = end
+        elif c == '/' and _regex_allowed(out):
+            end = _skip_js_regex(js, i)
+            out.append(js[i:end])
+            i = end
+        elif c.isspace():
+            end = i
+            while end < n and js[end].isspace():
+                end += 1
+            out.append('\n' if '\n' in js[i:end] else ' ')
+            i = end
+        else:
+            end = i + 1
+            while end < n and js[end] not in '"\'`/' and not js[end].isspace():
+                end += 1
+            out.append(js[i:end])
+            i = end
+
+    # Collapse whitespace tokens: one newline per run of lines, no space next to punctuation
+    result = []
+    for token in out:
+        if token in (' ', '\n'):
+            if not result:
+                continue
+            if result[-1] in (' ', '\n'):
+                if token == '\n':
+                    result[-1] = '\n'
+                continue
+        elif token[0] in JS_TIGHT and result and result[-1] == ' ':
+            result.pop()
+        if token == ' ' and result[-1][-1] in JS_TIGHT:
+            continue
+        result.append(token)
+    while result and result[-1] in (' ', '\n'):
+        result.pop()
+    return ''.join(result)
+
+
+# Elements whose content is copied verbatim or minified as code
+HTML_RAW_RE = re.compile(r'(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)', re.S | re.I)
+HTML_COMMENT_RE = re.compile(r'<!--(?!\[if|<!).*?-->', re.S)
+# Whitespace around these tags never renders
+HTML_BLOCK_TAGS = ('html|head|body|meta|link|title|base|script|style|noscript|div|section|header|footer|'
+                   'main|nav|article|aside|p|ul|ol|li|dl|dt|dd|h[1-6]|table|thead|tbody|tfoot|tr|td|th|'
+                   'form|fieldset|legend|select|option|br|hr|figure|figcaption|blockquote|details|summary|svg|path')
+HTML_BLOCK_RE = re.compile(rf'\s*(</?(?:{HTML_BLOCK_TAGS})\b[^>]*>|<!DOCTYPE[^>]*>)\s*', re.I)
+SCRIPT_TYPE_RE = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]+)', re.I)
+
+
+def _minify_html_text(html):
+    html = HTML_COMMENT_RE.sub('', html)
+    html = re.sub(r'\s+', ' ', html)
+    return HTML_BLOCK_RE.sub(r'\1', html)
+
+
+def _minify_raw(open_tag, tag, body):
+    tag = tag.lower()
+    if tag == 'style':
+        return minify_css(body)
+    if tag == 'script':
+        m = SCRIPT_TYPE_RE.search(open_tag)
+        script_type = m.group(1).lower() if m else 'text/javascript'
+        if script_type in ('text/javascript', 'application/javascript', 'module'):
+            return minify_js(body)
+        if script_type.endswith('json'):
+            try:
+                return json.dumps(json.loads(body), ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+            except ValueError:
+                return body.strip()
+    return body
+
+
+def minify_html(html):
+    """Drop comments and layout whitespace; minify inline scripts and styles."""
+    out = []
+    pos = 0
+    for m in HTML_RAW_RE.finditer(html):
+        open_tag, tag, body, close_tag = m.groups()
+        out.append(_minify_html_text(html[pos:m.start()] + open_tag))
+        out.append(_minify_raw(open_tag, tag, body))
+        out.append(_minify_html_text(close_tag))
+        pos = m.end()
+    out.append(_minify_html_text(html[pos:]))
+    return ''.join(out).strip() + '\n'
+
+
+MINIFIERS = {
+    '.html': minify_html,
+    '.htm': minify_html,
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+# ---------------------------------------------------------------------------
+# Per-file build
+# ---------------------------------------------------------------------------
+
+def compressed_variants(data):
+    """[(suffix, bytes)] for every available encoding that is smaller than data."""
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    return [(suffix, blob) for suffix, blob in variants if len(blob) < len(data)]
+
+
+def _write(path, data):
+    """Write bytes through a temp file so a reader never sees half an asset."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_file(task):
+    """
+    Rewrite references in, minify and precompress one source file.
+    task is (source, target, rel_path, context, fingerprint) so it can be
+    shipped to a worker process. context holds what earlier stages produced:
+    'assets' (source path -> hashed path), 'images' (source path -> image
+    entry), 'utilities' (inline style -> generated class), 'prune' (tokens
+    the site uses), 'critical' (the page's critical CSS) and 'cache_dir' for
+    image variants. fingerprint renames the output
+    after its hash.
+    Returns: dict with 'hash' (of the source), 'outputs', 'bytes_in',
+    'bytes_out' and, where they apply, 'asset' (hashed relative path),
+    'image' (image entry) and 'image_bytes' (bytes of images a page loads)
+    """
+    source, target, rel_path, context, fingerprint = task
+    data = Path(source).read_bytes()
+    suffix = Path(source).suffix.lower()
+    target = Path(target)
+    outcome = {'hash': content_hash(data), 'outputs': [], 'bytes_in': len(data)}
+
+    output = data
+    minify = MINIFIERS.get(suffix)
+    if minify:
+        source_text = text = data.decode('utf-8')
+        base_dir = posixpath.dirname(rel_path)
+        if suffix in ('.html', '.htm'):
+            text, loaded = rewrite_images(text, base_dir, context['images'])
+            outcome['image_bytes'] = sum(loaded.values())
+            text = rewrite_inline_styles(text, base_dir, context['utilities'])
+            if context.get('critical') is not None:
+                text = inline_critical_css(text, base_dir, context['critical'])
+            text = rewrite_html_refs(text, base_dir, context['assets'])
+        elif suffix == '.css':
+            if rel_path == UTILITY_STYLESHEET and context['utilities']:
+                text += utility_css(context['utilities'])
+            text = rewrite_css_urls(text, base_dir, context['assets'])
+            if rel_path == SITE_STYLESHEET and context.get('prune'):
+                text = prune_css(text, context['prune'])
+        output = minify(text).encode('utf-8')
+        if len(output) >= len(data) and text == source_text:
+            output = data
+
+    if suffix in IMAGE_SUFFIXES:
+        size = image_size(data)
+        if size:
+            image = outcome['image'] = {'width': size[0], 'height': size[1], 'bytes': len(data), 'variants': []}
+            for width, _, cache_path in encode_variants(data, outcome['hash'], context['cache_dir']):
+                blob = Path(cache_path).read_bytes()
+                hashed = hashed_name(variant_name(rel_path, width), blob)
+                path = target.with_name(posixpath.basename(hashed))
+                _write(path, blob)
+                outcome['outputs'].append(str(path))
+                image['variants'].append((width, hashed, len(blob)))
+
+    if fingerprint:
+        outcome['asset'] = hashed_name(rel_path, output)
+        target = target.with_name(posixpath.basename(outcome['asset']))
+    _write(target, output)
+    outcome['outputs'].insert(0, str(target))
+    outcome['bytes_out'] = len(output)
+    if suffix in COMPRESSIBLE:
+        for encoding, blob in compressed_variants(output):
+            path = target.with_name(target.name + encoding)
+            _write(path, blob)
+            outcome['outputs'].append(str(path))
+    return outcome
+
+
+def find_site_files(root_dir):
+    """Every file that is part of the deployed site, sorted."""
+    site_files = []
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+        for file in files:
+            if not file.lower().endswith(SITE_SUFFIXES) or file.startswith('.'):
+                continue
+            if any(Path(file).match(pattern) for pattern in EXCLUDE_FILES):
+                continue
+            site_files.append(os.path.join(root, file))
+    return sorted(site_files)
+
+
+class SiteBuilder:
+    def __init__(self, root, out_dir=None, jobs=1, force=False, image_budget=None, critical_css=True, prune=True):
+        # Absolute, so output paths recorded in the manifest compare equal across runs
+        self.root = Path(os.path.abspath(root))
+        self.out_dir = Path(os.path.abspath(out_dir)) if out_dir else self.root / BUILD_DIR
+        self.jobs = jobs
+        self.force = force
+        # Most image bytes a page may load, or None for no limit. Without Pillow no
+        # variants can be made, so pages load the full-size originals and the budget is not checked
+        self.image_budget = image_budget if Image is not None else None
+        self.critical_css = critical_css
+        self.prune = prune
+        # Not cleared by force: its output lists are what cleans up after deleted sources
+        self.manifest = Manifest(self.root, 'build')
+        # Outputs depend on the minifiers and on which encodings are available
+        self.version = ruleset_version(BUILD_VERSION, str(self.out_dir), brotli is not None, Image is not None,
+                                       VARIANT_WIDTHS)
+
+    def target(self, source):
+        return self.out_dir / Path(source).relative_to(self.root)
+
+    def _outputs_exist(self, source):
+        entry = self.manifest.entries.get(self.manifest.key(source))
+        return bool(entry) and all(os.path.exists(path) for path in entry.get('outputs', []))
+
+    def stages(self, sources):
+        """
+        Split sources into build stages, each of which only references the ones before it:
+        [(name, [source, ...], fingerprint)]
+        """
+        assets, styles, pages = [], [], []
+        for source in sources:
+            suffix = Path(source).suffix.lower()
+            if suffix == '.css':
+                styles.append(source)
+            elif suffix in FINGERPRINT_SUFFIXES:
+                assets.append(source)
+            else:
+                pages.append(source)
+        return [('assets', assets, True), ('styles', styles, True), ('pages', pages, False)]
+
+    def build(self):
+        """
+        Build every changed source file.
+        Returns: dict with 'built', 'skipped', 'removed' (relative paths),
+        'errors' (messages), 'bytes_in' and 'bytes_out' (of the rebuilt HTML, CSS and JS),
+        'assets' ({source path: hashed path}) and 'image_bytes' ({page: bytes}).
+        """
+        result = {'built': [], 'skipped': [], 'removed': [], 'errors': [], 'bytes_in': 0, 'bytes_out': 0,
+                  'image_bytes': {}}
+        sources = find_site_files(self.root)
+        assets = {}
+        images = {}
+        utilities = self.utility_classes(sources)
+        result['utilities'] = len(utilities)
+        critical = CriticalCss(self.root)
+        stylesheet = self.root / SITE_STYLESHEET
+        if (self.critical_css or self.prune) and stylesheet.exists():
+            critical.scan(sources, BUILD_VERSION)
+
+        for name, stage_sources, fingerprint in self.stages(sources):
+            # A file's output depends on everything the stages before it produced
+            context = {'assets': dict(assets), 'images': dict(images), 'utilities': utilities,
+                       'cache_dir': str(variant_cache_dir(self.root))}
+            extras = {}
+            if critical.pages and name == 'styles' and self.prune:
+                context['prune'] = critical.site_tokens(utilities.values())
+            elif critical.pages and name == 'pages' and self.critical_css:
+                css = rewrite_css_urls(stylesheet.read_text(encoding='utf-8') + utility_css(utilities), '', assets)
+                page_css = critical.page_css(css, utilities)
+                extras = {source: {'critical': page_css[self.manifest.key(source)]}
+                          for source in stage_sources if self.manifest.key(source) in page_css}
+            version = ruleset_version(self.version, fingerprint, context['assets'], context['images'], utilities,
+                                      context.get('prune'))
+            self._build_stage(stage_sources, version, context, fingerprint, assets, images, result, extras)
+        critical.save()
+
+        if self.image_budget:
+            for rel_path, loaded in sorted(result['image_bytes'].items()):
+                if loaded > self.image_budget:
+                    result['errors'].append(f"{rel_path}: images total {loaded / 1024:.0f} KB, "
+                                            f"over the {self.image_budget / 1024:.0f} KB budget")
+
+        # Sources that disappeared take their outputs with them
+        current = {self.manifest.key(source) for source in sources}
+        for key in sorted(set(self.manifest.entries) - current):
+            for path in self.manifest.entries[key].get('outputs', []):
+                _remove(path)
+            del self.manifest.entries[key]
+            self.manifest.dirty = True
+            result['removed'].append(key)
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        write_asset_manifest(self.out_dir / ASSET_MANIFEST, assets)
+        self.manifest.save()
+        result['assets'] = assets
+        return result
+
+    def utility_classes(self, sources):
+        """
+        Scan pages for inline styles and scripts for style assignments.
+        Per-file results are cached (.insurio-cache/inline_styles.json), so
+        only changed files are re-read. Returns: {style key: class name}
+        """
+        cache = Manifest(self.root, 'inline_styles')
+        counts = {}
+        scripted = set()
+        for source in sources:
+            suffix = Path(source).suffix.lower()
+            if suffix not in ('.html', '.htm', '.js'):
+                continue
+            entry = cache.entries.get(cache.key(source))
+            if not cache.is_fresh(source, BUILD_VERSION):
+                data = Path(source).read_bytes()
+                text = data.decode('utf-8')
+                if suffix == '.js':
+                    keys, props = [], sorted(scripted_properties(text))
+                else:
+                    keys, props = scan_page(text, posixpath.dirname(cache.key(source)))
+                entry = dict(file_state(source, data), styles=keys, scripted=props)
+                cache.record(source, BUILD_VERSION, entry)
+            for key in entry['styles']:
+                counts[key] = counts.get(key, 0) + 1
+            scripted.update(entry['scripted'])
+
+        current = {cache.key(source) for source in sources}
+        for key in set(cache.entries) - current:
+            del cache.entries[key]
+            cache.dirty = True
+        cache.save()
+        return utility_classes(counts, scripted)
+
+    def _build_stage(self, sources, stage_version, context, fingerprint, assets, images, result, extras=None):
+        """
+        Build one stage; hashed names and image entries are added to assets and images.
+        extras maps a source to context entries that only apply to that file.
+        """
+        tasks = []
+        versions = {}
+        for source in sources:
+            rel_path = Path(source).relative_to(self.root).as_posix()
+            entry = self.manifest.entries.get(self.manifest.key(source))
+            extra = (extras or {}).get(source)
+            version = versions[source] = ruleset_version(stage_version, extra) if extra else stage_version
+            task = (source, str(self.target(source)), rel_path, dict(context, **extra) if extra else context,
+                    fingerprint)
+            if self.force or not self._outputs_exist(source):
+                tasks.append(task)
+                continue
+            if not self.manifest.is_fresh(source, version):
+                known_hash = self.manifest.known_hash(source, version)
+                data = Path(source).read_bytes() if known_hash else None
+                if not known_hash or content_hash(data) != known_hash:
+                    tasks.append(task)
+                    continue
+                # Touched but not changed (e.g. a checkout): refresh the stat, keep the outputs
+                self.manifest.record(source, version, dict(entry, **file_state(source, data)))
+            self._collect(rel_path, entry, assets, images, result)
+            result['skipped'].append(rel_path)
+
+        for (source, _, rel_path, _, _), outcome, error in map_files(build_file, tasks, self.jobs):
+            if error:
+                result['errors'].append(f"{rel_path}: {error}")
+                continue
+            entry = self.manifest.entries.get(self.manifest.key(source), {})
+            for stale in set(entry.get('outputs', [])) - set(outcome['outputs']):
+                _remove(stale)
+            state = dict(file_state(source, digest=outcome['hash']), outputs=outcome['outputs'])
+            for key in ('asset', 'image', 'image_bytes'):
+                if key in outcome:
+                    state[key] = outcome[key]
+            self.manifest.record(source, versions[source], state)
+            self._collect(rel_path, state, assets, images, result)
+            result['built'].append(rel_path)
+            if Path(source).suffix.lower() in MINIFIERS:
+                result['bytes_in'] += outcome['bytes_in']
+                result['bytes_out'] += outcome['bytes_out']
+
+    @staticmethod
+    def _collect(rel_path, entry, assets, images, result):
+        """Make a built or skipped file's hashed name and image entry visible to later stages."""
+        if entry.get('asset'):
+            assets[rel_path] = entry['asset']
+        if entry.get('image'):
+            images[rel_path] = entry['image']
+        if 'image_bytes' in entry:
+            result['image_bytes'][rel_path] = entry['image_bytes']
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the minified, precompressed site into dist/.')
+    parser.add_argument('--dir', type=str, default='.',
+                        help='Root directory of your website (default: current directory)')
+    parser.add_argument('--out', type=str, default=None,
+                        help=f'Output directory (default: <dir>/{BUILD_DIR})')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes (0 = one per CPU, default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='Ignore the build cache and rebuild every file')
+    parser.add_argument('--no-critical-css', action='store_true',
+                        help='Keep the render-blocking stylesheet link in every page instead of inlining '
+                             'critical CSS (styles.css is still pruned)')
+    parser.add_argument('--no-prune', action='store_true',
+                        help='Keep the selectors no page uses in styles.css (critical CSS is still inlined)')
+    parser.add_argument('--image-budget', type=int, default=IMAGE_BUDGET_KB, metavar='KB',
+                        help=f'Fail if a page loads more image bytes than this; needs Pillow '
+                             f'(0 = no limit, default: {IMAGE_BUDGET_KB})')
+    args = parser.parse_args()
+
+    root_dir = os.path.abspath(args.dir)
+    if not os.path.isdir(root_dir):
+        print(f"Error: Directory not found: {root_dir}")
+        return 1
+
+    builder = SiteBuilder(root_dir, args.out, jobs=args.jobs, force=args.force,
+                          image_budget=args.image_budget * 1024 or None, critical_css=not args.no_critical_css,
+                          prune=not args.no_prune)
+    print(f"Building {root_dir} -> {builder.out_dir} (jobs: {resolve_jobs(args.jobs)})")
+    if brotli is None:
+        print("⚠ brotli is not installed; writing .gz only (pip install brotli for .br)")
+    if Image is None:
+        print("⚠ Pillow is not installed; images get width/height but no resized variants (pip install Pillow)")
+        if args.image_budget:
+            print("⚠ Without resized variants the image budget is not checked")
+
+    start = time.perf_counter()
+    result = builder.build()
+    elapsed = time.perf_counter() - start
+
+    for rel_path in result['built']:
+        print(f"✓ Built: {rel_path}")
+    for rel_path in result['removed']:
+        print(f"✗ Removed: {rel_path}")
+    for error in result['errors']:
+        print(f"✗ Failed: {error}")
+
+    print(f"\n{'=' * 50}")
+    print("Summary:")
+    print(f"  Built: {len(result['built'])}")
+    print(f"  Unchanged since last build: {len(result['skipped'])}")
+    if result['utilities']:
+        print(f"  Inline styles moved to {UTILITY_STYLESHEET}: {result['utilities']} classes")
+    if result['removed']:
+        print(f"  Removed: {len(result['removed'])}")
+    if result['errors']:
+        print(f"  Failed: {len(result['errors'])}")
+    if result['bytes_in']:
+        saved = result['bytes_in'] - result['bytes_out']
+        print(f"  Minified HTML/CSS/JS: {result['bytes_in'] / 1024:.1f} KB -> {result['bytes_out'] / 1024:.1f} KB "
+              f"({saved / result['bytes_in']:.0%} smaller)")
+    print(f"  Time: {elapsed:.2f}s")
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Critical CSS and unused-selector pruning for build.py.
+
+Every page is tokenized once to collect the tags, classes and ids it uses,
+both overall and above the fold (the header and the first <section>, capped
+at FOLD_CHARS of markup). From those:
+
+- styles.css in dist/ drops every selector no page can match. Class names
+  that scripts add at runtime (any identifier in a script string, e.g.
+  classList.add('active')) count as used.
+- Each page gets the rules its above-the-fold markup matches inlined in a
+  <style> in <head>, and loads the full stylesheet asynchronously
+  (rel=preload, switched to a stylesheet on load, with a <noscript> fallback).
+
+Matching is deliberately conservative: pseudo-classes, pseudo-elements and
+attribute selectors are ignored, so a selector is kept whenever all the tags,
+classes and ids it names occur on the page.
+
+The stylesheet is parsed once per content hash and per-page tokens and match
+results are cached in .insurio-cache/, so a rebuild after editing one page
+only tokenizes and matches that page.
+"""
+
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from fingerprint import resolve_ref
+from html_index import HtmlIndex, apply_splices
+from inline_styles import UTILITY_STYLESHEET, links_stylesheet, parse_declarations, style_key
+from manifest import CACHE_DIR, Manifest, content_hash, file_state, ruleset_version
+
+FOLD_CHARS = 12000
+SITE_STYLESHEET = UTILITY_STYLESHEET
+# Selectors that match every page (html, body, *, :root...) are always critical
+ALWAYS_TAGS = ('html', 'body', '*', '')
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+PSEUDO_RE = re.compile(r'::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?')
+ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+COMPOUND_SPLIT_RE = re.compile(r'\s*[\s>+~]\s*')
+TAG_RE = re.compile(r'^[a-zA-Z][\w-]*|^\*')
+CLASS_RE = re.compile(r'\.((?:\\.|[\w-])+)')
+ID_RE = re.compile(r'#((?:\\.|[\w-])+)')
+SCRIPT_STRING_RE = re.compile(r'"((?:\\.|[^"\\])*)"|\'((?:\\.|[^\'\\])*)\'|`((?:\\.|[^`\\])*)`', re.S)
+IDENT_RE = re.compile(r'[A-Za-z_][\w-]*')
+CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)', re.I)
+
+
+# ---------------------------------------------------------------------------
+# Stylesheet parsing
+# ---------------------------------------------------------------------------
+
+def _find_block_end(css, i):
+    """Index just past the '}' matching the '{' at css[i - 1]."""
+    depth = 1
+    while i < len(css) and depth:
+        c = css[i]
+        if c in '"\'':
+            end = css.find(c, i + 1)
+            i = len(css) if end < 0 else end + 1
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+        i += 1
+    return i
+
+
+def parse_css(css):
+    """
+    Split a stylesheet into items, with nested at-rules expanded:
+      ['rule', [selector, ...], body]
+      ['group', prelude, [items]]     (@media, @supports)
+      ['raw', text]                   (@font-face, @keyframes, @import, ...)
+    """
+    css = CSS_COMMENT_RE.sub('', css)
+    items = []
+    i = 0
+    while i < len(css):
+        while i < len(css) and css[i].isspace():
+            i += 1
+        if i >= len(css):
+            break
+        brace = css.find('{', i)
+        semi = css.find(';', i)
+        if css[i] == '@' and semi >= 0 and (brace < 0 or semi < brace):
+            items.append(['raw', css[i:semi + 1].strip()])
+            i = semi + 1
+            continue
+        if brace < 0:
+            break
+        prelude = css[i:brace].strip()
+        end = _find_block_end(css, brace + 1)
+        body = css[brace + 1:end - 1]
+        if prelude.startswith(('@media', '@supports')):
+            items.append(['group', prelude, parse_css(body)])
+        elif prelude.startswith('@'):
+            items.append(['raw', css[i:end].strip()])
+        else:
+            selectors = [s.strip() for s in prelude.split(',') if s.strip()]
+            items.append(['rule', selectors, body.strip()])
+        i = end
+    return items
+
+
+def serialize(items, keep):
+    """CSS text for items, keeping only the selectors keep(selector) accepts."""
+    out = []
+    for item in items:
+        if item[0] == 'rule':
+            selectors = [selector for selector in item[1] if keep(selector)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{item[2]}}}")
+        elif item[0] == 'group':
+            inner = serialize(item[2], keep)
+            if inner:
+                out.append(f"{item[1]}{{{inner}}}")
+        else:
+            out.append(item[1])
+    return '\n'.join(out)
+
+
+def selector_needs(selector):
+    """Tags, classes and ids a selector requires: [(tag, [classes], [ids]) per compound]."""
+    selector = PSEUDO_RE.sub('', ATTRIBUTE_RE.sub('', selector))
+    compounds = []
+    for compound in COMPOUND_SPLIT_RE.split(selector.strip()):
+        if not compound:
+            continue
+        tag = TAG_RE.match(compound)
+        compounds.append((tag.group().lower() if tag else '',
+                          [name.replace('\\', '') for name in CLASS_RE.findall(compound)],
+                          [name.replace('\\', '') for name in ID_RE.findall(compound)]))
+    return compounds
+
+
+def may_match(selector, tokens):
+    """True unless the selector names a tag, class or id the tokens lack."""
+    for tag, classes, ids in selector_needs(selector):
+        if tag and tag != '*' and tag not in tokens['tags']:
+            return False
+        if any(name not in tokens['classes'] for name in classes):
+            return False
+        if any(name not in tokens['ids'] for name in ids):
+            return False
+    return True
+
+
+def _always(selector):
+    return all(tag in ALWAYS_TAGS and not classes and not ids for tag, classes, ids in selector_needs(selector))
+
+
+# ---------------------------------------------------------------------------
+# Page tokens
+# ---------------------------------------------------------------------------
+
+def element_tokens(nodes):
+    """Tags, classes and ids present among nodes, as sets (the tokens may_match() expects)."""
+    tokens = {'tags': set(), 'classes': set(), 'ids': set()}
+    for node in nodes:
+        tokens['tags'].add(node.tag)
+        tokens['classes'].update(node.classes)
+        if 'id' in node.attrs:
+            tokens['ids'].add(node.attrs['id'])
+    return tokens
+
+
+def _as_lists(tokens):
+    return {key: sorted(values) for key, values in tokens.items()}
+
+
+def _as_sets(tokens):
+    return {key: set(values) for key, values in tokens.items()}
+
+
+def fold_offset(index):
+    """Where the first screen of a page ends: the end of its first <section>, capped at FOLD_CHARS."""
+    body = index.select_one('body')
+    start = body.open_end if body else 0
+    sections = index.by_tag.get('section', [])
+    end = sections[0].end if sections else start + FOLD_CHARS
+    return min(end, start + FOLD_CHARS)
+
+
+def scan_page(text):
+    """
+    Page tokens overall and above the fold, the inline styles above the fold
+    (they may become utility classes) and identifiers in its scripts.
+    """
+    index = HtmlIndex(text)
+    fold = fold_offset(index)
+    above = [node for node in index.elements if node.start < fold]
+    styles = set()
+    for node in above:
+        declarations = parse_declarations(node.attrs.get('style', ''))
+        if declarations:
+            styles.add(style_key(declarations))
+    return {
+        'all': _as_lists(element_tokens(index.elements)),
+        'fold': _as_lists(element_tokens(above)),
+        'fold_styles': sorted(styles),
+        'script': sorted(script_identifiers(node.inner(text) for node in index.by_tag.get('script', []))),
+    }
+
+
+def script_identifiers(scripts):
+    """Every identifier inside a string literal, the class names a script might add."""
+    names = set()
+    for script in scripts:
+        for m in SCRIPT_STRING_RE.finditer(script):
+            names.update(IDENT_RE.findall(m.group(m.lastindex or 0)))
+    return names
+
+
+def absolute_urls(css, base_dir):
+    """Make relative url()s root-relative so rules keep working when inlined into any page."""
+    def replace(m):
+        quote, url = m.groups()
+        rel_path = resolve_ref(url, base_dir)
+        if not rel_path or url.strip().startswith('/'):
+            return m.group()
+        return f"url({quote}/{rel_path}{quote})"
+    return CSS_URL_RE.sub(replace, css)
+
+
+def inline_critical_css(text, base_dir, css, stylesheet=SITE_STYLESHEET):
+    """
+    Inline css in <style> ahead of the page's stylesheet <link>, and turn
+    that link into an asynchronous load.
+    """
+    index = HtmlIndex(text)
+    for node in index.by_tag.get('link', []):
+        if 'stylesheet' not in node.attrs.get('rel', '').lower().split():
+            continue
+        if resolve_ref(node.attrs.get('href', ''), base_dir) != stylesheet:
+            continue
+        href = node.attrs['href']
+        replacement = (f'<style>{css}</style>'
+                       f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+                       f'<noscript><link rel="stylesheet" href="{href}"></noscript>')
+        return apply_splices(text, [(node.start, node.end, replacement)])
+    return text
+
+
+class CriticalCss:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.cache = Manifest(self.root, 'critical_css')
+        self.parsed_path = self.root / CACHE_DIR / 'stylesheet.json'
+        self.pages = {}  # relative path -> scan_page() result
+        self.scripts = set()
+
+    def scan(self, sources, version):
+        """
+        Tokenize every page that loads the site stylesheet and collect script
+        identifiers from every page and .js file; unchanged files come from the cache.
+        """
+        self.pages = {}
+        self.scripts = set()
+        for source in sources:
+            suffix = Path(source).suffix.lower()
+            if suffix not in ('.html', '.htm', '.js'):
+                continue
+            rel_path = self.cache.key(source)
+            entry = self.cache.entries.get(rel_path)
+            if not self.cache.is_fresh(source, version):
+                data = Path(source).read_bytes()
+                text = data.decode('utf-8')
+                if suffix == '.js':
+                    scan = {'script': sorted(script_identifiers([text]))}
+                else:
+                    scan = scan_page(text)
+                    if not links_stylesheet(HtmlIndex(text), text, posixpath.dirname(rel_path)):
+                        scan = {'script': scan['script']}
+                self.cache.record(source, version, dict(file_state(source, data), scan=scan))
+                entry = self.cache.entries[rel_path]
+            self.scripts.update(entry['scan']['script'])
+            if 'all' in entry['scan']:
+                self.pages[rel_path] = entry
+        current = {self.cache.key(source) for source in sources}
+        for key in set(self.cache.entries) - current:
+            del self.cache.entries[key]
+            self.cache.dirty = True
+
+    def site_tokens(self, extra_classes=()):
+        """Tokens any page (or script) can produce, for pruning the shared stylesheet."""
+        tokens = {'tags': set(), 'classes': set(extra_classes), 'ids': set()}
+        for entry in self.pages.values():
+            for key, values in entry['scan']['all'].items():
+                tokens[key].update(values)
+        for key in tokens:
+            tokens[key] |= self.scripts
+        return _as_lists(tokens)
+
+    def parse(self, css):
+        """parse_css(css), cached by content hash."""
+        digest = content_hash(css.encode('utf-8'))
+        try:
+            with open(self.parsed_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('hash') == digest:
+                return digest, cached['items']
+        except (OSError, ValueError):
+            pass
+        items = parse_css(css)
+        self.parsed_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.parsed_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'hash': digest, 'items': items}, f)
+        os.replace(tmp_path, self.parsed_path)
+        return digest, items
+
+    def page_css(self, css, utilities):
+        """
+        Critical CSS for every scanned page: {relative path: css text}.
+        utilities maps inline styles to the classes that will replace them.
+        Match results are cached per page against the stylesheet hash.
+        """
+        digest, items = self.parse(absolute_urls(css, posixpath.dirname(SITE_STYLESHEET)))
+        critical = {}
+        for rel_path, entry in self.pages.items():
+            fold = entry['scan']['fold']
+            extra_classes = sorted(utilities[key] for key in entry['scan']['fold_styles'] if key in utilities)
+            match_key = ruleset_version(digest, fold, extra_classes)
+            if entry.get('match_key') != match_key:
+                tokens = _as_sets(fold)
+                tokens['classes'].update(extra_classes)
+                entry['critical'] = serialize(items, lambda s: _always(s) or may_match(s, tokens))
+                entry['match_key'] = match_key
+                self.cache.dirty = True
+            critical[rel_path] = entry['critical']
+        return critical
+
+    def save(self):
+        self.cache.save()
+
+
+def prune_css(css, tokens):
+    """Drop every selector that cannot match anything the site produces."""
+    tokens = _as_sets(tokens)
+    return serialize(parse_css(css), lambda selector: _always(selector) or may_match(selector, tokens))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Content-hash fingerprinting for build.py.
+
+Stylesheets, scripts, images and fonts are written to dist/ under names that
+include a hash of their bytes (styles.css -> styles.3f9a1c2e.css), so they
+can be served with long-lived immutable cache headers. The mapping from
+source path to hashed path is written to dist/asset-manifest.json, and every
+reference to an asset is rewritten: src, href, srcset, poster and meta
+content attributes in HTML, url() in stylesheets, <style> blocks and style
+attributes. Each page is tokenized once and all of its references are
+spliced in a single pass.
+
+A reference is rewritten only if it resolves to a site asset: relative
+('../images/logo.webp'), root-relative ('/images/logo.webp') or absolute on
+the site's own origin ('https://insurio.ca/images/og-image.jpg'). Only the
+file name changes, so a reference keeps its original form.
+"""
+
+import json
+import os
+import posixpath
+import re
+from urllib.parse import urlsplit
+
+from html_index import HtmlIndex, apply_splices
+from manifest import content_hash
+
+ASSET_MANIFEST = 'asset-manifest.json'
+HASH_LENGTH = 8
+
+# Files served under hashed names (pages, sitemap and robots.txt keep theirs)
+FINGERPRINT_SUFFIXES = ('.css', '.js', '.webp', '.png', '.jpg', '.jpeg', '.gif', '.avif', '.svg',
+                        '.ico', '.woff', '.woff2')
+SITE_ORIGINS = ('https://insurio.ca', 'https://www.insurio.ca', 'http://insurio.ca', 'http://www.insurio.ca')
+
+# Attributes that hold a single URL, and attributes that hold a srcset list
+URL_ATTRS = ('src', 'href', 'poster', 'data-src', 'content')
+SRCSET_ATTRS = ('srcset', 'data-srcset', 'imagesrcset')
+CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)', re.I)
+
+
+def hashed_name(rel_path, data):
+    """'images/logo.webp' -> 'images/logo.<hash>.webp' for the given output bytes."""
+    stem, ext = posixpath.splitext(rel_path)
+    return f"{stem}.{content_hash(data)[:HASH_LENGTH]}{ext}"
+
+
+def resolve_ref(url, base_dir):
+    """
+    Site-relative path that url points at from a file in base_dir, or None
+    for external, data:, mailto:, fragment-only and similar URLs.
+    """
+    url = url.strip()
+    for origin in SITE_ORIGINS:
+        if url.startswith(origin + '/'):
+            url = url[len(origin):]
+            break
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    if parts.path.startswith('/'):
+        path = parts.path.lstrip('/')
+    else:
+        path = posixpath.join(base_dir, parts.path)
+    path = posixpath.normpath(path)
+    return None if path.startswith('..') else path
+
+
+def rewrite_url(url, base_dir, assets):
+    """url with its file name replaced by the hashed one, or url unchanged."""
+    rel_path = resolve_ref(url, base_dir)
+    hashed = assets.get(rel_path) if rel_path else None
+    if not hashed:
+        return url
+    url = url.strip()
+    path = urlsplit(url).path
+    # The path comes before any ?query or #fragment, which are kept as they are
+    end = url.index(path) + len(path)
+    return url[:end - len(posixpath.basename(path))] + posixpath.basename(hashed) + url[end:]
+
+
+def rewrite_srcset(value, base_dir, assets):
+    candidates = []
+    for candidate in value.split(','):
+        parts = candidate.strip().split(None, 1)
+        if parts:
+            parts[0] = rewrite_url(parts[0], base_dir, assets)
+        candidates.append(' '.join(parts))
+    return ', '.join(candidates)
+
+
+def rewrite_css_urls(css, base_dir, assets):
+    """Rewrite every url() in a stylesheet (or style attribute) relative to base_dir."""
+    def replace(m):
+        quote, url = m.groups()
+        new_url = rewrite_url(url, base_dir, assets)
+        if new_url == url:
+            return m.group()
+        return f"url({quote}{new_url}{quote})"
+    return CSS_URL_RE.sub(replace, css)
+
+
+def rewrite_html_refs(html, base_dir, assets):
+    """Rewrite every asset reference in a page with one tokenization and one splice pass."""
+    index = HtmlIndex(html)
+    splices = []
+    for node in index.elements:
+        for name in URL_ATTRS + SRCSET_ATTRS + ('style',):
+            span = node.attr_span(name, html)
+            if span is None:
+                continue
+            value = html[span[0]:span[1]]
+            if name == 'style':
+                new_value = rewrite_css_urls(value, base_dir, assets)
+            elif name in SRCSET_ATTRS:
+                new_value = rewrite_srcset(value, base_dir, assets)
+            else:
+                new_value = rewrite_url(value, base_dir, assets)
+            if new_value != value:
+                splices.append((span[0], span[1], new_value))
+        if node.tag == 'style':
+            css = node.inner(html)
+            new_css = rewrite_css_urls(css, base_dir, assets)
+            if new_css != css:
+                splices.append((node.open_end, node.close_start, new_css))
+    return apply_splices(html, splices)
+
+
+def write_asset_manifest(path, assets):
+    """Write {source path: hashed path} as JSON, atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(assets.items())), f, indent=1)
+    os.replace(tmp_path, path)
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+Collect form submissions locally, in batches, instead of one appendRow each.
+
+CLIENT-FORM-SCRIPT.js and PARTNER-FORM-SCRIPT.js handle every POST alone:
+getLastRow, appendRow, getLastRow again, setNumberFormat, then a blocking
+MailApp.sendEmail, all before the visitor gets an answer. This service
+accepts the same fields over HTTP (POST /submit/client, /submit/partner;
+form-encoded, multipart FormData or JSON) and:
+
+- queues each submission and writes the queue in batches (up to
+  --batch-size rows, or whatever arrived within --batch-ms) to SQLite
+  (one table per form) or CSV (one file per form, HEADERS as the first row);
+- answers once the batch holding the submission is committed, with the same
+  JSON the Apps Script returns, so nothing is acknowledged and then lost;
+- sends notification emails from a separate task, a digest when several
+  arrive together, so a slow mail server never delays a response.
+
+Rows use the scripts' HEADERS columns in the same order. The botcheck
+honeypot field the pages include is honoured: such submissions are
+acknowledged and dropped.
+
+--bench fires submissions at the service and at a stand-in for the current
+Apps Script (serialized, with SHEET_CALL_MS per sheet call and MAIL_MS for
+the email, written to CSV) and reports throughput and latency for both.
+
+Usage:
+    python form_ingest.py                                  # SQLite in form-submissions.db on :8090
+    python form_ingest.py --store csv --out submissions/   # CSV files
+    python form_ingest.py --notify-email you@insurio.ca --smtp localhost:25
+    python form_ingest.py --bench 200                      # benchmark
+"""
+
+import argparse
+import asyncio
+import csv
+import datetime
+import email.parser
+import email.policy
+import json
+import os
+import smtplib
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from urllib.parse import parse_qs, urlsplit
+
+from loadtest import percentile, read_response
+
+DEFAULT_PORT = 8090
+DEFAULT_DB = 'form-submissions.db'
+BATCH_SIZE = 100
+BATCH_MS = 50
+QUEUE_LIMIT = 10000
+MAX_BODY = 64 * 1024
+MAX_FIELD_CHARS = 5000
+# Cell prefixes Sheets and Excel treat as a formula
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Rough Apps Script costs for the --bench stand-in: one round-trip per sheet call, and the email
+SHEET_CALL_MS = 25
+MAIL_MS = 100
+
+# (column, form field, value when the field is absent), in the scripts' HEADERS order after Timestamp
+CLIENT_COLUMNS = [
+    ('Name', 'name', ''),
+    ('Email', 'email', ''),
+    ('Phone', 'phone', ''),
+    ('Age', 'age', ''),
+    ('Mortgage Amount', 'mortgage_amount', ''),
+    ('Coverage Interest', 'coverage_interest', ''),
+    ('Referrer', 'referrer', ''),
+    ('Notes', 'notes', ''),
+]
+PARTNER_COLUMNS = [
+    ('Name', 'name', ''),
+    ('Company', 'company', ''),
+    ('Email', 'email', ''),
+    ('Phone', 'phone', ''),
+    ('Role', 'role', ''),
+    ('Notes', 'notes', ''),
+    ('Status', None, 'New'),
+]
+
+# form -> (notification subject, columns, success message)
+FORMS = {
+    'client': ('🏠 New Client Inquiry', CLIENT_COLUMNS, 'Form submitted successfully!'),
+    'partner': ('🤝 New Partner Application', PARTNER_COLUMNS, 'Application submitted successfully!'),
+}
+
+
+def headers_for(form):
+    return ['Timestamp'] + [column for column, _, _ in FORMS[form][1]]
+
+
+def make_row(form, fields):
+    """A submission as a row in HEADERS order, timestamped like setNumberFormat('yyyy-mm-dd hh:mm:ss')."""
+    row = [datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
+    for _, field, default in FORMS[form][1]:
+        value = fields.get(field, '') if field else ''
+        row.append(value[:MAX_FIELD_CHARS] if value else default)
+    return row
+
+
+def parse_body(content_type, body):
+    """Form fields from a form-encoded, multipart or JSON body: {name: first value}."""
+    content_type = content_type.lower()
+    if content_type.startswith('application/json'):
+        data = json.loads(body.decode('utf-8') or '{}')
+        if not isinstance(data, dict):
+            return {}
+        # Nested objects and lists are kept as JSON text, not as a Python repr
+        return {str(k): (json.dumps(v) if isinstance(v, (dict, list)) else str(v)).strip()
+                for k, v in data.items() if v is not None}
+    if content_type.startswith('multipart/form-data'):
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body)
+        fields = {}
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name and name not in fields and not part.get_filename():
+                fields[name] = part.get_content().strip() if part.get_content_maintype() == 'text' else ''
+        return fields
+    return {name: values[0].strip() for name, values in parse_qs(body.decode('utf-8')).items()}
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+class SqliteStore:
+    """One table per form, columns named after HEADERS. Used from a single writer thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self.db = None
+
+    def _connect(self):
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        # FULL syncs the WAL on every commit; NORMAL could lose acknowledged batches on power loss
+        self.db.execute('PRAGMA synchronous=FULL')
+        for form in FORMS:
+            columns = ', '.join(f'"{name}" TEXT' for name in headers_for(form))
+            self.db.execute(f'CREATE TABLE IF NOT EXISTS "{form}" ({columns})')
+        self.db.commit()
+
+    def write(self, batches):
+        """Append {form: [rows]} in one transaction."""
+        if self.db is None:
+            self._connect()
+        with self.db:
+            for form, rows in batches.items():
+                placeholders = ', '.join('?' * len(headers_for(form)))
+                self.db.executemany(f'INSERT INTO "{form}" VALUES ({placeholders})', rows)
+
+    def count(self, form):
+        if self.db is None:
+            self._connect()
+        return self.db.execute(f'SELECT COUNT(*) FROM "{form}"').fetchone()[0]
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+
+
+def csv_safe(value):
+    """
+    A cell value that spreadsheets will not evaluate: values starting with
+    = + - @ (or a tab/CR) get a leading ', so '=HYPERLINK(...)' stays text.
+    """
+    return "'" + value if value.startswith(CSV_FORMULA_PREFIXES) else value
+
+
+class CsvStore:
+    """
+    One CSV per form in a directory; HEADERS are written when a file is
+    created. Submitted values are escaped with csv_safe().
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, form):
+        return os.path.join(self.directory, f"{form}.csv")
+
+    def write(self, batches):
+        os.makedirs(self.directory, exist_ok=True)
+        for form, rows in batches.items():
+            path = self.path(form)
+            new = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new:
+                    writer.writerow(headers_for(form))
+                writer.writerows([[csv_safe(value) for value in row] for row in rows])
+                f.flush()
+                os.fsync(f.fileno())
+
+    def count(self, form):
+        try:
+            with open(self.path(form), newline='', encoding='utf-8') as f:
+                return max(0, sum(1 for _ in csv.reader(f)) - 1)
+        except OSError:
+            return 0
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Queue, batch writer and notifier
+# ---------------------------------------------------------------------------
+
+class Notifier:
+    """Sends notification emails from its own task; failures are printed, never raised to a request."""
+
+    def __init__(self, to=None, smtp=None, sender='forms@insurio.ca', quiet=False):
+        self.to = to
+        self.smtp = smtp
+        self.sender = sender
+        self.quiet = quiet
+        self.queue = asyncio.Queue()
+        self.sent = 0
+
+    def enqueue(self, form, row):
+        self.queue.put_nowait((form, row))
+
+    @staticmethod
+    def describe(form, row):
+        lines = [f"{column}: {value or 'Not provided'}" for column, value in zip(headers_for(form), row)]
+        return '\n'.join(lines)
+
+    def _send(self, subject, body):
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = self.sender
+        message['To'] = self.to
+        message.set_content(body)
+        host, _, port = self.smtp.partition(':')
+        with smtplib.SMTP(host, int(port or 25), timeout=30) as server:
+            server.send_message(message)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            while not self.queue.empty():
+                pending.append(self.queue.get_nowait())
+            if len(pending) == 1:
+                form, row = pending[0]
+                subject = f"{FORMS[form][0]} - {row[1]}"
+            else:
+                subject = f"📬 {len(pending)} new submissions from insurio.ca"
+            body = '\n\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n'.join(
+                f"{FORMS[form][0]}\n{self.describe(form, row)}" for form, row in pending)
+            if self.to and self.smtp:
+                try:
+                    await loop.run_in_executor(None, self._send, subject, body)
+                    self.sent += 1
+                except (OSError, smtplib.SMTPException) as e:
+                    print(f"⚠️  Notification failed ({len(pending)} submissions): {e}")
+            elif not self.quiet:
+                print(f"📧 {subject}")
+
+
+class Ingestor:
+    """
+    Queues submissions and writes them in batches. submit() returns once the
+    submission's batch is committed, so a batch write is one transaction (or
+    one fsync per CSV) shared by every request waiting on it.
+    """
+
+    def __init__(self, store, notifier=None, batch_size=BATCH_SIZE, batch_ms=BATCH_MS, queue_limit=QUEUE_LIMIT):
+        self.store = store
+        self.notifier = notifier
+        self.batch_size = batch_size
+        self.batch_s = batch_ms / 1000
+        self.queue = asyncio.Queue(maxsize=queue_limit)
+        # A single writer thread keeps the store's connection on one thread
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.rows = 0
+        self.batches = 0
+
+    async def submit(self, form, fields):
+        """Raises asyncio.QueueFull when the service is saturated, or the write error."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((form, make_row(form, fields), future))
+        await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_s
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            grouped = {}
+            for form, row, _ in batch:
+                grouped.setdefault(form, []).append(row)
+            try:
+                await loop.run_in_executor(self.executor, self.store.write, grouped)
+            except Exception as e:
+                print(f"✗ Batch of {len(batch)} failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.rows += len(batch)
+            self.batches += 1
+            for form, row, future in batch:
+                if not future.done():
+                    future.set_result(None)
+                if self.notifier:
+                    self.notifier.enqueue(form, row)
+
+    def close(self):
+        self.executor.submit(self.store.close).result()
+        self.executor.shutdown()
+
+
+class SheetStandIn:
+    """
+    The current Apps Script flow, for --bench: one submission at a time,
+    four sheet calls and a synchronous email each, rows appended to a CSV.
+    """
+
+    def __init__(self, directory, sheet_call_ms=SHEET_CALL_MS, mail_ms=MAIL_MS):
+        self.store = CsvStore(directory)
+        self.sheet_call_s = sheet_call_ms / 1000
+        self.mail_s = mail_ms / 1000
+        self.lock = asyncio.Lock()
+        self.rows = 0
+
+    async def submit(self, form, fields):
+        async with self.lock:
+            await asyncio.sleep(self.sheet_call_s)  # getLastRow
+            self.store.write({form: [make_row(form, fields)]})  # appendRow
+            await asyncio.sleep(self.sheet_call_s * 3)  # appendRow, getLastRow, setNumberFormat
+            await asyncio.sleep(self.mail_s)  # MailApp.sendEmail
+            self.rows += 1
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+REASONS = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+CORS_HEADERS = [('Access-Control-Allow-Origin', '*'),
+                ('Access-Control-Allow-Methods', 'POST, OPTIONS'),
+                ('Access-Control-Allow-Headers', 'Content-Type')]
+
+
+class FormServer:
+    """HTTP/1.1 front end; sink is an Ingestor or a SheetStandIn."""
+
+    def __init__(self, sink, log=False):
+        self.sink = sink
+        self.log = log
+
+    async def respond(self, method, target, headers, body):
+        """Returns: (status, JSON-serialisable payload or None)"""
+        path = urlsplit(target).path.rstrip('/')
+        if method == 'OPTIONS':
+            return 204, None
+        if method == 'GET' and path == '/health':
+            return 200, {'result': 'ok', 'rows': getattr(self.sink, 'rows', 0),
+                         'batches': getattr(self.sink, 'batches', 0)}
+        form = path.rsplit('/', 1)[-1]
+        if form not in FORMS or not path.startswith('/submit/'):
+            return 404, {'result': 'error', 'message': 'Unknown form'}
+        if method != 'POST':
+            return 405, {'result': 'error', 'message': 'Use POST'}
+        try:
+            fields = parse_body(headers.get('content-type', ''), body)
+        except (ValueError, UnicodeDecodeError) as e:
+            return 400, {'result': 'error', 'message': f"Could not read form: {e}"}
+        if not fields.get('botcheck') and any(fields.get(field) for _, field, _ in FORMS[form][1] if field):
+            try:
+                await self.sink.submit(form, fields)
+            except asyncio.QueueFull:
+                return 503, {'result': 'error', 'message': 'Busy, please try again'}
+            except Exception as e:
+                return 500, {'result': 'error', 'message': str(e)}
+        elif not fields.get('botcheck'):
+            return 400, {'result': 'error', 'message': 'Empty submission'}
+        return 200, {'result': 'success', 'message': FORMS[form][2]}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+                headers = {}
+                while len(headers) <= 100:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    await self.send(writer, 400, None, False)
+                    break
+                method, target, version = parts
+                if 'transfer-encoding' in headers:
+                    # Chunked bodies are not read; the unread chunks would be parsed as the next request
+                    await self.send(writer, 411, {'result': 'error', 'message': 'Content-Length required'}, False)
+                    break
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY:
+                    await self.send(writer, 413, {'result': 'error', 'message': 'Too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                status, payload = await self.respond(method, target, headers, body)
+                await self.send(writer, status, payload, keep_alive)
+                if self.log:
+                    print(f"{method} {target} {status}")
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def send(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+        lines += [f"{name}: {value}" for name, value in CORS_HEADERS]
+        if payload is not None:
+            lines.append('Content-Type: application/json')
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(ingestor, notifier, host, port, log=False):
+    tasks = [asyncio.create_task(ingestor.run()), asyncio.create_task(notifier.run())]
+    listener = await asyncio.start_server(FormServer(ingestor, log=log).handle, host, port, backlog=1024)
+    bound = listener.sockets[0].getsockname()
+    print(f"📝 Accepting submissions at http://{bound[0]}:{bound[1]}/submit/{{{','.join(FORMS)}}}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+async def _post_many(port, total, concurrency):
+    """POST total client submissions over concurrency keep-alive connections. Returns: (latencies, errors, seconds)"""
+    latencies = []
+    errors = [0]
+    remaining = [total]
+
+    async def client(n):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            body = (f"name=Bench+{n}&email=bench{n}%40example.com&phone=403-555-0100&age=35"
+                    f"&mortgage_amount=500k-750k&coverage_interest=Life&notes=benchmark").encode('ascii')
+            request = (f"POST /submit/client HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                       f"Content-Type: application/x-www-form-urlencoded\r\nContent-Length: {len(body)}\r\n\r\n")
+            started = time.perf_counter()
+            writer.write(request.encode('ascii') + body)
+            status, _, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors[0] += 1
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return sorted(latencies), errors[0], time.perf_counter() - started
+
+
+async def _bench_one(sink, total, concurrency):
+    listener = await asyncio.start_server(FormServer(sink).handle, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        return await _post_many(port, total, concurrency)
+
+
+async def bench(total, concurrency, sheet_call_ms, mail_ms):
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+
+        stand_in = SheetStandIn(os.path.join(tmp, 'sheet'), sheet_call_ms, mail_ms)
+        results.append(('Apps Script stand-in', await _bench_one(stand_in, total, concurrency),
+                        stand_in.store.count('client')))
+
+        for label, store in (('ingest → SQLite', SqliteStore(os.path.join(tmp, 'bench.db'))),
+                             ('ingest → CSV', CsvStore(os.path.join(tmp, 'csv')))):
+            notifier = Notifier(quiet=True)
+            ingestor = Ingestor(store, notifier)
+            tasks = [asyncio.create_task(ingestor.run()), asyncio.create_task(notifier.run())]
+            measured = await _bench_one(ingestor, total, concurrency)
+            for task in tasks:
+                task.cancel()
+            rows = await asyncio.get_running_loop().run_in_executor(ingestor.executor, store.count, 'client')
+            ingestor.close()
+            results.append((f"{label} ({ingestor.batches} batches)", measured, rows))
+        return results
+
+
+def print_bench(results, total, concurrency, sheet_call_ms, mail_ms):
+    print(f"⏱️  {total} submissions, {concurrency} concurrent "
+          f"(stand-in: {sheet_call_ms}ms per sheet call, {mail_ms}ms email)\n")
+    print(f"  {'target':<34} {'subs/s':>9} {'p50':>9} {'p99':>9} {'max':>9} {'rows':>6} {'errors':>6}")
+    for label, (latencies, errors, seconds), rows in results:
+        ms = [percentile(latencies, pct) * 1000 for pct in (50, 99, 100)]
+        print(f"  {label:<34} {len(latencies) / seconds:>9.0f} {ms[0]:>7.1f}ms {ms[1]:>7.1f}ms "
+              f"{ms[2]:>7.1f}ms {rows:>6} {errors:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Accept form submissions and write them to SQLite or CSV in batches.')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--store', choices=('sqlite', 'csv'), default='sqlite',
+                        help='Where submissions go (default: sqlite)')
+    parser.add_argument('--out', type=str, default=None,
+                        help=f'SQLite file or CSV directory (default: {DEFAULT_DB} or submissions/)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f'Most submissions per write (default: {BATCH_SIZE})')
+    parser.add_argument('--batch-ms', type=int, default=BATCH_MS,
+                        help=f'How long a batch waits to fill up (default: {BATCH_MS})')
+    parser.add_argument('--notify-email', type=str, default=None,
+                        help='Send notifications to this address (needs --smtp)')
+    parser.add_argument('--smtp', type=str, default=None,
+                        help='SMTP server as host[:port]')
+    parser.add_argument('--log', action='store_true',
+                        help='Print one line per request')
+    parser.add_argument('--bench', type=int, default=0, metavar='N',
+                        help='Benchmark N submissions against the service and an Apps Script stand-in')
+    parser.add_argument('--concurrency', '-c', type=int, default=50,
+                        help='Concurrent clients for --bench (default: 50)')
+    parser.add_argument('--sheet-latency-ms', type=int, default=SHEET_CALL_MS,
+                        help=f'Stand-in cost of one sheet call for --bench (default: {SHEET_CALL_MS})')
+    parser.add_argument('--mail-latency-ms', type=int, default=MAIL_MS,
+                        help=f'Stand-in cost of sending the email for --bench (default: {MAIL_MS})')
+    args = parser.parse_args()
+
+    if args.bench:
+        results = asyncio.run(bench(args.bench, args.concurrency, args.sheet_latency_ms, args.mail_latency_ms))
+        print_bench(results, args.bench, args.concurrency, args.sheet_latency_ms, args.mail_latency_ms)
+        return 0
+
+    if args.store == 'sqlite':
+        store = SqliteStore(args.out or DEFAULT_DB)
+    else:
+        store = CsvStore(args.out or 'submissions')
+    if args.notify_email and not args.smtp:
+        print("⚠️  --notify-email needs --smtp; notifications will only be printed")
+
+    async def run():
+        notifier = Notifier(args.notify_email, args.smtp)
+        ingestor = Ingestor(store, notifier, batch_size=args.batch_size, batch_ms=args.batch_ms)
+        try:
+            await serve(ingestor, notifier, args.host, args.port, log=args.log)
+        finally:
+            print(f"\nStored {ingestor.rows} submissions in {ingestor.batches} batches")
+            ingestor.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
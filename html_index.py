@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Single-pass HTML tokenizer with a selector index.
+
+HtmlIndex scans a page once and records the offsets of every element and
+comment, indexed by tag, class and id. Edits are then expressed against
+selectors and applied as offset splices, so a page is tokenized once no
+matter how many edits target it, and edits do not depend on the exact
+whitespace between tags.
+
+Supported selectors (enough for our own markup, not full CSS):
+    tag  .class  #id  [attr]  [attr=value]  tag.class#id...
+    :has(selector)           -- element containing a match
+    ancestor descendant      -- descendant combinator
+    <!-- Stats -->           -- an HTML comment, matched on its stripped text
+
+Example:
+    index = HtmlIndex(content)
+    splices = [splice(el, 'replace', NEW_NAV) for el in index.select('ul.nav-links')]
+    content = apply_splices(content, splices)
+"""
+
+import re
+from functools import lru_cache
+
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr',
+])
+
+# Elements whose content is not markup; scanning jumps straight to the close tag
+RAW_TEXT_ELEMENTS = frozenset(['script', 'style', 'textarea', 'title'])
+
+TOKEN_RE = re.compile(
+    r'<!--(.*?)-->'                                                  # 1: comment
+    r'|<(/?)([a-zA-Z][a-zA-Z0-9-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>'  # 2: slash, 3: tag, 4: attrs
+    r'|<[!?][^>]*>',                                                 # doctype, CDATA, processing instruction
+    re.DOTALL,
+)
+ATTR_RE = re.compile(r'([^\s"\'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+)))?')
+_RAW_CLOSE_RE = {}
+
+
+def _raw_close(tag):
+    pattern = _RAW_CLOSE_RE.get(tag)
+    if pattern is None:
+        pattern = _RAW_CLOSE_RE[tag] = re.compile(rf'</{tag}\s*>', re.IGNORECASE)
+    return pattern
+
+
+class Node:
+    """
+    An element or comment located by offsets into the page text.
+
+    start/end            -- the whole element, open tag to end of close tag
+    open_end/close_start -- its content; equal to end for void or comment nodes
+    """
+
+    __slots__ = ('tag', 'attrs_text', 'start', 'open_end', 'close_start', 'end',
+                 'parent', 'text', '_attrs')
+
+    def __init__(self, tag, start, open_end, parent, attrs_text='', text=None):
+        self.tag = tag
+        self.attrs_text = attrs_text
+        self.start = start
+        self.open_end = open_end
+        self.close_start = open_end
+        self.end = open_end
+        self.parent = parent
+        self.text = text
+        self._attrs = None
+
+    @property
+    def attrs(self):
+        """Attributes of the open tag, parsed on first use."""
+        if self._attrs is None:
+            self._attrs = {}
+            for m in ATTR_RE.finditer(self.attrs_text):
+                value = next((v for v in m.group(2, 3, 4) if v is not None), '')
+                self._attrs.setdefault(m.group(1).lower(), value)
+        return self._attrs
+
+    @property
+    def classes(self):
+        return self.attrs.get('class', '').split()
+
+    def attr_span(self, name, text):
+        """(start, end) offsets of the value of attribute name within text, or None."""
+        base = self.start + 1 + len(self.tag)
+        for m in ATTR_RE.finditer(self.attrs_text):
+            if m.group(1).lower() == name:
+                for group in (2, 3, 4):
+                    if m.group(group) is not None:
+                        return base + m.start(group), base + m.end(group)
+                return None
+        return None
+
+    def attr_full_span(self, name, text):
+        """(start, end) offsets of the whole attribute, with its leading whitespace, or None."""
+        base = self.start + 1 + len(self.tag)
+        for m in ATTR_RE.finditer(self.attrs_text):
+            if m.group(1).lower() == name:
+                start = base + m.start()
+                while start > base and text[start - 1].isspace():
+                    start -= 1
+                return start, base + m.end()
+        return None
+
+    def outer(self, text):
+        return text[self.start:self.end]
+
+    def inner(self, text):
+        return text[self.open_end:self.close_start]
+
+    def is_inside(self, other):
+        node = self.parent
+        while node is not None:
+            if node is other:
+                return True
+            node = node.parent
+        return False
+
+    def __repr__(self):
+        return f"<{self.tag} @{self.start}:{self.end}>"
+
+
+class HtmlIndex:
+    def __init__(self, text):
+        self.text = text
+        self.elements = []
+        self.comments = []
+        self.by_tag = {}
+        self.by_class = {}
+        self.by_id = {}
+        self._tokenize()
+
+    def _tokenize(self):
+        text = self.text
+        stack = []
+        pos = 0
+        search = TOKEN_RE.search
+
+        while True:
+            m = search(text, pos)
+            if m is None:
+                break
+            pos = m.end()
+            parent = stack[-1] if stack else None
+
+            if m.group(1) is not None:
+                node = Node('#comment', m.start(), pos, parent, text=m.group(1).strip())
+                self.comments.append(node)
+                continue
+
+            tag = m.group(3)
+            if tag is None:
+                continue
+            tag = tag.lower()
+
+            if m.group(2):
+                # Close tag: implicitly close anything left open inside it (e.g. <li>, <p>)
+                for depth in range(len(stack) - 1, -1, -1):
+                    if stack[depth].tag == tag:
+                        for node in stack[depth + 1:]:
+                            node.close_start = node.end = m.start()
+                        stack[depth].close_start = m.start()
+                        stack[depth].end = pos
+                        del stack[depth:]
+                        break
+                continue
+
+            attrs_text = m.group(4)
+            node = Node(tag, m.start(), pos, parent, attrs_text)
+            self._add(node)
+
+            if tag in VOID_ELEMENTS or attrs_text.rstrip().endswith('/'):
+                continue
+            if tag in RAW_TEXT_ELEMENTS:
+                close = _raw_close(tag).search(text, pos)
+                node.close_start = close.start() if close else len(text)
+                node.end = pos = close.end() if close else len(text)
+                continue
+            stack.append(node)
+
+        for node in stack:
+            node.close_start = node.end = len(text)
+
+    def _add(self, node):
+        self.elements.append(node)
+        self.by_tag.setdefault(node.tag, []).append(node)
+        if 'class' in node.attrs_text:
+            for cls in node.classes:
+                self.by_class.setdefault(cls, []).append(node)
+        if 'id' in node.attrs_text:
+            node_id = node.attrs.get('id')
+            if node_id:
+                self.by_id.setdefault(node_id, []).append(node)
+
+    def select(self, selector):
+        """All nodes matching selector, in document order."""
+        selector = selector.strip()
+        if selector.startswith('<!--'):
+            wanted = selector[4:-3].strip() if selector.endswith('-->') else selector[4:].strip()
+            return [node for node in self.comments if node.text == wanted]
+
+        parts = _parse_selector(selector)
+        matches = self._select_compound(parts[-1])
+        for compound in reversed(parts[:-1]):
+            ancestors = self._select_compound(compound)
+            matches = [node for node in matches if any(node.is_inside(a) for a in ancestors)]
+        return matches
+
+    def select_one(self, selector):
+        matches = self.select(selector)
+        return matches[0] if matches else None
+
+    def _select_compound(self, compound):
+        tag, node_id, classes, attrs, has = compound
+        if node_id is not None:
+            candidates = self.by_id.get(node_id, [])
+        elif classes:
+            candidates = self.by_class.get(classes[0], [])
+        elif tag is not None:
+            candidates = self.by_tag.get(tag, [])
+        else:
+            candidates = self.elements
+
+        result = []
+        for node in candidates:
+            if tag is not None and node.tag != tag:
+                continue
+            if node_id is not None and node.attrs.get('id') != node_id:
+                continue
+            if classes and not set(classes).issubset(node.classes):
+                continue
+            if any(name not in node.attrs or (value is not None and node.attrs[name] != value)
+                   for name, value in attrs):
+                continue
+            result.append(node)
+
+        if has is not None:
+            inner = self.select(has)
+            result = [node for node in result if any(m.is_inside(node) for m in inner)]
+        return result
+
+
+COMPOUND_RE = re.compile(
+    r'(?P<tag>[a-zA-Z][a-zA-Z0-9-]*|\*)'
+    r'|\.(?P<cls>[\w-]+)'
+    r'|#(?P<id>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?:=(?:"(?P<dq>[^"]*)"|\'(?P<sq>[^\']*)\'|(?P<bare>[^\]]*)))?\]'
+    r'|:has\((?P<has>.*)\)$'
+)
+
+
+@lru_cache(maxsize=256)
+def _parse_selector(selector):
+    """Split a selector into compounds: ((tag, id, classes, attrs, has), ...)."""
+    parts = []
+    depth = 0
+    current = ''
+    for ch in selector:
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        if ch.isspace() and depth == 0:
+            if current:
+                parts.append(current)
+            current = ''
+        else:
+            current += ch
+    if current:
+        parts.append(current)
+
+    compounds = []
+    for part in parts:
+        tag = node_id = has = None
+        classes = []
+        attrs = []
+        pos = 0
+        while pos < len(part):
+            m = COMPOUND_RE.match(part, pos)
+            if m is None or m.end() == pos:
+                raise ValueError(f"Unsupported selector: {selector!r}")
+            if m.group('tag'):
+                tag = None if m.group('tag') == '*' else m.group('tag').lower()
+            elif m.group('cls'):
+                classes.append(m.group('cls'))
+            elif m.group('id'):
+                node_id = m.group('id')
+            elif m.group('attr'):
+                value = next((v for v in m.group('dq', 'sq', 'bare') if v is not None), None)
+                attrs.append((m.group('attr').lower(), value))
+            else:
+                has = m.group('has')
+            pos = m.end()
+        compounds.append((tag, node_id, tuple(classes), tuple(attrs), has))
+    return tuple(compounds)
+
+
+def splice(node, action, html):
+    """
+    Build a splice (start, end, replacement) that edits node.
+    action: 'replace' (whole element), 'inner' (its content), 'before', 'after',
+            'prepend' (start of its content) or 'append' (end of its content)
+    """
+    if action == 'replace':
+        return node.start, node.end, html
+    if action == 'inner':
+        return node.open_end, node.close_start, html
+    if action == 'before':
+        return node.start, node.start, html
+    if action == 'after':
+        return node.end, node.end, html
+    if action == 'prepend':
+        return node.open_end, node.open_end, html
+    if action == 'append':
+        return node.close_start, node.close_start, html
+    raise ValueError(f"Unknown splice action: {action!r}")
+
+
+def apply_splices(text, splices):
+    """
+    Apply non-overlapping (start, end, replacement) splices in one pass.
+    Insertions at the same offset keep the order they were given in.
+    """
+    if not splices:
+        return text
+    ordered = sorted(enumerate(splices), key=lambda item: (item[1][0], item[1][1], item[0]))
+    out = []
+    pos = 0
+    for _, (start, end, html) in ordered:
+        if start < pos:
+            raise ValueError(f"Overlapping edits at offset {start}")
+        out.append(text[pos:start])
+        out.append(html)
+        pos = end
+    out.append(text[pos:])
+    return ''.join(out)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Responsive image variants for build.py.
+
+Every raster image in the site is measured (from its header, no decoding)
+and, when Pillow is installed, re-encoded as WebP at each standard width
+below its own. Variants are cached by source hash in .insurio-cache/images/,
+so they are only re-encoded when the source image changes.
+
+Pages are then rewritten so every local <img> carries its intrinsic width
+and height (no layout shift) and a srcset of the variants. Images sized in
+pixels by an inline style (the footer logo's height:44px) get 1x/2x density
+candidates; the rest get width candidates with sizes="100vw" unless the tag
+already says otherwise. Finally the bytes of the images a page loads are
+totalled so the build can enforce a per-page budget.
+
+Without Pillow the width/height attributes and the budget still apply; only
+the variants are skipped.
+"""
+
+import os
+import posixpath
+import re
+import struct
+from io import BytesIO
+from pathlib import Path
+
+from fingerprint import resolve_ref
+from html_index import HtmlIndex, apply_splices
+from manifest import CACHE_DIR
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_SUFFIXES = ('.webp', '.png', '.jpg', '.jpeg', '.gif')
+VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+WEBP_QUALITY = 80
+IMAGE_CACHE_DIR = 'images'
+
+STYLE_PX_RE = re.compile(r'(?:^|;)\s*(width|height)\s*:\s*(\d+(?:\.\d+)?)px', re.I)
+
+
+def image_size(data):
+    """(width, height) from a PNG, JPEG, GIF or WebP header, or None."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR':
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', data[6:10])
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', data[26:30])
+            return width & 0x3fff, height & 0x3fff
+        if chunk == b'VP8L':
+            bits = int.from_bytes(data[21:25], 'little')
+            return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+        if chunk == b'VP8X':
+            return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+        return None
+    if data[:2] == b'\xff\xd8':
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xff:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xd8, 0x01) or 0xd0 <= marker <= 0xd7 or marker == 0xff:
+                i += 1 if marker == 0xff else 2
+                continue
+            length = struct.unpack('>H', data[i + 2:i + 4])[0]
+            # Start-of-frame markers carry the dimensions (not DHT, JPG or DAC)
+            if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+                height, width = struct.unpack('>HH', data[i + 5:i + 9])
+                return width, height
+            i += 2 + length
+    return None
+
+
+def variant_widths(width):
+    """Standard widths smaller than the image itself."""
+    return [w for w in VARIANT_WIDTHS if w < width]
+
+
+def encode_variants(data, digest, cache_dir):
+    """
+    WebP encodings of an image at each variant width (and at full width if
+    that is smaller than the original), cached by source hash.
+    Returns: [(width, height, cache path)], empty without Pillow.
+    """
+    if Image is None:
+        return []
+    size = image_size(data)
+    if not size:
+        return []
+    width, height = size
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    variants = []
+    image = None
+    for w in variant_widths(width) + [width]:
+        h = max(1, round(height * w / width))
+        path = cache_dir / f"{digest[:16]}-{w}.webp"
+        if not path.exists():
+            if image is None:
+                image = Image.open(BytesIO(data))
+                image.load()
+            resized = image if w == width else image.resize((w, h), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            tmp_path.write_bytes(buffer.getvalue())
+            os.replace(tmp_path, path)
+        if w == width and path.stat().st_size >= len(data):
+            continue  # the original is already the best full-size encoding
+        variants.append((w, h, str(path)))
+    return variants
+
+
+def variant_cache_dir(root):
+    return Path(root) / CACHE_DIR / IMAGE_CACHE_DIR
+
+
+def variant_name(rel_path, width):
+    """'images/hero.webp', 640 -> 'images/hero.640w.webp'; 'images/hero.png' -> 'images/hero.png.640w.webp'"""
+    stem, ext = posixpath.splitext(rel_path)
+    if ext.lower() != '.webp':
+        stem = rel_path
+    return f"{stem}.{width}w.webp"
+
+
+def _url_for(src, hashed_rel):
+    """src with its file name replaced by hashed_rel's, keeping src's directory form."""
+    head = src.split('?', 1)[0].split('#', 1)[0]
+    return head[:len(head) - len(posixpath.basename(head))] + posixpath.basename(hashed_rel)
+
+
+def _style_px(style):
+    return {name.lower(): float(value) for name, value in STYLE_PX_RE.findall(style or '')}
+
+
+def responsive_attrs(node, src, info):
+    """
+    Attributes to add to one <img>: {name: value}.
+    info is the image's entry from build.py: width, height, bytes and
+    variants [(width, hashed path, bytes)].
+    Returns: (attrs, the most bytes the page can load for this image)
+    """
+    attrs = node.attrs
+    add = {}
+    width, height = info['width'], info['height']
+    if 'width' not in attrs and 'height' not in attrs:
+        add['width'] = str(width)
+        add['height'] = str(height)
+
+    variants = sorted(tuple(variant) for variant in info.get('variants', []))
+    if not variants or 'srcset' in attrs:
+        return add, info['bytes']
+    # Every candidate, largest last; the original stands in when there is no full-width variant
+    options = [(w, _url_for(src, hashed), size) for w, hashed, size in variants]
+    if options[-1][0] < width:
+        options.append((width, src, info['bytes']))
+
+    style = _style_px(attrs.get('style'))
+    if 'width' in style or 'height' in style:
+        # Fixed display size: the smallest candidates that cover 1x and 2x screens
+        shown = style.get('width') or style['height'] * width / height
+        srcset = []
+        loaded = options[-1][2]
+        for density in (1, 2):
+            fit = next((option for option in options if option[0] >= shown * density), options[-1])
+            if density == 1 or fit[1] != srcset[0].rsplit(' ', 1)[0]:
+                srcset.append(f"{fit[1]} {density}x")
+            loaded = fit[2]
+        add['srcset'] = ', '.join(srcset)
+        return add, loaded
+
+    add['srcset'] = ', '.join(f"{url} {w}w" for w, url, _ in options)
+    if 'sizes' not in attrs:
+        add['sizes'] = '100vw'
+    return add, options[-1][2]
+
+
+def rewrite_images(html, base_dir, images):
+    """
+    Add width/height and srcset to every local <img> in a page, in one pass.
+    images maps source paths to build.py image entries. src itself is left
+    for fingerprint.py to rewrite.
+    Returns: (new html, {image path: bytes loaded})
+    """
+    index = HtmlIndex(html)
+    splices = []
+    loaded = {}
+    for node in index.by_tag.get('img', []):
+        span = node.attr_span('src', html)
+        if span is None:
+            continue
+        src = html[span[0]:span[1]]
+        rel_path = resolve_ref(src, base_dir)
+        info = images.get(rel_path)
+        if not info:
+            continue
+        add, size = responsive_attrs(node, src, info)
+        loaded[rel_path] = max(size, loaded.get(rel_path, 0))
+        if add:
+            # Insert after the tag name, ahead of any self-closing slash
+            at = node.start + 1 + len(node.tag)
+            extra = ''.join(f' {name}="{value}"' for name, value in add.items())
+            splices.append((at, at, extra))
+    return apply_splices(html, splices), loaded
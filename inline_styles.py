@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Move repeated inline styles into shared utility classes for build.py.
+
+The copy blocks injected by auto_update.py carry long style="..." attributes,
+and the same declaration sets repeat across pages. The build collects every
+inline style on pages that load styles.css, and each declaration set used at
+least MIN_USES times becomes a generated class (u-<hash>) appended to
+styles.css in dist/. The attributes are rewritten to class references, so
+the declarations ship once and are cached with the stylesheet.
+
+Inline styles beat every selector, so the generated declarations are marked
+!important to keep that precedence. That would also beat styles set from
+script (el.style.display = ...), so declaration sets touching a property
+that any script on the site assigns are left inline.
+
+Sources are never modified; only the dist/ copies are rewritten.
+"""
+
+import hashlib
+import html as html_lib
+import re
+
+from fingerprint import resolve_ref
+from html_index import HtmlIndex, apply_splices
+
+CLASS_PREFIX = 'u-'
+MIN_USES = 2
+UTILITY_STYLESHEET = 'styles.css'
+
+SCRIPT_STYLE_RE = re.compile(r'\.style\.([a-zA-Z]+)\s*=(?!=)|\.style\.setProperty\(\s*[\'"]([a-z-]+)')
+# Splits declarations on ';' outside strings and parentheses (url(data:...;...))
+DECLARATION_RE = re.compile(r'(?:"[^"]*"|\'[^\']*\'|\([^)]*\)|[^;"\'(])+')
+
+
+def parse_declarations(style):
+    """
+    Normalized declarations of a style attribute value: ['prop:value', ...]
+    in source order, or None if the value is empty or not plain declarations.
+    """
+    declarations = []
+    for m in DECLARATION_RE.finditer(html_lib.unescape(style)):
+        declaration = m.group().strip()
+        if not declaration:
+            continue
+        prop, colon, value = declaration.partition(':')
+        prop = prop.strip().lower()
+        value = ' '.join(value.split())
+        if not colon or not value or not re.fullmatch(r'-?[a-z][a-z0-9-]*', prop) or '!important' in value:
+            return None
+        declarations.append(f"{prop}:{value}")
+    return declarations or None
+
+
+def style_key(declarations):
+    return ';'.join(declarations)
+
+
+def class_name(key):
+    """Stable class name for a declaration set, the same on every build."""
+    return CLASS_PREFIX + hashlib.sha256(key.encode('utf-8')).hexdigest()[:6]
+
+
+def scripted_properties(script):
+    """CSS properties a script assigns through element.style."""
+    props = set()
+    for camel, dashed in SCRIPT_STYLE_RE.findall(script):
+        props.add(dashed or re.sub(r'[A-Z]', lambda m: '-' + m.group().lower(), camel))
+    return props
+
+
+def _touches(declarations, props):
+    """True if any declaration sets one of props, or a longhand or shorthand of one."""
+    for declaration in declarations:
+        prop = declaration.split(':', 1)[0]
+        for scripted in props:
+            if prop == scripted or prop.startswith(scripted + '-') or scripted.startswith(prop + '-'):
+                return True
+    return False
+
+
+def links_stylesheet(index, text, base_dir, stylesheet=UTILITY_STYLESHEET):
+    """True if the page loads stylesheet with a <link rel=stylesheet>."""
+    for node in index.by_tag.get('link', []):
+        if 'stylesheet' in node.attrs.get('rel', '').lower().split():
+            if resolve_ref(node.attrs.get('href', ''), base_dir) == stylesheet:
+                return True
+    return False
+
+
+def scan_page(text, base_dir):
+    """
+    One page's inline styles and script-assigned properties.
+    Returns: ([style keys, one per attribute], [scripted properties]); the
+    style list is empty for pages that do not load the utility stylesheet.
+    """
+    index = HtmlIndex(text)
+    props = set()
+    for node in index.by_tag.get('script', []):
+        props |= scripted_properties(node.inner(text))
+    keys = []
+    if links_stylesheet(index, text, base_dir):
+        for node in index.elements:
+            if 'style' in node.attrs:
+                declarations = parse_declarations(node.attrs['style'])
+                if declarations:
+                    keys.append(style_key(declarations))
+    return keys, sorted(props)
+
+
+def utility_classes(counts, scripted, min_uses=MIN_USES):
+    """{style key: class name} for declaration sets worth extracting."""
+    classes = {}
+    for key, uses in counts.items():
+        if uses >= min_uses and not _touches(key.split(';'), scripted):
+            classes[key] = class_name(key)
+    return classes
+
+
+def utility_css(classes):
+    """Rules for the generated classes, in a stable order."""
+    rules = []
+    for key, name in sorted(classes.items(), key=lambda item: item[1]):
+        body = ';'.join(f"{declaration} !important" for declaration in key.split(';'))
+        rules.append(f".{name}{{{body}}}")
+    return '\n/* Generated from inline styles by build.py */\n' + '\n'.join(rules) + '\n'
+
+
+def rewrite_inline_styles(text, base_dir, classes):
+    """Replace extracted style attributes with class references, in one pass."""
+    index = HtmlIndex(text)
+    if not classes or not links_stylesheet(index, text, base_dir):
+        return text
+    splices = []
+    for node in index.elements:
+        if 'style' not in node.attrs:
+            continue
+        declarations = parse_declarations(node.attrs['style'])
+        name = classes.get(style_key(declarations)) if declarations else None
+        if not name:
+            continue
+        style_span = node.attr_full_span('style', text)
+        class_span = node.attr_span('class', text)
+        if class_span:
+            splices.append((style_span[0], style_span[1], ''))
+            splices.append((class_span[1], class_span[1], f" {name}"))
+        elif 'class' not in node.attrs:
+            splices.append((style_span[0], style_span[1], f' class="{name}"'))
+    return apply_splices(text, splices)
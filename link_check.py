@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Check that every internal link and asset reference resolves to a real file.
+
+Every page is tokenized once and its href, src, srcset, poster and inline
+style url() references are extracted together with the ids it defines.
+References are resolved against the local tree the way the static host
+serves it: /compare/ is compare/index.html, and a #fragment must match an id
+on the target page. External links are not fetched.
+
+The markup the update scripts inject (update_nav.py's nav templates and the
+auto_update.py rules) is checked as well, against each page it targets, so
+a bad link is caught before it is written into every page. In a build
+(a root with asset-manifest.json) template asset references are mapped to
+their fingerprinted names first, as build.py would rewrite them.
+
+Finally the pages are cross-checked against sitemap.xml: sitemap entries
+with no page, pages missing from the sitemap, and orphaned pages that no
+other page links to.
+
+Extraction is cached per file hash in .insurio-cache/link_check.json and
+runs in parallel (--jobs), so a rerun only parses pages that changed.
+
+Usage:
+    python link_check.py              # check the site in the current directory
+    python link_check.py --dir dist   # check the build
+    python link_check.py --force      # re-parse every page
+"""
+
+import argparse
+import bisect
+import json
+import os
+import posixpath
+import sys
+import time
+from urllib.parse import unquote, urlsplit
+
+from fingerprint import ASSET_MANIFEST, CSS_URL_RE, SRCSET_ATTRS, resolve_ref, rewrite_url
+from html_index import HtmlIndex
+from manifest import Manifest, content_hash, file_state, ruleset_version
+from page_budget import sitemap_pages
+from parallel import map_files, resolve_jobs
+from update_nav import NAV_RULES, find_html_files
+
+# Attributes holding one URL, by the tags they are checked on
+URL_ATTRS = {
+    'href': ('a', 'link', 'area'),
+    'src': ('img', 'script', 'iframe', 'source', 'audio', 'video', 'track', 'embed'),
+    'poster': ('video',),
+}
+IGNORED_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', 'sms:')
+# Pages nothing is expected to link to
+ENTRY_PAGES = ('index.html', '404.html')
+NOT_IN_SITEMAP = ('404.html',)
+# Directories that are never served (update_nav.SKIP_DIRS also skips images/ and js/, which are)
+TREE_SKIP_DIRS = ('node_modules', '__pycache__', 'venv', 'partials', 'dist')
+
+# Bump when extraction changes so every cached page is re-parsed
+CACHE_VERSION = ruleset_version('link_check', 1, URL_ATTRS, SRCSET_ATTRS)
+
+
+def extract_refs(text):
+    """
+    Every reference in a page and the ids it defines, from one tokenization.
+    Returns: ([[attribute, url, line]], [ids])
+    """
+    index = HtmlIndex(text)
+    newlines = [i for i, ch in enumerate(text) if ch == '\n']
+    refs = []
+    ids = []
+    for node in index.elements:
+        attrs = node.attrs
+        line = bisect.bisect_right(newlines, node.start) + 1
+        if 'id' in attrs:
+            ids.append(attrs['id'])
+        if node.tag == 'a' and 'name' in attrs:
+            ids.append(attrs['name'])
+        for name, tags in URL_ATTRS.items():
+            if node.tag in tags and attrs.get(name, '').strip():
+                refs.append([name, attrs[name].strip(), line])
+        for name in SRCSET_ATTRS:
+            for candidate in attrs.get(name, '').split(','):
+                parts = candidate.split()
+                if parts:
+                    refs.append([name, parts[0], line])
+        for m in CSS_URL_RE.finditer(attrs.get('style', '')):
+            refs.append(['style', m.group(2).strip(), line])
+    return refs, ids
+
+
+def process_file(task):
+    """
+    Extract one page's references. task is (file_path, known_hash).
+    Returns: (state, refs, ids); refs and ids are None if the content still
+    matches known_hash and the cached extraction can be reused.
+    """
+    file_path, known_hash = task
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    digest = content_hash(data)
+    if digest == known_hash:
+        return file_state(file_path, digest=digest), None, None
+    refs, ids = extract_refs(data.decode('utf-8'))
+    return file_state(file_path, digest=digest), refs, ids
+
+
+class LinkChecker:
+    def __init__(self, root, jobs=1, force=False):
+        self.root = os.path.abspath(root)
+        self.jobs = jobs
+        self.force = force
+        self.manifest = Manifest(self.root, 'link_check')
+        self.site_files = set()
+        self.pages = {}   # page path -> {'refs': [...], 'ids': [...]}
+        self.parsed = 0
+        self.failed = []
+
+    def scan_tree(self):
+        """Every file the site serves, as site-relative paths."""
+        for dirpath, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d not in TREE_SKIP_DIRS and not d.startswith('.')]
+            rel_dir = os.path.relpath(dirpath, self.root)
+            for name in files:
+                self.site_files.add(posixpath.normpath(posixpath.join(rel_dir.replace(os.sep, '/'), name)))
+
+    def extract(self):
+        """Load every page's references, parsing only pages that changed since the last run."""
+        tasks = []
+        for file_path in find_html_files(self.root):
+            key = self.manifest.key(file_path)
+            entry = self.manifest.entries.get(key)
+            if not self.force and self.manifest.is_fresh(file_path, CACHE_VERSION):
+                self.pages[key] = entry
+                continue
+            tasks.append((file_path, None if self.force else self.manifest.known_hash(file_path, CACHE_VERSION)))
+
+        for (file_path, _), result, error in map_files(process_file, tasks, self.jobs):
+            key = self.manifest.key(file_path)
+            if error:
+                self.failed.append((key, error))
+                continue
+            state, refs, ids = result
+            if refs is None:
+                entry = self.manifest.entries[key]
+                refs, ids = entry['refs'], entry['ids']
+            else:
+                self.parsed += 1
+            self.manifest.record(file_path, CACHE_VERSION, dict(state, refs=refs, ids=ids))
+            self.pages[key] = self.manifest.entries[key]
+
+        for key in list(self.manifest.entries):
+            if key not in self.pages and not any(key == failed for failed, _ in self.failed):
+                del self.manifest.entries[key]
+                self.manifest.dirty = True
+
+    def resolve(self, url, base_dir, page=None):
+        """
+        Where a reference leads.
+        Returns: (status, target) with status 'ok', 'skip' (external, mailto: ...),
+        'missing' (no such file) or 'anchor' (the page exists but has no such id).
+        """
+        if url.lower().startswith(IGNORED_SCHEMES):
+            return 'skip', None
+        parts = urlsplit(url)
+        if not parts.path and not parts.query:
+            if parts.fragment and page is not None and parts.fragment != 'top':
+                if unquote(parts.fragment) not in self.pages.get(page, {}).get('ids', []):
+                    return 'anchor', page
+            return 'ok', page
+        rel_path = resolve_ref(url, base_dir)
+        if rel_path is None:
+            return 'skip', None
+        rel_path = unquote(rel_path)
+        rel_path = '' if rel_path == '.' else rel_path
+        if rel_path in self.site_files:
+            target = rel_path
+        elif posixpath.join(rel_path, 'index.html') in self.site_files:
+            target = posixpath.join(rel_path, 'index.html')
+        else:
+            return 'missing', rel_path
+        if parts.fragment and target in self.pages and parts.fragment != 'top':
+            if unquote(parts.fragment) not in self.pages[target]['ids']:
+                return 'anchor', target
+        return 'ok', target
+
+    def check_pages(self):
+        """
+        Resolve every reference on every page.
+        Returns: (broken [(page, line, url, status)], inbound {page: set of linking pages})
+        """
+        broken = []
+        inbound = {page: set() for page in self.pages}
+        for page, entry in sorted(self.pages.items()):
+            base_dir = posixpath.dirname(page)
+            for attr, url, line in entry['refs']:
+                status, target = self.resolve(url, base_dir, page)
+                if status in ('missing', 'anchor'):
+                    broken.append((page, line, url, status))
+                elif status == 'ok' and attr == 'href' and target in inbound and target != page:
+                    inbound[target].add(page)
+        return broken, inbound
+
+    def check_templates(self):
+        """Resolve the links in the markup update_nav.py and auto_update.py inject, for each page they target."""
+        from auto_update import RULES
+
+        templates = [(f"update_nav {label}", html, sorted(self.pages)) for _, html, label in NAV_RULES]
+        for rule in RULES:
+            html = getattr(rule, 'html', None) or getattr(rule, 'replacement', None)
+            if isinstance(html, str):
+                templates.append((f"auto_update '{rule.name}'", html,
+                                  [page for page in sorted(self.pages) if rule.matches(page)]))
+        assets = {}
+        try:
+            with open(os.path.join(self.root, ASSET_MANIFEST), 'r', encoding='utf-8') as f:
+                assets = json.load(f)
+        except (OSError, ValueError):
+            pass
+        broken = []
+        for label, html, pages in templates:
+            refs, _ = extract_refs(html)
+            for page in pages:
+                for _, url, _ in refs:
+                    # Regex backreferences are filled in from the page, so they cannot be checked here
+                    if '\\' in url:
+                        continue
+                    base_dir = posixpath.dirname(page)
+                    status, target = self.resolve(rewrite_url(url, base_dir, assets), base_dir)
+                    if status == 'missing':
+                        broken.append((label, page, url))
+        return sorted(set(broken))
+
+    def check_sitemap(self, inbound):
+        """Returns: (sitemap entries with no page, pages missing from the sitemap, orphaned pages)."""
+        listed = set()
+        dead = []
+        if 'sitemap.xml' in self.site_files:
+            for url, rel_path in sitemap_pages(self.root):
+                if rel_path in self.pages:
+                    listed.add(rel_path)
+                else:
+                    dead.append(url)
+        unlisted = [page for page in sorted(self.pages) if page not in listed and page not in NOT_IN_SITEMAP]
+        orphans = [page for page, sources in sorted(inbound.items()) if not sources and page not in ENTRY_PAGES]
+        return dead, unlisted, orphans
+
+    def run(self):
+        started = time.perf_counter()
+        self.scan_tree()
+        self.extract()
+        broken, inbound = self.check_pages()
+        template_broken = self.check_templates()
+        dead, unlisted, orphans = self.check_sitemap(inbound)
+        self.manifest.save()
+        elapsed = time.perf_counter() - started
+
+        for page, error in self.failed:
+            print(f"✗ Failed to read {page}: {error}")
+        if broken:
+            print("🔗 Broken references:")
+            for page, line, url, status in broken:
+                reason = 'no such id' if status == 'anchor' else 'not found'
+                print(f"  ✗ {page}:{line}  {url}  ({reason})")
+        if template_broken:
+            print("\n🧩 Broken links in injected markup:")
+            for label, page, url in template_broken:
+                print(f"  ✗ {label} → {page}: {url}")
+        if dead:
+            print("\n🗺️  Sitemap entries with no page:")
+            for url in dead:
+                print(f"  ✗ {url}")
+        if unlisted:
+            print("\n🗺️  Pages missing from sitemap.xml:")
+            for page in unlisted:
+                print(f"  ⚠️  {page}")
+        if orphans:
+            print("\n🏝️  Orphaned pages (no other page links to them):")
+            for page in orphans:
+                print(f"  ⚠️  {page}")
+
+        total = sum(len(entry['refs']) for entry in self.pages.values())
+        print(f"\n{'=' * 60}")
+        print(f"Checked {total} references on {len(self.pages)} pages in {elapsed:.2f}s "
+              f"({self.parsed} parsed, {len(self.pages) - self.parsed} from cache)")
+        print(f"Broken: {len(broken) + len(template_broken) + len(dead)}  "
+              f"Unlisted: {len(unlisted)}  Orphaned: {len(orphans)}")
+        return not (broken or template_broken or dead or self.failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check internal links and asset references against the local tree and sitemap.xml.')
+    parser.add_argument('--dir', type=str, default='.',
+                        help='Root directory of your website (default: current directory)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes (0 = one per CPU, default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='Ignore the cache and re-parse every page')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"Error: Directory not found: {args.dir}")
+        return 1
+    print(f"🔍 Checking links in {os.path.abspath(args.dir)} (jobs: {resolve_jobs(args.jobs)})\n")
+    return 0 if LinkChecker(args.dir, jobs=args.jobs, force=args.force).run() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Load-test a local server (serve.py) and report latency percentiles.
+
+Opens --concurrency keep-alive connections, each requesting the given paths
+in turn for --duration seconds (or until --requests have been sent), and
+reports per path: requests, status codes, bytes, requests/s and p50/p90/p99/
+max latency. --revalidate sends each path's ETag back as If-None-Match, to
+measure the 304 path a returning visitor takes.
+
+By default the site is served for the run: serve.py is started on a free
+port for --dir and stopped afterwards. Pass --url to test a server that is
+already running.
+
+Usage:
+    python loadtest.py                                   # / and /calculator/ from dist/
+    python loadtest.py --path / --path /styles.css -c 64
+    python loadtest.py --url http://127.0.0.1:8000 --revalidate
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATHS = ['/', '/calculator/']
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+class PathStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.bytes = 0
+        self.errors = 0
+        self.etag = None
+
+
+async def read_response(reader):
+    """Returns: (status, {header: value}, body)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return status, headers, body
+
+
+async def worker(host, port, paths, stats, deadline, budget, accept_encoding, revalidate):
+    """One keep-alive connection cycling through paths; reconnects if the server closes it."""
+    reader = writer = None
+    i = 0
+    while time.perf_counter() < deadline and budget[0] > 0:
+        budget[0] -= 1
+        path = paths[i % len(paths)]
+        i += 1
+        path_stats = stats[path]
+        lines = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}", f"Accept-Encoding: {accept_encoding}"]
+        if revalidate and path_stats.etag:
+            lines.append(f"If-None-Match: {path_stats.etag}")
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            status, headers, body = await read_response(reader)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+            path_stats.errors += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        path_stats.latencies.append(time.perf_counter() - started)
+        path_stats.statuses[status] = path_stats.statuses.get(status, 0) + 1
+        path_stats.bytes += len(body)
+        path_stats.etag = headers.get('etag', path_stats.etag)
+        if headers.get('connection', '').lower() == 'close':
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run(host, port, paths, concurrency, duration, requests, accept_encoding, revalidate):
+    stats = {path: PathStats() for path in paths}
+    budget = [requests or float('inf')]
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(host, port, paths[n % len(paths):] + paths[:n % len(paths)], stats,
+                                  deadline, budget, accept_encoding, revalidate)
+                           for n in range(concurrency)))
+    return stats, time.perf_counter() - started
+
+
+def report(stats, elapsed):
+    print(f"  {'path':<22} {'reqs':>7} {'req/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'KB/req':>7}  status")
+    total = 0
+    failed = 0
+    for path, path_stats in stats.items():
+        latencies = sorted(path_stats.latencies)
+        count = len(latencies)
+        total += count
+        failed += path_stats.errors
+        ms = [percentile(latencies, pct) * 1000 for pct in (50, 90, 99, 100)]
+        statuses = ' '.join(f"{status}×{n}" for status, n in sorted(path_stats.statuses.items()))
+        if path_stats.errors:
+            statuses += f" errors×{path_stats.errors}"
+        print(f"  {path[:22]:<22} {count:>7} {count / elapsed:>8.0f} {ms[0]:>6.2f}ms {ms[1]:>6.2f}ms "
+              f"{ms[2]:>6.2f}ms {ms[3]:>6.2f}ms {path_stats.bytes / 1024 / max(count, 1):>7.1f}  {statuses}")
+    print(f"\n{total} requests in {elapsed:.2f}s: {total / elapsed:.0f} req/s, {failed} errors")
+    return failed
+
+
+def start_server(root):
+    """Start serve.py on a free port. Returns: (process, port)"""
+    process = subprocess.Popen([sys.executable, os.path.join(HERE, 'serve.py'), '--dir', root, '--port', '0'],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if 'http://' not in line:
+        process.kill()
+        raise RuntimeError(f"serve.py did not start: {line.strip()}")
+    return process, int(line.split('http://', 1)[1].split('/', 1)[0].rsplit(':', 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the local server and report latency percentiles.')
+    parser.add_argument('--url', type=str, default=None,
+                        help='Server to test, e.g. http://127.0.0.1:8000 (default: start serve.py for --dir)')
+    parser.add_argument('--dir', type=str, default=None,
+                        help='Directory to serve when --url is not given (default: dist/ if it exists, else .)')
+    parser.add_argument('--path', action='append', default=None,
+                        help=f'Path to request; repeat for several (default: {" ".join(DEFAULT_PATHS)})')
+    parser.add_argument('--concurrency', '-c', type=int, default=32,
+                        help='Number of concurrent connections (default: 32)')
+    parser.add_argument('--duration', '-d', type=float, default=10.0,
+                        help='Seconds to run (default: 10)')
+    parser.add_argument('--requests', '-n', type=int, default=0,
+                        help='Stop after this many requests (default: no limit)')
+    parser.add_argument('--accept-encoding', type=str, default='br, gzip',
+                        help="Accept-Encoding to send (default: 'br, gzip'; 'identity' for none)")
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Send If-None-Match with the last ETag seen for each path')
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        root = args.dir or ('dist' if os.path.isdir('dist') else '.')
+        process, port = start_server(root)
+        host = '127.0.0.1'
+    paths = args.path or DEFAULT_PATHS
+
+    print(f"🚀 {args.concurrency} connections → http://{host}:{port} for "
+          f"{f'{args.requests} requests' if args.requests else f'{args.duration:g}s'}"
+          f"{' (revalidating)' if args.revalidate else ''}\n")
+    try:
+        stats, elapsed = asyncio.run(run(host, port, paths, args.concurrency, args.duration if not args.requests else float('inf'),
+                                         args.requests, args.accept_encoding, args.revalidate))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+    return 1 if report(stats, elapsed) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
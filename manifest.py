@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Content-hash manifest for incremental runs.
+
+update_nav.py and auto_update.py record, for every file they process, its
+size, mtime, content hash and the version of the rules that were applied to
+it. On the next run a file whose size and mtime still match, and whose rules
+have not changed, is skipped after a single stat. If only the mtime moved
+(e.g. a checkout touched it) the content hash decides.
+
+Manifests live in .insurio-cache/ at the site root, one JSON file per tool.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_DIR = '.insurio-cache'
+
+
+def content_hash(data):
+    """Hash of a file's raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def ruleset_version(*parts):
+    """
+    Stable version string for a set of rule definitions.
+    parts can be any JSON-serialisable values (patterns, replacements, guards...).
+    """
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()[:16]
+
+
+def file_state(path, data=None, digest=None):
+    """Manifest entry fields for a file whose current bytes are data (or hash to digest)."""
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime': st.st_mtime_ns, 'hash': digest or content_hash(data)}
+
+
+class Manifest:
+    def __init__(self, root, name):
+        self.root = Path(root)
+        self.path = self.root / CACHE_DIR / f"{name}.json"
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load entries from disk; a missing or unreadable manifest is treated as empty."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        """Write the manifest atomically if anything changed."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def key(self, path):
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    def is_fresh(self, path, version):
+        """True if path is unchanged (by size and mtime) since it was processed with version."""
+        entry = self.entries.get(self.key(path))
+        if not entry or entry.get('ruleset') != version:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return st.st_size == entry['size'] and st.st_mtime_ns == entry['mtime']
+
+    def known_hash(self, path, version):
+        """Content hash recorded for path under version, or None."""
+        entry = self.entries.get(self.key(path))
+        if entry and entry.get('ruleset') == version:
+            return entry['hash']
+        return None
+
+    def record(self, path, version, state):
+        """Remember that path, in the given file_state(), has been processed with version."""
+        self.entries[self.key(path)] = dict(state, ruleset=version)
+        self.dirty = True
+
+    def clear(self):
+        self.entries = {}
+        self.dirty = True
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Run update_nav.py and auto_update.py over many site checkouts in one go.
+
+Each partner or broker variant of the site is its own checkout. Instead of
+running both scripts once per checkout, this takes a list of site roots (or
+a manifest of them) and:
+
+- walks each tree once and shares the file list between both tools;
+- plans the rules once: the auto_update rule list for a path like
+  compare/index.html is worked out once and reused by every site, and
+  workers receive rule indices, not pickled rules, so each worker process
+  compiles RULES once at import;
+- schedules every file of every site on one process pool, largest file
+  first (parallel.map_balanced), so one big site cannot leave workers idle;
+- keeps each site's incremental manifests (the same ones the single-site
+  scripts use) and commits each site's writes as its own atomic batch.
+
+The nav phase runs first over all sites, then the copy phase, so both never
+edit the same file concurrently. Like update_nav.py this is a dry run
+unless --apply is given.
+
+A manifest is JSON, either ["../broker-a", ...] or
+{"broker-a": "../broker-a", ...}, or a text file with one root per line
+(# comments allowed). Relative roots are taken from the manifest's folder.
+Roots are compared after resolving them: a root listed twice, or one inside
+another site's root, is skipped so no file is updated twice.
+
+Usage:
+    python multisite.py ../broker-a ../broker-b          # preview both sites
+    python multisite.py --manifest sites.json --apply -j 0
+    python multisite.py --manifest sites.txt --tools nav --report batch.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from auto_update import RULES, update_file
+from batch_writer import BatchWriteError, BatchWriter
+from manifest import Manifest, content_hash, file_state, ruleset_version
+from parallel import map_balanced, resolve_jobs
+from run_report import RunReport
+from update_nav import RULESET_VERSION, find_html_files, process_file
+
+TOOLS = ('nav', 'copy')
+# Manifest name each tool shares with its single-site script
+MANIFEST_NAMES = {'nav': 'update_nav', 'copy': 'auto_update'}
+
+
+def load_site_list(path):
+    """[(name, root)] from a JSON or text manifest; relative roots are resolved against its folder."""
+    base = Path(path).resolve().parent
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if path.endswith('.json'):
+        data = json.loads(text)
+        pairs = list(data.items()) if isinstance(data, dict) else [(None, root) for root in data]
+    else:
+        pairs = [(None, line.strip()) for line in text.splitlines()
+                 if line.strip() and not line.strip().startswith('#')]
+    return [(name, base / root) for name, root in pairs]
+
+
+def run_task(task):
+    """
+    One file for one tool, in a worker. task is (tool, file_path, rule indices,
+    known_hash, dry_run); rules are looked up in this process's RULES.
+    Returns: (outcome, output, state, detail, seconds) where outcome is
+    'unchanged' (content matched known_hash), 'changed', 'already-updated'
+    or 'no-match'.
+    """
+    tool, file_path, rule_indices, known_hash, dry_run = task
+    start = time.perf_counter()
+    if tool == 'nav':
+        was_modified, message, state, _, output = process_file((file_path, dry_run, known_hash, False))
+        if message is None:
+            outcome = 'unchanged'
+        elif was_modified:
+            outcome = 'changed'
+        else:
+            outcome = 'already-updated' if message.startswith('✓') else 'no-match'
+        detail = 'nav'
+    else:
+        hits, output, state, _ = update_file((file_path, [RULES[i] for i in rule_indices], known_hash, False))
+        if hits is None:
+            outcome = 'unchanged'
+        else:
+            outcome = 'changed' if output is not None else 'no-match'
+        detail = ', '.join(hits or [])
+        if dry_run:
+            output = None
+    return outcome, output, state, detail, time.perf_counter() - start
+
+
+class Site:
+    def __init__(self, name, root, tools):
+        self.name = name
+        self.root = Path(root).resolve()
+        self.files = []
+        self.sizes = {}
+        self.manifests = {tool: Manifest(self.root, MANIFEST_NAMES[tool]) for tool in tools}
+        self.reports = {tool: RunReport(MANIFEST_NAMES[tool], self.root, site=name) for tool in tools}
+        self.changes = []
+        self.errors = []
+        self.cpu_s = 0.0
+
+    def discover(self):
+        """Walk the tree once; both tools use the same file list."""
+        self.files = find_html_files(self.root)
+        for path in self.files:
+            self.sizes[path] = os.path.getsize(path)
+
+    def rel(self, path):
+        return Path(path).relative_to(self.root).as_posix()
+
+
+class MultiSiteRunner:
+    def __init__(self, sites, tools=TOOLS, jobs=1, dry_run=True, force=False):
+        self.sites = sites
+        self.tools = tools
+        self.jobs = jobs
+        self.dry_run = dry_run
+        self.force = force
+        self.owner = {}
+        self.plans = {}      # rel path -> tuple of RULES indices, shared by every site
+        self.versions = {}   # tuple of RULES indices -> manifest version
+
+    def rule_plan(self, rel_path):
+        """Indices of the auto_update rules for a path, computed once for all sites."""
+        plan = self.plans.get(rel_path)
+        if plan is None:
+            plan = self.plans[rel_path] = tuple(i for i, rule in enumerate(RULES) if rule.matches(rel_path))
+            if plan and plan not in self.versions:
+                # The same version InsurioUpdater computes, so the single-site manifest stays valid
+                self.versions[plan] = ruleset_version(*(RULES[i].signature() for i in plan))
+        return plan
+
+    def discover(self):
+        for site in self.sites:
+            with site.reports[self.tools[0]].phase('discovery'):
+                site.discover()
+            for path in site.files:
+                self.owner[path] = site
+
+    def run_phase(self, tool):
+        """Run one tool over every site's files on one shared, size-balanced pool."""
+        tasks = []
+        versions = {}
+        for site in self.sites:
+            manifest, report = site.manifests[tool], site.reports[tool]
+            with report.phase('check'):
+                for path in site.files:
+                    if tool == 'nav':
+                        plan, version = (), RULESET_VERSION
+                    else:
+                        plan = self.rule_plan(site.rel(path))
+                        if not plan:
+                            continue
+                        version = self.versions[plan]
+                    versions[path] = version
+                    if not self.force and manifest.is_fresh(path, version):
+                        report.add_file(site.rel(path), 'skipped')
+                        continue
+                    known_hash = None if self.force else manifest.known_hash(path, version)
+                    tasks.append((tool, path, plan, known_hash, self.dry_run))
+
+        writers = {site.name: BatchWriter() for site in self.sites}
+        pending = {site.name: [] for site in self.sites}
+        aborted = {}
+        started = time.perf_counter()
+        for task, result, error in map_balanced(run_task, tasks, self.jobs, cost=lambda task: self.owner[task[1]].sizes[task[1]]):
+            path = task[1]
+            site = self.owner[path]
+            rel_path = site.rel(path)
+            if error:
+                site.errors.append(f"✗ [{tool}] {rel_path}: {error}")
+                site.reports[tool].add_file(rel_path, 'failed', error=error)
+                continue
+            outcome, output, state, detail, seconds = result
+            site.cpu_s += seconds
+            if output is not None:
+                if site.name not in aborted:
+                    try:
+                        writers[site.name].stage(path, output)
+                    except BatchWriteError as e:
+                        aborted[site.name] = e
+                pending[site.name].append((path, rel_path, content_hash(output), detail))
+                continue
+            # A copy file no rule matched is not recorded, so it is reported again next run (as in auto_update.py)
+            if state is not None and not self.dry_run and not (tool == 'copy' and outcome == 'no-match'):
+                site.manifests[tool].record(path, versions[path], state)
+            if outcome == 'changed':
+                site.changes.append(f"→ [{tool}] would update {rel_path}{f' ({detail})' if tool == 'copy' else ''}")
+            elif outcome == 'no-match':
+                site.errors.append(f"⚠ [{tool}] {rel_path}: {'no nav found' if tool == 'nav' else 'could not find patterns to update'}")
+            site.reports[tool].add_file(rel_path, outcome, {'process_s': seconds})
+        elapsed = time.perf_counter() - started
+
+        for site in self.sites:
+            report = site.reports[tool]
+            report.add_time('process', elapsed)
+            with report.phase('commit'):
+                if pending[site.name] and site.name not in aborted:
+                    try:
+                        writers[site.name].commit()
+                    except BatchWriteError as e:
+                        aborted[site.name] = e
+            for path, rel_path, digest, detail in pending[site.name]:
+                if site.name in aborted:
+                    site.errors.append(f"✗ [{tool}] {rel_path}: not written, site rolled back ({aborted[site.name]})")
+                    report.add_file(rel_path, 'failed', error=str(aborted[site.name]))
+                    continue
+                site.manifests[tool].record(path, versions[path], file_state(path, digest=digest))
+                site.changes.append(f"✓ [{tool}] {rel_path}{f' ({detail})' if tool == 'copy' else ''}")
+                report.add_file(rel_path, 'changed')
+            with report.phase('save'):
+                site.manifests[tool].save()
+        return len(tasks)
+
+    def run(self):
+        self.discover()
+        for tool in self.tools:
+            scheduled = self.run_phase(tool)
+            print(f"  {tool}: {scheduled} files scheduled across {len(self.sites)} sites")
+        return all(not site.errors for site in self.sites)
+
+    def to_dict(self):
+        return {
+            'tool': 'multisite',
+            'dry_run': self.dry_run,
+            'jobs': resolve_jobs(self.jobs),
+            'sites': [{'name': site.name, 'root': str(site.root), 'cpu_s': site.cpu_s,
+                       'changes': site.changes, 'errors': site.errors,
+                       'tools': {tool: report.to_dict() for tool, report in site.reports.items()}}
+                      for site in self.sites],
+        }
+
+    def print_summary(self):
+        print(f"\n{'=' * 72}")
+        print("📊 PER-SITE SUMMARY")
+        print("=" * 72)
+        statuses = ('changed', 'already-updated', 'skipped', 'unchanged', 'no-match', 'failed')
+        header = ''.join(f"{name[:9]:>10}" for name in statuses)
+        print(f"  {'site':<18}{'tool':<6}{header}{'cpu':>8}")
+        for site in self.sites:
+            for i, (tool, report) in enumerate(site.reports.items()):
+                totals = report.to_dict()['totals']
+                counts = ''.join(f"{totals.get(name, 0):>10}" for name in statuses)
+                cpu = f"{site.cpu_s:>7.2f}s" if i == 0 else ''
+                print(f"  {(site.name if i == 0 else '')[:17]:<18}{tool:<6}{counts}{cpu}")
+        for site in self.sites:
+            if site.changes or site.errors:
+                print(f"\n{site.name} ({site.root}):")
+                for line in sorted(site.changes) + sorted(site.errors):
+                    print(f"   {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply the nav and copy updates to many site checkouts at once.')
+    parser.add_argument('roots', nargs='*',
+                        help='Site roots to update')
+    parser.add_argument('--manifest', type=str, default=None,
+                        help='JSON or text file listing site roots')
+    parser.add_argument('--tools', type=str, default=','.join(TOOLS),
+                        help=f'Comma-separated tools to run (default: {",".join(TOOLS)})')
+    parser.add_argument('--apply', action='store_true',
+                        help='Actually modify files (default is dry run)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes shared by all sites (0 = one per CPU, default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='Ignore the incremental manifests and re-scan every file')
+    parser.add_argument('--report', metavar='FILE',
+                        help='Write the consolidated JSON report to FILE')
+    args = parser.parse_args()
+
+    pairs = [(None, Path(root)) for root in args.roots]
+    if args.manifest:
+        pairs += load_site_list(args.manifest)
+    if not pairs:
+        parser.error('give site roots or --manifest')
+    tools = tuple(tool.strip() for tool in args.tools.split(',') if tool.strip())
+    unknown = [tool for tool in tools if tool not in TOOLS]
+    if unknown:
+        parser.error(f"unknown tool(s): {', '.join(unknown)} (choose from {', '.join(TOOLS)})")
+
+    sites = []
+    names = set()
+    for name, root in pairs:
+        if not (root / 'index.html').exists():
+            print(f"❌ Skipping {root}: index.html not found")
+            continue
+        # Every file must belong to exactly one site: a root listed twice, or
+        # one inside another, would stage the same files twice
+        resolved = root.resolve()
+        overlap = next((site for site in sites
+                        if resolved.is_relative_to(site.root) or site.root.is_relative_to(resolved)), None)
+        if overlap:
+            relation = 'same as' if resolved == overlap.root else 'overlaps'
+            print(f"❌ Skipping {root}: {relation} site '{overlap.name}' ({overlap.root})")
+            continue
+        name = name or resolved.name
+        unique, n = name, 2
+        while unique in names:
+            unique, n = f"{name}-{n}", n + 1
+        names.add(unique)
+        sites.append(Site(unique, root, tools))
+    if not sites:
+        return 1
+
+    runner = MultiSiteRunner(sites, tools=tools, jobs=args.jobs, dry_run=not args.apply, force=args.force)
+    print(f"{'DRY RUN - ' if runner.dry_run else ''}🚀 {len(sites)} sites, tools: {', '.join(tools)} "
+          f"(jobs: {resolve_jobs(args.jobs)})\n")
+    ok = runner.run()
+    runner.print_summary()
+
+    if args.report:
+        tmp_path = f"{args.report}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(runner.to_dict(), f, indent=2)
+        os.replace(tmp_path, args.report)
+        print(f"\n📝 Report written to {args.report}")
+    if runner.dry_run and any(site.changes for site in sites):
+        print("\nTo apply these changes, run again with --apply")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Measure what every page in sitemap.xml costs to load and check it against budgets.
+
+For each page the local stylesheets, scripts, images, icons and the images
+and fonts its CSS pulls in (url()s in rules that can match the page, and
+every @font-face) are resolved to files and measured:
+
+- total: the page plus every local resource it loads (each file once)
+- blocking: the page plus render-blocking stylesheets and synchronous scripts
+- requests: every resource fetched, local or third-party
+- largest image: the biggest single image the page loads
+
+Third-party resources count as requests but not as bytes. Point --dir at
+dist/ to measure what is actually deployed.
+
+Each page is checked against DEFAULT_BUDGETS, overridden per page by
+page-budgets.json ({"default": {...}, "/calculator/": {...}}), and the
+results are appended to page-budget-history.json so a regression against
+the previous run of the same --dir is reported (entries are keyed by the
+resolved root, so runs on the source tree and on dist/ don't mix). Pages
+are analyzed on a thread pool that shares one cache of file sizes and
+parsed stylesheets, so styles.css is read once per run rather than once
+per page. A page that cannot be read or parsed is reported and counted as
+failed; the other pages are still measured.
+
+Usage:
+    python page_budget.py                   # measure the source tree
+    python page_budget.py --dir dist        # measure the build
+    python page_budget.py --no-history      # don't record this run
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from critical_css import element_tokens, may_match, parse_css
+from fingerprint import resolve_ref
+from html_index import HtmlIndex
+from parallel import resolve_jobs
+
+BUDGETS_FILE = 'page-budgets.json'
+HISTORY_FILE = 'page-budget-history.json'
+HISTORY_LIMIT = 200
+
+DEFAULT_BUDGETS = {
+    'total_kb': 1024,
+    'blocking_kb': 150,
+    'requests': 40,
+    'largest_image_kb': 250,
+}
+
+# A page whose total grows by more than this since the last run is reported as a regression
+REGRESSION_RATIO = 0.05
+
+SITEMAP_NS = {'sm': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)', re.I)
+IMAGE_SUFFIXES = ('.webp', '.png', '.jpg', '.jpeg', '.gif', '.avif', '.svg', '.ico')
+ICON_RELS = ('icon', 'shortcut', 'apple-touch-icon', 'preload', 'modulepreload')
+
+
+def sitemap_pages(root_dir, sitemap='sitemap.xml'):
+    """[(url, page path relative to root)] for every <loc> in the sitemap that exists locally."""
+    tree = ElementTree.parse(os.path.join(root_dir, sitemap))
+    pages = []
+    for loc in tree.getroot().iterfind('sm:url/sm:loc', SITEMAP_NS):
+        url = loc.text.strip()
+        rel_path = resolve_ref(url, '')
+        if rel_path is None:
+            continue
+        rel_path = '' if rel_path == '.' else rel_path
+        if not rel_path.endswith('.html'):
+            rel_path = (rel_path + '/index.html').lstrip('/')
+        pages.append((url, rel_path))
+    return pages
+
+
+def css_references(css):
+    """[(selectors or None, url)] for every url() in a stylesheet; None means always loaded (@font-face)."""
+    refs = []
+
+    def walk(items):
+        for item in items:
+            if item[0] == 'group':
+                walk(item[2])
+                continue
+            text = item[2] if item[0] == 'rule' else item[1]
+            selectors = item[1] if item[0] == 'rule' else None
+            for m in CSS_URL_RE.finditer(text):
+                url = m.group(2).strip()
+                if not url.startswith('data:'):
+                    refs.append((selectors, url))
+    walk(parse_css(css))
+    return refs
+
+
+class ReferenceCache:
+    """File sizes and parsed stylesheet references, shared by every page in a run. Thread-safe."""
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.lock = threading.Lock()
+        self.sizes = {}
+        self.stylesheets = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, table, key, load):
+        with self.lock:
+            if key in table:
+                self.hits += 1
+                return table[key]
+        value = load(key)
+        with self.lock:
+            self.misses += 1
+            return table.setdefault(key, value)
+
+    def size(self, rel_path):
+        """Bytes of a site file, or None if it does not exist."""
+        def load(rel_path):
+            try:
+                return os.path.getsize(os.path.join(self.root_dir, rel_path))
+            except OSError:
+                return None
+        return self._cached(self.sizes, rel_path, load)
+
+    def stylesheet(self, rel_path):
+        """css_references() of a site stylesheet, resolved to site paths: [(selectors, path or url)]."""
+        def load(rel_path):
+            try:
+                with open(os.path.join(self.root_dir, rel_path), 'r', encoding='utf-8') as f:
+                    css = f.read()
+            except OSError:
+                return []
+            base_dir = os.path.dirname(rel_path)
+            return [(selectors, resolve_ref(url, base_dir) or url) for selectors, url in css_references(css)]
+        return self._cached(self.stylesheets, rel_path, load)
+
+
+def _is_blocking_script(attrs):
+    return not ('async' in attrs or 'defer' in attrs or attrs.get('type') == 'module')
+
+
+def _is_blocking_stylesheet(attrs):
+    return (attrs.get('media', 'all') in ('all', 'screen', '')
+            and 'disabled' not in attrs)
+
+
+def _inside(node, tag):
+    parent = node.parent
+    while parent is not None:
+        if parent.tag == tag:
+            return True
+        parent = parent.parent
+    return False
+
+
+def analyze_page(root_dir, rel_path, cache):
+    """
+    Load metrics for one page.
+    Returns: {'html', 'total', 'blocking', 'requests', 'external',
+              'largest_image': [path, bytes] or None, 'missing': [paths]}
+    """
+    with open(os.path.join(root_dir, rel_path), 'r', encoding='utf-8') as f:
+        text = f.read()
+    base_dir = os.path.dirname(rel_path)
+    index = HtmlIndex(text)
+    tokens = element_tokens(index.elements)
+
+    local = {}      # site path -> blocking?
+    external = set()
+    css_refs = []   # (selectors, site path or url) from stylesheets and <style> blocks
+
+    def add(url, blocking=False, base=base_dir):
+        site_path = resolve_ref(url, base)
+        if site_path is None:
+            if url.startswith(('http://', 'https://', '//')):
+                external.add(url)
+            return None
+        local[site_path] = local.get(site_path, False) or blocking
+        return site_path
+
+    for node in index.elements:
+        attrs = node.attrs
+        if node.tag == 'link' and not _inside(node, 'noscript'):
+            rel = attrs.get('rel', '').lower().split()
+            href = attrs.get('href', '')
+            if 'stylesheet' in rel:
+                site_path = add(href, _is_blocking_stylesheet(attrs))
+                if site_path:
+                    css_refs.extend(cache.stylesheet(site_path))
+            elif href and any(name in rel for name in ICON_RELS):
+                site_path = add(href)
+                if site_path and attrs.get('as') == 'style':
+                    css_refs.extend(cache.stylesheet(site_path))
+        elif node.tag == 'script' and 'src' in attrs:
+            add(attrs['src'], _is_blocking_script(attrs))
+        elif node.tag in ('img', 'source', 'video') and not _inside(node, 'noscript'):
+            for name in ('src', 'poster'):
+                if attrs.get(name):
+                    add(attrs[name])
+        elif node.tag == 'style':
+            css_refs.extend((selectors, resolve_ref(url, base_dir) or url)
+                            for selectors, url in css_references(node.inner(text)))
+        if 'style' in attrs:
+            for m in CSS_URL_RE.finditer(attrs['style']):
+                add(m.group(2).strip())
+
+    for selectors, target in css_refs:
+        if selectors is None or any(may_match(selector, tokens) for selector in selectors):
+            if target.startswith(('http://', 'https://', '//')):
+                external.add(target)
+            elif not target.startswith('data:'):
+                local.setdefault(target, False)
+
+    html_bytes = len(text.encode('utf-8'))
+    metrics = {'html': html_bytes, 'total': html_bytes, 'blocking': html_bytes,
+               'requests': 1 + len(local) + len(external), 'external': len(external),
+               'largest_image': None, 'missing': []}
+    for site_path, blocking in sorted(local.items()):
+        size = cache.size(site_path)
+        if size is None:
+            metrics['missing'].append(site_path)
+            continue
+        metrics['total'] += size
+        if blocking:
+            metrics['blocking'] += size
+        if site_path.lower().endswith(IMAGE_SUFFIXES):
+            if metrics['largest_image'] is None or size > metrics['largest_image'][1]:
+                metrics['largest_image'] = [site_path, size]
+    return metrics
+
+
+def load_budgets(path):
+    """{'default': budgets, url: budgets} with DEFAULT_BUDGETS filled in, from an optional JSON file."""
+    overrides = {}
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+    default = dict(DEFAULT_BUDGETS, **overrides.get('default', {}))
+    budgets = {'default': default}
+    for url, values in overrides.items():
+        if url != 'default':
+            budgets[url] = dict(default, **values)
+    return budgets
+
+
+def _page_key(url):
+    """'https://insurio.ca/compare/' -> '/compare/'"""
+    rel_path = resolve_ref(url, '')
+    return '/' if rel_path in (None, '.', '') else '/' + rel_path + ('/' if url.endswith('/') else '')
+
+
+def check_budget(metrics, budget):
+    """Descriptions of every budget the page exceeds."""
+    over = []
+    measured = {
+        'total_kb': metrics['total'] / 1024,
+        'blocking_kb': metrics['blocking'] / 1024,
+        'requests': metrics['requests'],
+        'largest_image_kb': metrics['largest_image'][1] / 1024 if metrics['largest_image'] else 0,
+    }
+    for name, limit in budget.items():
+        if name in measured and limit and measured[name] > limit:
+            over.append(f"{name} {measured[name]:.0f} > {limit}")
+    return over
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️  Could not read {path}, starting a new history")
+        return []
+
+
+def save_history(path, history):
+    """Write the history atomically, keeping the last HISTORY_LIMIT runs."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history[-HISTORY_LIMIT:], f, indent=1)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check page weight and critical-path budgets for every page in sitemap.xml.')
+    parser.add_argument('--dir', type=str, default='.',
+                        help='Root directory of your website, or dist/ (default: current directory)')
+    parser.add_argument('--budgets', type=str, default=None,
+                        help=f'Budget overrides JSON (default: {BUDGETS_FILE} in --dir if present)')
+    parser.add_argument('--history', type=str, default=HISTORY_FILE,
+                        help=f'History file to append results to (default: {HISTORY_FILE})')
+    parser.add_argument('--no-history', action='store_true',
+                        help='Do not record this run')
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help='Number of worker threads (0 = one per CPU, default: 0)')
+    args = parser.parse_args()
+
+    root_dir = os.path.abspath(args.dir)
+    if not os.path.exists(os.path.join(root_dir, 'sitemap.xml')):
+        print(f"Error: sitemap.xml not found in {root_dir}")
+        return 1
+
+    budgets = load_budgets(args.budgets or os.path.join(root_dir, BUDGETS_FILE))
+    pages = sitemap_pages(root_dir)
+    cache = ReferenceCache(root_dir)
+    jobs = resolve_jobs(args.jobs)
+    print(f"📏 Measuring {len(pages)} pages in {root_dir} (threads: {jobs})\n")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [(url, rel_path, pool.submit(analyze_page, root_dir, rel_path, cache)) for url, rel_path in pages]
+        results = {}
+        failed = 0
+        for url, rel_path, future in futures:
+            try:
+                results[_page_key(url)] = future.result()
+            except Exception as e:
+                print(f"✗ {url}: {e}")
+                failed += 1
+    elapsed = time.perf_counter() - started
+
+    history = load_history(args.history)
+    previous = next((entry['pages'] for entry in reversed(history) if entry.get('root') == root_dir), {})
+
+    over_budget = 0
+    regressions = 0
+    print(f"  {'page':<16} {'total':>9} {'blocking':>9} {'reqs':>5}  {'largest image':<34}")
+    for key, metrics in results.items():
+        largest = metrics['largest_image']
+        largest_text = f"{largest[0][-24:]} {largest[1] / 1024:.0f}KB" if largest else '-'
+        print(f"  {key:<16} {metrics['total'] / 1024:>7.1f}KB {metrics['blocking'] / 1024:>7.1f}KB "
+              f"{metrics['requests']:>5}  {largest_text:<34}")
+        over = check_budget(metrics, budgets.get(key, budgets['default']))
+        if over:
+            over_budget += 1
+            print(f"    ✗ over budget: {', '.join(over)}")
+        before = previous.get(key)
+        if before and metrics['total'] > before['total'] * (1 + REGRESSION_RATIO):
+            regressions += 1
+            print(f"    ⚠️  total grew {(metrics['total'] - before['total']) / 1024:+.1f}KB since the last run")
+        for missing in metrics['missing']:
+            print(f"    ⚠️  missing: {missing}")
+
+    print(f"\n{'=' * 60}")
+    print(f"Pages: {len(results)} measured in {elapsed:.2f}s "
+          f"(reference cache: {cache.hits} hits, {cache.misses} misses)")
+    print(f"Over budget: {over_budget}")
+    print(f"Regressions since last run: {regressions}")
+
+    if not args.no_history:
+        history.append({'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'dir': args.dir, 'root': root_dir,
+                        'pages': results})
+        save_history(args.history, history)
+        print(f"Recorded in {args.history}")
+
+    return 1 if over_budget or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Run per-file work across a process pool.
+
+Used by update_nav.py and auto_update.py for their --jobs option. Every file
+is independent, so work is fanned out to worker processes and the results
+are handed back in input order, which keeps summaries deterministic. An
+exception raised for one file is captured and reported for that file
+instead of aborting the whole run.
+
+map_balanced() is the scheduler multisite.py shares across many sites:
+files are handed out one at a time, largest first, so a few big pages
+never end up queued behind each other on one worker.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def resolve_jobs(jobs):
+    """Translate a --jobs value into a worker count (0 or less = one per CPU)."""
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def _call(func, item):
+    """Run func(item) and capture any failure as a message instead of raising."""
+    try:
+        return func(item), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def map_files(func, items, jobs=1):
+    """
+    Apply func to every item, in parallel when jobs > 1.
+    func must be picklable (a module-level function or a functools.partial of one).
+
+    Yields: (item, result, error) in the same order as items. error is None on
+    success, otherwise a one-line description and result is None.
+    """
+    items = list(items)
+    jobs = min(resolve_jobs(jobs), len(items)) if items else 1
+
+    if jobs <= 1:
+        for item in items:
+            result, error = _call(func, item)
+            yield item, result, error
+        return
+
+    # Batch several files per task so IPC overhead stays small on large sites
+    chunksize = max(1, len(items) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        outcomes = pool.map(_call, [func] * len(items), items, chunksize=chunksize)
+        for item, (result, error) in zip(items, outcomes):
+            yield item, result, error
+
+
+def map_balanced(func, items, jobs=1, cost=None):
+    """
+    Like map_files(), but balanced for uneven work: items are submitted
+    largest cost(item) first (longest processing time first) and each idle
+    worker takes the next one. cost runs in the parent only.
+
+    Yields: (item, result, error) as items finish, not in input order.
+    """
+    items = list(items)
+    if cost is not None:
+        items.sort(key=cost, reverse=True)
+    jobs = min(resolve_jobs(jobs), len(items)) if items else 1
+
+    if jobs <= 1:
+        for item in items:
+            result, error = _call(func, item)
+            yield item, result, error
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_call, func, item): item for item in items}
+        for future in as_completed(futures):
+            result, error = future.result()
+            yield futures[future], result, error
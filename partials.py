@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Compose pages from shared partials, rebuilding only the pages that change.
+
+A partial is an HTML fragment in partials/<name>.html. A page includes it by
+wrapping a region in markers; whatever is between the markers is replaced by
+the partial's content on every build:
+
+    <!-- partial:footer -->
+    ...generated, do not edit by hand...
+    <!-- /partial:footer -->
+
+The build remembers which pages include which partials, the hash of every
+partial, and where each region sits in each page (.insurio-cache/partials.json).
+When a partial changes it is compiled once and spliced into its dependent
+pages at the recorded offsets; pages whose source has not changed are not
+re-tokenized, and pages that include nothing that changed are not read.
+
+Relative URLs in a partial are written as seen from the site root (as in
+index.html) and rebased for each page's folder when spliced, so a footer
+logo at images/logo-white.png becomes ../images/logo-white.png in
+compare/index.html. Every reference a partial puts into a page is checked
+against the tree, and unresolved ones are reported as errors.
+
+Usage:
+    python partials.py                     # build (write changed pages)
+    python partials.py --check             # exit 1 if any page is out of date
+    python partials.py --init footer --selector footer --from index.html
+                                           # adopt a block as a partial and mark it up in every page
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import re
+import sys
+from pathlib import Path
+
+from urllib.parse import unquote, urlsplit
+
+from batch_writer import BatchWriteError, BatchWriter
+from fingerprint import CSS_URL_RE, SRCSET_ATTRS, resolve_ref
+from html_index import HtmlIndex, apply_splices
+from link_check import IGNORED_SCHEMES, extract_refs
+from manifest import CACHE_DIR, content_hash, file_state
+from update_nav import find_html_files
+
+PARTIALS_DIR = 'partials'
+MARKER_RE = re.compile(r'^(/?)partial:([\w-]+)$')
+# Attributes holding one URL that is rebased for the page a partial lands in
+REBASE_ATTRS = ('href', 'src', 'poster', 'data-src', 'action')
+
+
+def marker(name, closing=False):
+    return f"<!-- {'/' if closing else ''}partial:{name} -->"
+
+
+def find_regions(content):
+    """
+    Locate partial regions in a page with one tokenization.
+    Returns: [(name, start, end)] offsets of the content between each marker pair.
+    """
+    regions = []
+    open_markers = {}
+    for node in HtmlIndex(content).comments:
+        m = MARKER_RE.match(node.text)
+        if not m:
+            continue
+        closing, name = m.groups()
+        if not closing:
+            open_markers[name] = node.end
+        elif name in open_markers:
+            # The closing marker's own indentation stays outside the region
+            start, end = open_markers.pop(name), node.start
+            while end > start and content[end - 1] in ' \t':
+                end -= 1
+            regions.append((name, start, end))
+    return sorted(regions, key=lambda region: region[1])
+
+
+def _indent_before(text, offset):
+    """Whitespace between the start of offset's line and offset."""
+    line_start = text.rfind('\n', 0, offset) + 1
+    prefix = text[line_start:offset]
+    return prefix if not prefix.strip() else ''
+
+
+def rebase_url(url, from_dir, to_dir):
+    """
+    A relative url written in from_dir, rewritten to reach the same file from
+    to_dir ('' is the site root). Root-relative, external and fragment-only
+    URLs, and ones that leave the site, are returned unchanged.
+    """
+    stripped = url.strip()
+    parts = urlsplit(stripped)
+    if (from_dir == to_dir or parts.scheme or parts.netloc or not parts.path
+            or parts.path.startswith('/') or stripped.lower().startswith(IGNORED_SCHEMES)):
+        return url
+    target = posixpath.normpath(posixpath.join(from_dir, parts.path))
+    if target.startswith('..'):
+        return url
+    path = posixpath.relpath(target, to_dir or '.')
+    if parts.path.endswith('/') or target == '.':
+        path = path.rstrip('/') + '/'
+    # The path comes before any ?query or #fragment, which are kept as they are
+    end = stripped.index(parts.path) + len(parts.path)
+    return path + stripped[end:]
+
+
+def rebase_html(html, from_dir, to_dir):
+    """Rebase every relative URL in an HTML fragment (attributes, srcset, style url()) from from_dir to to_dir."""
+    if from_dir == to_dir:
+        return html
+
+    def css(value):
+        return CSS_URL_RE.sub(lambda m: f"url({m.group(1)}{rebase_url(m.group(2), from_dir, to_dir)}{m.group(1)})", value)
+
+    splices = []
+    for node in HtmlIndex(html).elements:
+        for name in REBASE_ATTRS + SRCSET_ATTRS + ('style',):
+            span = node.attr_span(name, html)
+            if span is None:
+                continue
+            value = html[span[0]:span[1]]
+            if name == 'style':
+                new_value = css(value)
+            elif name in SRCSET_ATTRS:
+                candidates = []
+                for candidate in value.split(','):
+                    words = candidate.strip().split(None, 1)
+                    if words:
+                        words[0] = rebase_url(words[0], from_dir, to_dir)
+                    candidates.append(' '.join(words))
+                new_value = ', '.join(candidates)
+            else:
+                new_value = rebase_url(value, from_dir, to_dir)
+            if new_value != value:
+                splices.append((span[0], span[1], new_value))
+        if node.tag == 'style':
+            inner = node.inner(html)
+            new_inner = css(inner)
+            if new_inner != inner:
+                splices.append((node.open_end, node.close_start, new_inner))
+    return apply_splices(html, splices)
+
+
+def page_dir(rel_path):
+    """'compare/index.html' -> 'compare', 'index.html' -> ''"""
+    return posixpath.dirname(rel_path)
+
+
+def splice_regions(content, regions, partials):
+    """
+    Replace each region's content with its partial.
+    Returns: (new_content, new_regions) with offsets adjusted for the new content.
+    """
+    splices = []
+    new_regions = []
+    shift = 0
+    for name, start, end in regions:
+        body = partials.get(name)
+        if body is None:
+            new_regions.append((name, start + shift, end + shift))
+            continue
+        splices.append((start, end, body))
+        new_regions.append((name, start + shift, start + shift + len(body)))
+        shift += len(body) - (end - start)
+    return apply_splices(content, splices), new_regions
+
+
+class PartialBuilder:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.cache_path = self.root / CACHE_DIR / 'partials.json'
+        self.cache = {'partials': {}, 'pages': {}}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.cache = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def compile_partials(self):
+        """Read every partial once. Returns: ({name: body}, {name: hash})."""
+        bodies = {}
+        hashes = {}
+        partial_dir = self.root / PARTIALS_DIR
+        if partial_dir.is_dir():
+            for path in sorted(partial_dir.glob('*.html')):
+                data = path.read_bytes()
+                # Regions keep the page's own line breaks around the markers
+                bodies[path.stem] = '\n' + data.decode('utf-8').strip('\n') + '\n'
+                hashes[path.stem] = content_hash(data)
+        return bodies, hashes
+
+    def build(self, check=False):
+        """
+        Rebuild pages affected by changed partials or changed page sources.
+        Returns: (list of rebuilt or stale relative paths, list of error messages)
+        """
+        bodies, hashes = self.compile_partials()
+        changed = {name for name, digest in hashes.items()
+                   if self.cache['partials'].get(name) != digest}
+        removed = set(self.cache['partials']) - set(hashes)
+
+        writer = BatchWriter()
+        updated = []
+        errors = []
+        pages = {}
+        rebased = {}   # page folder -> {name: body rebased for pages in that folder}
+
+        for path in find_html_files(self.root):
+            rel_path = Path(path).relative_to(self.root).as_posix()
+            entry = self.cache['pages'].get(rel_path)
+            st = os.stat(path)
+            source_unchanged = entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns
+
+            if source_unchanged:
+                deps = {name for name, _, _ in entry['regions']}
+                if not deps & (changed | removed):
+                    pages[rel_path] = entry
+                    continue
+                # Source untouched since the last build: recorded offsets are still valid
+                content = Path(path).read_bytes().decode('utf-8')
+                regions = [tuple(region) for region in entry['regions']]
+            else:
+                data = Path(path).read_bytes()
+                content = data.decode('utf-8')
+                regions = find_regions(content)
+                if not regions:
+                    # Remember pages without partials so the next build only stats them
+                    pages[rel_path] = dict(file_state(path, data), regions=[])
+                    continue
+
+            base_dir = page_dir(rel_path)
+            if base_dir not in rebased:
+                rebased[base_dir] = {name: rebase_html(body, '', base_dir) for name, body in bodies.items()}
+            page_bodies = rebased[base_dir]
+            for name in sorted({name for name, _, _ in regions}):
+                if name not in bodies:
+                    errors.append(f"{rel_path}: unknown partial '{name}'")
+                    continue
+                for url in self.missing_refs(page_bodies[name], base_dir):
+                    errors.append(f"{rel_path}: partial '{name}' references {url}, which does not exist")
+
+            new_content, new_regions = splice_regions(content, regions, page_bodies)
+            new_entry = {'regions': [list(region) for region in new_regions]}
+            if new_content != content:
+                updated.append(rel_path)
+                if check:
+                    continue
+                data = new_content.encode('utf-8')
+                try:
+                    writer.stage(path, data)
+                except BatchWriteError as e:
+                    return [], errors + [f"Write failed, no pages changed: {e}"]
+                new_entry['hash'] = content_hash(data)
+            elif check:
+                continue
+            else:
+                new_entry.update(file_state(path, content.encode('utf-8')))
+            pages[rel_path] = new_entry
+
+        if check:
+            return updated, errors
+
+        try:
+            writer.commit()
+        except BatchWriteError as e:
+            return [], errors + [f"Write failed, no pages changed: {e}"]
+
+        for rel_path in updated:
+            entry = pages[rel_path]
+            entry.update(file_state(self.root / rel_path, digest=entry['hash']))
+
+        self.cache = {'partials': hashes, 'pages': pages}
+        self.save()
+        return updated, errors
+
+    def missing_refs(self, html, base_dir):
+        """URLs in html that do not resolve to a file in the tree from a page in base_dir."""
+        missing = []
+        refs, _ = extract_refs(html)
+        for _, url, _ in refs:
+            if url.lower().startswith(IGNORED_SCHEMES):
+                continue
+            rel_path = resolve_ref(url, base_dir)
+            if rel_path is None:
+                continue
+            target = self.root / unquote(rel_path)
+            if not (target.is_file() or (target / 'index.html').is_file()):
+                missing.append(url)
+        return missing
+
+    def save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def init_partial(self, name, selector, source):
+        """
+        Adopt an element as a partial: copy it from the source page into
+        partials/<name>.html, with relative URLs rebased to the site root, and
+        wrap the matching element in every page with markers. Each page gets
+        the block rebased for its own folder. Returns: (pages marked up, pages
+        whose block differed)
+        """
+        source = Path(source).as_posix()
+        source_text = (self.root / source).read_text(encoding='utf-8')
+        node = HtmlIndex(source_text).select_one(selector)
+        if node is None:
+            raise ValueError(f"{selector!r} not found in {source}")
+        block = rebase_html(node.outer(source_text), page_dir(source), '')
+        indent = _indent_before(source_text, node.start)
+
+        partial_path = self.root / PARTIALS_DIR / f"{name}.html"
+        partial_path.parent.mkdir(exist_ok=True)
+        partial_path.write_text(indent + block + '\n', encoding='utf-8')
+
+        writer = BatchWriter()
+        marked = []
+        differed = []
+        for path in find_html_files(self.root):
+            rel_path = Path(path).relative_to(self.root).as_posix()
+            content = Path(path).read_text(encoding='utf-8')
+            if any(region[0] == name for region in find_regions(content)):
+                continue
+            target = HtmlIndex(content).select_one(selector)
+            if target is None:
+                continue
+            page_block = rebase_html(block, '', page_dir(rel_path))
+            if target.outer(content) != page_block:
+                differed.append(rel_path)
+            page_indent = _indent_before(content, target.start)
+            wrapped = f"{marker(name)}\n{indent}{page_block}\n{page_indent}{marker(name, closing=True)}"
+            writer.stage(path, apply_splices(content, [(target.start, target.end, wrapped)]).encode('utf-8'))
+            marked.append(rel_path)
+        writer.commit()
+        return marked, differed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compose pages from shared partials (partials/*.html).')
+    parser.add_argument('--dir', type=str, default='.',
+                        help='Root directory of your website (default: current directory)')
+    parser.add_argument('--check', action='store_true',
+                        help='Only report pages that are out of date (exit 1 if any)')
+    parser.add_argument('--init', metavar='NAME',
+                        help='Create partials/NAME.html from --selector in --from and mark it up in every page')
+    parser.add_argument('--selector', help='Element to adopt with --init (e.g. footer, nav.mobile-nav)')
+    parser.add_argument('--from', dest='source', default='index.html',
+                        help='Page to copy the --init block from (default: index.html)')
+    args = parser.parse_args()
+
+    builder = PartialBuilder(os.path.abspath(args.dir))
+
+    if args.init:
+        if not args.selector:
+            parser.error('--init requires --selector')
+        marked, differed = builder.init_partial(args.init, args.selector, args.source)
+        print(f"✓ Created {PARTIALS_DIR}/{args.init}.html from {args.source} ({args.selector})")
+        print(f"✓ Marked up {len(marked)} pages")
+        if differed:
+            print(f"⚠ {len(differed)} pages had a different version of this block and now use the partial:")
+            for rel_path in differed:
+                print(f"   {rel_path}")
+            print("   Review with: git diff")
+        return 0
+
+    updated, errors = builder.build(check=args.check)
+    for error in errors:
+        print(f"✗ {error}")
+    if args.check:
+        for rel_path in updated:
+            print(f"→ Out of date: {rel_path}")
+        print(f"\n{len(updated)} pages out of date")
+        return 1 if updated or errors else 0
+
+    for rel_path in updated:
+        print(f"✓ Rebuilt: {rel_path}")
+    print(f"\n{len(updated)} pages rebuilt")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Add resource hints and loading priorities to every page.
+
+For each page the first screen is taken to be everything up to the end of
+the first <section> (see critical_css.fold_offset). Then:
+
+- The largest image on the first screen (an <img>, or a background image
+  set by a <style> block, a stylesheet or the element's own style attribute,
+  like the for-clients hero) is the likely LCP element. An <img> gets
+  fetchpriority="high"; a background image gets a <link rel="preload"
+  fetchpriority="high"> in <head>, since the browser only finds it after CSS.
+- Other first-screen images lose loading="lazy" if they have it.
+- Images further down get loading="lazy" and decoding="async".
+- Third-party scripts stop blocking: external <script src> gets defer, and
+  inline loaders that inject a third-party script (the LinkedIn Insight tag)
+  run on window load instead of during parsing.
+
+The report estimates each page's critical-path bytes before and after: the
+HTML, render-blocking CSS and JS, and the images fetched during the initial
+load. Third-party resources count as EXTERNAL_ESTIMATE bytes each.
+
+Usage:
+    python resource_hints.py            # Dry run: report only
+    python resource_hints.py --apply    # Rewrite pages
+"""
+
+import argparse
+import os
+import re
+import sys
+from functools import lru_cache
+
+from batch_writer import BatchWriteError, BatchWriter
+from critical_css import fold_offset, parse_css, selector_needs
+from fingerprint import resolve_ref
+from html_index import HtmlIndex, apply_splices
+from parallel import map_files, resolve_jobs
+from update_nav import find_html_files
+
+# Bytes assumed for a third-party script or stylesheet we cannot measure
+EXTERNAL_ESTIMATE = 20 * 1024
+
+CSS_URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)', re.I)
+SCRIPT_INJECT_RE = re.compile(r'createElement\(\s*["\']script["\']\s*\)')
+EXTERNAL_URL_RE = re.compile(r'["\'](https?:)?//[^"\']+["\']')
+LOAD_WRAPPER = "window.addEventListener('load', function () {"
+
+
+@lru_cache(maxsize=None)
+def local_size(path):
+    """Size of a local file, 0 if it does not exist. Cached for the whole run."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+@lru_cache(maxsize=None)
+def stylesheet_backgrounds(path, mtime):
+    """Background images in a stylesheet file, parsed once per file version (see backgrounds())."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return backgrounds(f.read())
+
+
+def backgrounds(css):
+    """[(classes the element needs, url)] for every rule that sets a background image."""
+    found = []
+
+    def walk(items):
+        for item in items:
+            if item[0] == 'group':
+                walk(item[2])
+            elif item[0] == 'rule' and 'background' in item[2]:
+                for m in CSS_URL_RE.finditer(item[2]):
+                    url = m.group(2).strip()
+                    if url.startswith('data:'):
+                        continue
+                    for selector in item[1]:
+                        needs = selector_needs(selector)
+                        if needs and needs[-1][1]:
+                            found.append((needs[-1][1], url))
+    walk(parse_css(css))
+    return found
+
+
+def is_external(url):
+    return url.startswith(('http://', 'https://', '//'))
+
+
+def _inside(node, tag):
+    parent = node.parent
+    while parent is not None:
+        if parent.tag == tag:
+            return True
+        parent = parent.parent
+    return False
+
+
+class PageAnalysis:
+    """Images, scripts and stylesheets of one page, and where its first screen ends."""
+
+    def __init__(self, text, rel_path, root):
+        self.text = text
+        self.root = root
+        self.base_dir = os.path.dirname(rel_path).replace(os.sep, '/')
+        self.index = HtmlIndex(text)
+        self.fold = fold_offset(self.index)
+
+    def local_path(self, url, base_dir=None):
+        rel_path = resolve_ref(url, self.base_dir if base_dir is None else base_dir)
+        return os.path.join(self.root, rel_path) if rel_path else None
+
+    def images(self):
+        """[(node, bytes or None, above the fold)] for every visible <img>."""
+        found = []
+        for node in self.index.by_tag.get('img', []):
+            if _inside(node, 'noscript') or 'display:none' in node.attrs.get('style', '').replace(' ', ''):
+                continue
+            src = node.attrs.get('src', '')
+            path = None if is_external(src) else self.local_path(src)
+            found.append((node, local_size(path) if path else None, node.start < self.fold))
+        return found
+
+    def stylesheets(self):
+        """[(node, local path or None)] for every render-blocking stylesheet link."""
+        found = []
+        for node in self.index.by_tag.get('link', []):
+            rel = node.attrs.get('rel', '').lower().split()
+            if 'stylesheet' in rel and node.attrs.get('media', 'all') in ('all', 'screen', ''):
+                href = node.attrs.get('href', '')
+                found.append((node, None if is_external(href) else self.local_path(href)))
+        return found
+
+    def background_candidates(self):
+        """
+        [(root-absolute url, bytes)] for background images on the first screen,
+        from stylesheet rules matching an element's classes and from url()s in
+        its inline style.
+        """
+        rules = []
+        for node in self.index.by_tag.get('style', []):
+            rules.extend((classes, url, self.base_dir) for classes, url in backgrounds(node.inner(self.text)))
+        for _, path in self.stylesheets():
+            if path and os.path.exists(path):
+                sheet_dir = os.path.relpath(os.path.dirname(path), self.root).replace(os.sep, '/').lstrip('.')
+                rules.extend((classes, url, sheet_dir)
+                             for classes, url in stylesheet_backgrounds(path, os.stat(path).st_mtime_ns))
+        found = {}
+
+        def add(url, base_dir):
+            rel_path = resolve_ref(url, base_dir)
+            if rel_path:
+                found['/' + rel_path] = local_size(os.path.join(self.root, rel_path))
+
+        for node in self.index.elements:
+            if node.start >= self.fold:
+                break
+            classes = set(node.classes)
+            for needed, url, base_dir in rules:
+                if all(name in classes for name in needed):
+                    add(url, base_dir)
+            style = node.attrs.get('style', '')
+            if 'background' in style:
+                for m in CSS_URL_RE.finditer(style):
+                    if not m.group(2).strip().startswith('data:'):
+                        add(m.group(2).strip(), self.base_dir)
+        return sorted(found.items())
+
+    def lcp_candidate(self):
+        """('img', node) or ('background', url) for the largest first-screen image, or None."""
+        best = None
+        for node, size, above in self.images():
+            if above and size and (best is None or size > best[0]):
+                best = (size, 'img', node)
+        for url, size in self.background_candidates():
+            if size and (best is None or size > best[0]):
+                best = (size, 'background', url)
+        return best[1:] if best else None
+
+    def third_party_loaders(self):
+        """Inline <script> nodes that inject a third-party script."""
+        found = []
+        for node in self.index.by_tag.get('script', []):
+            body = node.inner(self.text)
+            if 'src' in node.attrs or LOAD_WRAPPER in body:
+                continue
+            if SCRIPT_INJECT_RE.search(body) and EXTERNAL_URL_RE.search(body):
+                found.append(node)
+        return found
+
+    def critical_path_bytes(self):
+        """Estimated bytes on the critical path: {'html', 'css', 'js', 'images', 'total'}."""
+        estimate = {'html': len(self.text.encode('utf-8')), 'css': 0, 'js': 0, 'images': 0}
+        for _, path in self.stylesheets():
+            estimate['css'] += local_size(path) if path else EXTERNAL_ESTIMATE
+        for node in self.index.by_tag.get('script', []):
+            attrs = node.attrs
+            if 'src' in attrs:
+                if 'async' in attrs or 'defer' in attrs or attrs.get('type') == 'module':
+                    continue
+                src = attrs['src']
+                estimate['js'] += EXTERNAL_ESTIMATE if is_external(src) else local_size(self.local_path(src) or '')
+        estimate['js'] += EXTERNAL_ESTIMATE * len(self.third_party_loaders())
+        for node, size, above in self.images():
+            if above or node.attrs.get('loading') != 'lazy':
+                estimate['images'] += size if size is not None else EXTERNAL_ESTIMATE
+        for url, size in self.background_candidates():
+            estimate['images'] += size
+        estimate['total'] = sum(estimate.values())
+        return estimate
+
+
+def _add_attrs(node, attrs):
+    at = node.start + 1 + len(node.tag)
+    return at, at, ''.join(f' {name}="{value}"' if value is not None else f' {name}' for name, value in attrs)
+
+
+def add_hints(text, rel_path, root):
+    """
+    Rewrite one page. Returns: (new text, [change descriptions]).
+    Running it again on its own output changes nothing.
+    """
+    page = PageAnalysis(text, rel_path, root)
+    splices = []
+    changes = []
+
+    lcp = page.lcp_candidate()
+    if lcp and lcp[0] == 'background':
+        head = page.index.select_one('head')
+        url = lcp[1]
+        already = any(node.attrs.get('rel') == 'preload' and resolve_ref(node.attrs.get('href', ''), page.base_dir) == url.lstrip('/')
+                      for node in page.index.by_tag.get('link', []))
+        if head and not already:
+            first_link = next((node for node in page.index.by_tag.get('link', []) if node.is_inside(head)), None)
+            at = first_link.start if first_link else head.close_start
+            splices.append((at, at, f'<link rel="preload" as="image" href="{url}" fetchpriority="high">\n    '))
+            changes.append(f"preload LCP background {url}")
+
+    for node, _, above in page.images():
+        attrs = node.attrs
+        if lcp and lcp[0] == 'img' and node is lcp[1]:
+            if attrs.get('fetchpriority') != 'high':
+                splices.append(_add_attrs(node, [('fetchpriority', 'high')]))
+                changes.append(f"fetchpriority=high on {attrs.get('src')}")
+        if above:
+            if attrs.get('loading') == 'lazy':
+                span = node.attr_full_span('loading', text)
+                splices.append((span[0], span[1], ''))
+                changes.append(f"eager {attrs.get('src')}")
+            continue
+        add = []
+        if 'loading' not in attrs:
+            add.append(('loading', 'lazy'))
+        if 'decoding' not in attrs:
+            add.append(('decoding', 'async'))
+        if add:
+            splices.append(_add_attrs(node, add))
+            changes.append(f"lazy {attrs.get('src')}")
+
+    for node in page.index.by_tag.get('script', []):
+        attrs = node.attrs
+        src = attrs.get('src', '')
+        if src and is_external(src) and not ('async' in attrs or 'defer' in attrs or attrs.get('type') == 'module'):
+            splices.append(_add_attrs(node, [('defer', None)]))
+            changes.append(f"defer {src}")
+    for node in page.third_party_loaders():
+        splices.append((node.open_end, node.open_end, f"\n    {LOAD_WRAPPER}"))
+        splices.append((node.close_start, node.close_start, "});\n    "))
+        changes.append("third-party loader runs on load")
+
+    return apply_splices(text, splices), changes
+
+
+def process_file(task):
+    """
+    Analyze and rewrite one page. task is (file_path, root_dir).
+    Returns: (changes, critical-path estimate before, after, new content or None)
+    """
+    file_path, root_dir = task
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    rel_path = os.path.relpath(file_path, root_dir)
+    new_text, changes = add_hints(text, rel_path, root_dir)
+    before = PageAnalysis(text, rel_path, root_dir).critical_path_bytes()
+    after = PageAnalysis(new_text, rel_path, root_dir).critical_path_bytes() if changes else before
+    return changes, before, after, new_text.encode('utf-8') if changes else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add preload, fetchpriority, lazy loading and script deferral to pages.')
+    parser.add_argument('--apply', action='store_true',
+                        help='Actually modify files (default is dry run)')
+    parser.add_argument('--dir', type=str, default='.',
+                        help='Root directory of your website (default: current directory)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes (0 = one per CPU, default: 1)')
+    args = parser.parse_args()
+
+    root_dir = os.path.abspath(args.dir)
+    if not os.path.isdir(root_dir):
+        print(f"Error: Directory not found: {root_dir}")
+        return 1
+    print(f"{'DRY RUN - ' if not args.apply else ''}Scanning: {root_dir} (jobs: {resolve_jobs(args.jobs)})\n")
+
+    writer = BatchWriter()
+    changed = []
+    failed = 0
+    totals = {'before': 0, 'after': 0}
+    rows = []
+    tasks = [(path, root_dir) for path in find_html_files(root_dir)]
+    for (file_path, _), result, error in map_files(process_file, tasks, args.jobs):
+        rel_path = os.path.relpath(file_path, root_dir)
+        if error:
+            print(f"✗ Failed: {rel_path}: {error}")
+            failed += 1
+            continue
+        changes, before, after, output = result
+        totals['before'] += before['total']
+        totals['after'] += after['total']
+        rows.append((rel_path, before, after))
+        if not changes:
+            continue
+        print(f"✓ {rel_path}: {len(changes)} hints")
+        for change in changes:
+            print(f"    • {change}")
+        changed.append(rel_path)
+        if args.apply:
+            try:
+                writer.stage(file_path, output)
+            except BatchWriteError as e:
+                print(f"\n✗ Write failed, no files were changed: {e}")
+                return 1
+
+    if args.apply and changed:
+        try:
+            writer.commit()
+        except BatchWriteError as e:
+            print(f"\n✗ Write failed, no files were changed: {e}")
+            return 1
+
+    print(f"\n{'=' * 72}")
+    print("Estimated critical-path bytes (HTML + blocking CSS/JS + initial images):")
+    print(f"  {'page':<28} {'before':>10} {'after':>10}   {'css':>7} {'js':>7} {'images':>9}")
+    for rel_path, before, after in rows:
+        print(f"  {rel_path[:28]:<28} {before['total'] / 1024:>8.1f}KB {after['total'] / 1024:>8.1f}KB   "
+              f"{after['css'] / 1024:>6.1f}K {after['js'] / 1024:>6.1f}K {after['images'] / 1024:>8.1f}K")
+    if totals['before']:
+        saved = totals['before'] - totals['after']
+        print(f"  {'total':<28} {totals['before'] / 1024:>8.1f}KB {totals['after'] / 1024:>8.1f}KB   "
+              f"({saved / totals['before']:.0%} less)")
+
+    print(f"\n{'Would update' if not args.apply else 'Updated'}: {len(changed)} pages")
+    if not args.apply and changed:
+        print("\nTo apply these changes, run:")
+        print("  python resource_hints.py --apply")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Profiling and machine-readable run reports for update_nav.py and auto_update.py.
+
+With --profile or --report run.json each worker records, per file, the
+bytes read and written, time spent reading, transforming and writing, and
+for every rule: attempts, hits, guard skips, substitutions, and time spent
+searching vs. substituting. The parent merges those into a RunReport along
+with wall time per phase (discovery, read, transform, write...).
+
+Profiling splits each regex rule into a search followed by a substitution,
+so a profiled run does slightly more work than a normal one.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+def new_file_stats():
+    """Empty per-file stats, filled in by the worker that processes the file."""
+    return {
+        'bytes_read': 0,
+        'bytes_written': 0,
+        'read_s': 0.0,
+        'tokenize_s': 0.0,
+        'transform_s': 0.0,
+        'write_s': 0.0,
+        'rules': {},
+    }
+
+
+def rule_stats(file_stats, name):
+    """Stats for one rule within a file's stats, created on first use."""
+    stats = file_stats['rules'].get(name)
+    if stats is None:
+        stats = file_stats['rules'][name] = {
+            'attempts': 0,
+            'hits': 0,
+            'guarded': 0,
+            'substitutions': 0,
+            'search_s': 0.0,
+            'substitute_s': 0.0,
+        }
+    return stats
+
+
+class RunReport:
+    FILE_TOTALS = ('bytes_read', 'bytes_written', 'read_s', 'tokenize_s', 'transform_s', 'write_s')
+    RULE_TOTALS = ('attempts', 'hits', 'guarded', 'substitutions', 'search_s', 'substitute_s')
+
+    def __init__(self, tool, root, **meta):
+        self.tool = tool
+        self.root = str(root)
+        self.meta = meta
+        self.started = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.phases = {}
+        self.files = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase of the run; repeated phases accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def add_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_file(self, path, status, stats=None, error=None):
+        """
+        Record one file's outcome.
+        status: 'changed', 'unchanged', 'skipped', 'already-updated', 'no-match' or 'failed'
+        """
+        entry = {'path': path, 'status': status}
+        if stats:
+            entry.update(stats)
+        if error:
+            entry['error'] = error
+        self.files.append(entry)
+
+    def rule_totals(self):
+        """Per-rule stats summed over every file."""
+        totals = {}
+        for entry in self.files:
+            for name, stats in entry.get('rules', {}).items():
+                total = totals.setdefault(name, dict.fromkeys(self.RULE_TOTALS, 0))
+                total['files'] = total.get('files', 0) + 1
+                for key in self.RULE_TOTALS:
+                    total[key] += stats[key]
+        return totals
+
+    def to_dict(self):
+        totals = dict.fromkeys(self.FILE_TOTALS, 0)
+        statuses = {}
+        for entry in self.files:
+            statuses[entry['status']] = statuses.get(entry['status'], 0) + 1
+            for key in self.FILE_TOTALS:
+                totals[key] += entry.get(key, 0)
+        totals['files'] = len(self.files)
+        totals.update(statuses)
+
+        phases = dict(self.phases)
+        phases['total'] = time.perf_counter() - self._start
+        # Worker-side time, summed across files (exceeds wall time with --jobs > 1)
+        for key in ('read', 'tokenize', 'transform', 'write'):
+            phases.setdefault(key, totals[f"{key}_s"])
+
+        return {
+            'tool': self.tool,
+            'root': self.root,
+            'started': self.started,
+            'meta': self.meta,
+            'phases': phases,
+            'totals': totals,
+            'rules': self.rule_totals(),
+            'files': self.files,
+        }
+
+    def write(self, path):
+        """Write the report as JSON (atomically, so dashboards never read half a file)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def print_profile(self):
+        """Human-readable per-rule and per-phase profile."""
+        report = self.to_dict()
+        print("\n⏱️  Phases:")
+        for name, seconds in report['phases'].items():
+            print(f"   {name:<12} {seconds * 1000:>10.1f} ms")
+
+        print("\n⏱️  Rules (slowest first):")
+        print(f"   {'rule':<44} {'tries':>6} {'hits':>6} {'search ms':>10} {'subst ms':>10}")
+        rules = sorted(report['rules'].items(),
+                       key=lambda item: item[1]['search_s'] + item[1]['substitute_s'], reverse=True)
+        for name, stats in rules:
+            flag = '  ⚠ never matched' if not stats['hits'] else ''
+            print(f"   {name[:44]:<44} {stats['attempts']:>6} {stats['hits']:>6} "
+                  f"{stats['search_s'] * 1000:>10.2f} {stats['substitute_s'] * 1000:>10.2f}{flag}")
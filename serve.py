@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Serve the site locally with the same caching behaviour as the CDN.
+
+A small asyncio HTTP/1.1 server (stdlib only) for trying performance
+changes before they ship:
+
+- Precompressed variants written by build.py (page.html.br, page.html.gz)
+  are served as-is when the client's Accept-Encoding allows them.
+- Every response carries a strong ETag (per encoding) and Cache-Control:
+  fingerprinted assets (styles.3f9a1c2e.css) are immutable for a year,
+  pages must revalidate, everything else is cached for an hour.
+- If-None-Match answers 304; Range (a single byte range, with If-Range)
+  answers 206 or 416.
+- Recently served files are kept in an in-memory LRU (--cache-mb); an entry
+  is dropped as soon as the file's size or mtime changes.
+
+Directories serve their index.html (/compare -> 301 /compare/), and unknown
+paths serve 404.html with status 404. Dot files and folders (.git,
+.insurio-cache) and partials/ are never served.
+
+Request bodies are read and discarded (the server has nothing to post to);
+a request with Transfer-Encoding, an oversized body or too many headers is
+answered and its connection closed, so nothing is parsed out of sync.
+
+Usage:
+    python serve.py                       # serve dist/ (or . if there is no build) on :8000
+    python serve.py --dir . --port 8080   # serve the source tree
+"""
+
+import argparse
+import asyncio
+import email.utils
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import sys
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
+
+from fingerprint import HASH_LENGTH
+from partials import PARTIALS_DIR
+
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_MB = 64
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+SHORT_LIVED = 'public, max-age=3600'
+
+# (encoding token, file suffix), in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+MAX_REQUEST_LINE = 8192
+MAX_HEADERS = 100
+MAX_BODY = 64 * 1024
+
+EXTRA_TYPES = {
+    '.webp': 'image/webp',
+    '.avif': 'image/avif',
+    '.woff2': 'font/woff2',
+    '.woff': 'font/woff',
+    '.js': 'text/javascript',
+    '.json': 'application/json',
+    '.xml': 'application/xml',
+    '.txt': 'text/plain',
+}
+
+REASONS = {
+    200: 'OK', 206: 'Partial Content', 301: 'Moved Permanently', 304: 'Not Modified',
+    400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required',
+    413: 'Payload Too Large', 416: 'Range Not Satisfiable', 431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+
+def content_type(path):
+    ext = os.path.splitext(path)[1].lower()
+    mime = EXTRA_TYPES.get(ext) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if mime.startswith('text/') or mime in ('application/json', 'application/xml', 'image/svg+xml'):
+        mime += '; charset=utf-8'
+    return mime
+
+
+def cache_control(path):
+    if HASHED_NAME_RE.search(path):
+        return IMMUTABLE
+    if path.endswith(('.html', '.htm')):
+        return REVALIDATE
+    return SHORT_LIVED
+
+
+def accepted_encodings(header):
+    """Encodings the client accepts (q > 0), from an Accept-Encoding header."""
+    accepted = set()
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token and q > 0:
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single 'bytes=' range, None to ignore the
+    header (malformed or multiple ranges), or False if it cannot be satisfied.
+    """
+    m = RANGE_RE.match(header.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    first, last = m.groups()
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class FileCache:
+    """LRU of file contents and ETags, bounded by total bytes. Entries are checked against a stat on every hit."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # path -> (size, mtime_ns, data, etag)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, st):
+        entry = self.entries.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return entry[2], entry[3]
+        self.misses += 1
+        return None
+
+    def put(self, path, st, data, etag):
+        old = self.entries.pop(path, None)
+        if old:
+            self.bytes -= len(old[2])
+        if len(data) > self.max_bytes // 4:
+            return
+        self.entries[path] = (st.st_size, st.st_mtime_ns, data, etag)
+        self.bytes += len(data)
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= len(evicted[2])
+
+
+class RequestError(Exception):
+    """A request that is answered with status and then the connection closed."""
+
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+async def _readline(reader, status):
+    """One line; a line longer than the stream's limit is answered with status."""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise RequestError(status) from None
+
+
+async def read_request(reader):
+    """
+    Read one request: the request line, headers and (discarded) body.
+    Returns: (method, target, version, headers), or None when the client has
+    closed the connection. Raises RequestError for a request the connection
+    cannot continue after.
+    """
+    while True:
+        request_line = await _readline(reader, 400)
+        if not request_line:
+            return None
+        if len(request_line) > MAX_REQUEST_LINE:
+            raise RequestError(400)
+        parts = request_line.decode('latin-1').split()
+        if parts:
+            break
+    headers = {}
+    while True:
+        line = await _readline(reader, 431)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise RequestError(431)
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if len(parts) != 3:
+        raise RequestError(400)
+    # Chunked bodies are not parsed, so their bytes would be read as the next request
+    if 'transfer-encoding' in headers:
+        raise RequestError(411)
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise RequestError(400) from None
+    if length < 0:
+        raise RequestError(400)
+    if length > MAX_BODY:
+        raise RequestError(413)
+    if length:
+        await reader.readexactly(length)
+    method, target, version = parts
+    return method, target, version, headers
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class StaticServer:
+    def __init__(self, root, cache_mb=DEFAULT_CACHE_MB, log=False):
+        self.root = os.path.abspath(root)
+        self.cache = FileCache(cache_mb * 1024 * 1024)
+        self.log = log
+        self.requests = 0
+
+    def resolve(self, url_path):
+        """
+        Map a URL path to a file.
+        Returns: (status, file path or redirect location)
+        """
+        path = posixpath.normpath(unquote(url_path))
+        if not url_path.startswith('/') or '\x00' in path or path.startswith('/..'):
+            return 400, None
+        segments = path.strip('/').split('/')
+        if segments[0] == PARTIALS_DIR or any(segment.startswith('.') for segment in segments):
+            return 404, os.path.join(self.root, '404.html')
+        local = os.path.join(self.root, path.lstrip('/'))
+        if os.path.isdir(local):
+            if not url_path.endswith('/'):
+                return 301, url_path + '/'
+            local = os.path.join(local, 'index.html')
+        if os.path.isfile(local):
+            return 200, local
+        return 404, os.path.join(self.root, '404.html')
+
+    async def load(self, path):
+        """(bytes, etag, stat) of a file, from the LRU when it is unchanged."""
+        st = os.stat(path)
+        cached = self.cache.get(path, st)
+        if cached:
+            return cached[0], cached[1], st
+        data = await asyncio.get_running_loop().run_in_executor(None, _read, path)
+        etag = '"' + hashlib.sha256(data).hexdigest()[:20] + '"'
+        self.cache.put(path, st, data, etag)
+        return data, etag, st
+
+    async def respond(self, method, target, headers):
+        """Build one response. Returns: (status, [(header, value)], body)"""
+        if method not in ('GET', 'HEAD'):
+            return 405, [('Allow', 'GET, HEAD')], b''
+        url = urlsplit(target)
+        status, path = self.resolve(url.path or '/')
+        if status == 400:
+            return 400, [], b''
+        if status == 301:
+            return 301, [('Location', path + (f'?{url.query}' if url.query else ''))], b''
+        if not os.path.isfile(path):
+            return 404, [('Content-Type', 'text/plain; charset=utf-8')], b'Not Found\n'
+
+        response_headers = [('Content-Type', content_type(path)), ('Cache-Control', cache_control(path))]
+        range_header = headers.get('range') if status == 200 else None
+        # Ranges are served from the uncompressed bytes, like most CDNs do
+        encoding = None
+        served = path
+        variants = [(token, path + suffix) for token, suffix in ENCODINGS if os.path.isfile(path + suffix)]
+        if variants:
+            response_headers.append(('Vary', 'Accept-Encoding'))
+            if not range_header:
+                accepted = accepted_encodings(headers.get('accept-encoding', ''))
+                for token, variant in variants:
+                    if token in accepted:
+                        encoding, served = token, variant
+                        break
+
+        data, etag, st = await self.load(served)
+        if encoding:
+            etag = etag[:-1] + f'-{encoding}"'
+            response_headers.append(('Content-Encoding', encoding))
+        response_headers.append(('ETag', etag))
+        response_headers.append(('Last-Modified', email.utils.formatdate(st.st_mtime, usegmt=True)))
+
+        if status == 200 and self._not_modified(headers.get('if-none-match'), etag):
+            return 304, [h for h in response_headers if h[0] != 'Content-Type'], b''
+
+        if range_header:
+            response_headers.append(('Accept-Ranges', 'bytes'))
+            if_range = headers.get('if-range')
+            byte_range = parse_range(range_header, len(data)) if not if_range or if_range == etag else None
+            if byte_range is False:
+                return 416, response_headers + [('Content-Range', f'bytes */{len(data)}')], b''
+            if byte_range:
+                start, end = byte_range
+                response_headers.append(('Content-Range', f'bytes {start}-{end}/{len(data)}'))
+                return 206, response_headers, data[start:end + 1]
+        elif not encoding:
+            response_headers.append(('Accept-Ranges', 'bytes'))
+        return status, response_headers, data
+
+    @staticmethod
+    def _not_modified(header, etag):
+        if not header:
+            return False
+        tags = [tag.strip() for tag in header.split(',')]
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except RequestError as e:
+                    await self.send(writer, e.status, [], b'', False, 'HTTP/1.1')
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+                started = time.perf_counter()
+                try:
+                    status, response_headers, body = await self.respond(method, target, headers)
+                except OSError:
+                    status, response_headers, body = 500, [], b''
+                await self.send(writer, status, response_headers, b'' if method == 'HEAD' else body,
+                                keep_alive, version, len(body))
+                self.requests += 1
+                if self.log:
+                    print(f"{method} {target} {status} {len(body)}B {(time.perf_counter() - started) * 1000:.1f}ms")
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.LimitOverrunError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def send(writer, status, headers, body, keep_alive, version, length=None):
+        lines = [f"{version if version in ('HTTP/1.0', 'HTTP/1.1') else 'HTTP/1.1'} {status} {REASONS[status]}",
+                 f"Date: {email.utils.formatdate(usegmt=True)}",
+                 'Server: insurio-serve']
+        lines += [f"{name}: {value}" for name, value in headers]
+        if status != 304:
+            lines.append(f"Content-Length: {len(body) if length is None else length}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(root, host, port, cache_mb=DEFAULT_CACHE_MB, log=False):
+    server = StaticServer(root, cache_mb=cache_mb, log=log)
+    listener = await asyncio.start_server(server.handle, host, port, backlog=1024)
+    bound = listener.sockets[0].getsockname()
+    print(f"🌐 Serving {server.root} at http://{bound[0]}:{bound[1]}/ (cache: {cache_mb} MB)")
+    sys.stdout.flush()
+    async with listener:
+        try:
+            await listener.serve_forever()
+        finally:
+            print(f"\nServed {server.requests} requests "
+                  f"(file cache: {server.cache.hits} hits, {server.cache.misses} misses)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the site locally with CDN-like compression and caching headers.')
+    parser.add_argument('--dir', type=str, default=None,
+                        help='Directory to serve (default: dist/ if it exists, else the current directory)')
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Port to listen on (0 = any free port, default: {DEFAULT_PORT})')
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB,
+                        help=f'Size of the in-memory file cache (default: {DEFAULT_CACHE_MB})')
+    parser.add_argument('--log', action='store_true',
+                        help='Print one line per request')
+    args = parser.parse_args()
+
+    root = args.dir or ('dist' if os.path.isdir('dist') else '.')
+    if not os.path.isdir(root):
+        print(f"Error: Directory not found: {root}")
+        return 1
+    try:
+        asyncio.run(serve(root, args.host, args.port, cache_mb=args.cache_mb, log=args.log))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Generate sitemap.xml from the pages that actually exist.
+
+Every page found by update_nav.find_html_files is listed, except 404.html
+and pages marked <meta name="robots" content="noindex">. Pages already in
+the sitemap keep their position, priority and changefreq; new pages are
+appended with DEFAULT_PRIORITY and DEFAULT_CHANGEFREQ, and entries whose
+page is gone are dropped.
+
+<lastmod> is only emitted once a page's content has been seen to change:
+each page's content hash is kept in .insurio-cache/sitemap.json, and when it
+differs from the stored one the page's lastmod becomes today. Unchanged
+pages keep their previous lastmod, so crawlers only revisit what changed.
+The sitemap is rewritten only when the generated XML differs from the file.
+
+Usage:
+    python sitemap_gen.py            # update sitemap.xml
+    python sitemap_gen.py --check    # exit 1 if sitemap.xml is out of date
+"""
+
+import argparse
+import datetime
+import os
+import re
+import sys
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from manifest import Manifest, content_hash, file_state
+from update_nav import find_html_files
+
+SITE_URL = 'https://insurio.ca'
+SITEMAP_FILE = 'sitemap.xml'
+DEFAULT_PRIORITY = '0.5'
+DEFAULT_CHANGEFREQ = 'monthly'
+EXCLUDED_PAGES = ('404.html',)
+# Version of the hash store format (Manifest entries are tied to it)
+STORE_VERSION = 'sitemap-1'
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+NOINDEX_RE = re.compile(r'<meta\s[^>]*name=["\']robots["\'][^>]*content=["\'][^"\']*noindex', re.I)
+
+
+def page_url(rel_path):
+    """'compare/index.html' -> 'https://insurio.ca/compare/'"""
+    rel_path = rel_path.replace(os.sep, '/')
+    if rel_path == 'index.html':
+        return SITE_URL + '/'
+    if rel_path.endswith('/index.html'):
+        return f"{SITE_URL}/{rel_path[:-len('index.html')]}"
+    return f"{SITE_URL}/{rel_path}"
+
+
+def read_sitemap(path):
+    """[{'loc', 'lastmod', 'priority', 'changefreq'}] in file order; empty if there is no sitemap."""
+    if not os.path.exists(path):
+        return []
+    entries = []
+    for url in ElementTree.parse(path).getroot().iterfind(f'{{{SITEMAP_NS}}}url'):
+        entry = {}
+        for name in ('loc', 'lastmod', 'priority', 'changefreq'):
+            element = url.find(f'{{{SITEMAP_NS}}}{name}')
+            entry[name] = element.text.strip() if element is not None and element.text else None
+        if entry['loc']:
+            entries.append(entry)
+    return entries
+
+
+def render_sitemap(entries):
+    """Sitemap XML, one <url> per line like the hand-written file."""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<urlset xmlns="{SITEMAP_NS}">']
+    for entry in entries:
+        parts = [f"<loc>{escape(entry['loc'])}</loc>"]
+        for name in ('lastmod', 'priority', 'changefreq'):
+            if entry.get(name):
+                parts.append(f"<{name}>{escape(entry[name])}</{name}>")
+        lines.append(f"  <url>{''.join(parts)}</url>")
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+class SitemapGenerator:
+    def __init__(self, root, today=None):
+        self.root = root
+        self.sitemap_path = os.path.join(root, SITEMAP_FILE)
+        self.store = Manifest(root, 'sitemap')
+        self.today = today or datetime.date.today().isoformat()
+        self.changed_pages = []
+
+    def lastmod(self, file_path, data, previous):
+        """
+        The page's lastmod: today if its content hash differs from the stored
+        one, the stored date otherwise. A page seen for the first time keeps
+        whatever lastmod the sitemap already had for it (usually none).
+        """
+        key = self.store.key(file_path)
+        entry = self.store.entries.get(key)
+        if entry and self.store.is_fresh(file_path, STORE_VERSION):
+            return entry.get('lastmod')
+        digest = content_hash(data)
+        if entry is None or entry.get('ruleset') != STORE_VERSION:
+            lastmod = previous
+        elif entry['hash'] != digest:
+            lastmod = self.today
+            self.changed_pages.append(key)
+        else:
+            lastmod = entry.get('lastmod')
+        self.store.record(file_path, STORE_VERSION, dict(file_state(file_path, digest=digest), lastmod=lastmod))
+        return lastmod
+
+    def pages(self):
+        """[(rel path, file path, bytes)] for every page that belongs in the sitemap."""
+        found = []
+        for file_path in find_html_files(self.root):
+            rel_path = self.store.key(file_path)
+            if rel_path in EXCLUDED_PAGES:
+                continue
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            if NOINDEX_RE.search(data.decode('utf-8', errors='replace')):
+                continue
+            found.append((rel_path, file_path, data))
+        return found
+
+    def generate(self):
+        """
+        Build the new sitemap.
+        Returns: (xml, added urls, removed urls)
+        """
+        existing = read_sitemap(self.sitemap_path)
+        by_loc = {entry['loc']: entry for entry in existing}
+        pages = {page_url(rel_path): (file_path, data) for rel_path, file_path, data in self.pages()}
+
+        entries = []
+        for loc in [entry['loc'] for entry in existing if entry['loc'] in pages] + sorted(set(pages) - set(by_loc)):
+            old = by_loc.get(loc, {})
+            file_path, data = pages[loc]
+            entries.append({
+                'loc': loc,
+                'lastmod': self.lastmod(file_path, data, old.get('lastmod')),
+                'priority': old.get('priority') or DEFAULT_PRIORITY,
+                'changefreq': old.get('changefreq') or DEFAULT_CHANGEFREQ,
+            })
+        # Forget pages that are no longer listed
+        listed = {self.store.key(file_path) for file_path, _ in pages.values()}
+        for key in list(self.store.entries):
+            if key not in listed:
+                del self.store.entries[key]
+                self.store.dirty = True
+
+        added = sorted(set(pages) - set(by_loc))
+        removed = [entry['loc'] for entry in existing if entry['loc'] not in pages]
+        return render_sitemap(entries), added, removed
+
+    def current(self):
+        try:
+            with open(self.sitemap_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate sitemap.xml with lastmod from content hashes.')
+    parser.add_argument('--dir', type=str, default='.',
+                        help='Root directory of your website (default: current directory)')
+    parser.add_argument('--check', action='store_true',
+                        help='Only report; exit 1 if sitemap.xml is out of date')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"Error: Directory not found: {args.dir}")
+        return 1
+
+    generator = SitemapGenerator(args.dir)
+    xml, added, removed = generator.generate()
+    for loc in added:
+        print(f"  + {loc}")
+    for loc in removed:
+        print(f"  - {loc}")
+    for key in generator.changed_pages:
+        print(f"  ~ {key} changed, lastmod {generator.today}")
+
+    if xml == generator.current():
+        print(f"✓ {SITEMAP_FILE} is up to date")
+        if not args.check:
+            generator.store.save()
+        return 0
+    if args.check:
+        print(f"✗ {SITEMAP_FILE} is out of date (run: python sitemap_gen.py)")
+        return 1
+
+    tmp_path = f"{generator.sitemap_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(xml)
+    os.replace(tmp_path, generator.sitemap_path)
+    generator.store.save()
+    print(f"✓ Wrote {SITEMAP_FILE}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,27 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The scripts are flat modules in the repo root
+sys.path.insert(0, REPO_ROOT)
+
+from update_nav import find_html_files  # noqa: E402
+
+
+@pytest.fixture
+def site(tmp_path):
+    """A copy of the shipped pages (and robots.txt/sitemap.xml) in a temp dir. Returns its root."""
+    root = tmp_path / 'site'
+    for path in find_html_files(REPO_ROOT):
+        rel_path = os.path.relpath(path, REPO_ROOT)
+        if rel_path.split(os.sep)[0] in ('dist', 'tests'):
+            continue
+        target = root / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+    for name in ('robots.txt', 'sitemap.xml'):
+        shutil.copyfile(os.path.join(REPO_ROOT, name), root / name)
+    return root
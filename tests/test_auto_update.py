@@ -0,0 +1,65 @@
+import shutil
+from pathlib import Path
+
+import legacy_auto_update
+from auto_update import RULES, InsurioUpdater, update_file
+from update_nav import find_html_files
+
+
+def apply_registry(root):
+    """Apply RULES to every page under root, the way InsurioUpdater does. Returns {rel path: hits}."""
+    hits_by_page = {}
+    for path in find_html_files(root):
+        rel_path = Path(path).relative_to(root).as_posix()
+        rules = [rule for rule in RULES if rule.matches(rel_path)]
+        if not rules:
+            continue
+        hits, output, _, _ = update_file((path, rules, None, False))
+        hits_by_page[rel_path] = hits
+        if output is not None:
+            Path(path).write_bytes(output)
+    return hits_by_page
+
+
+def read_pages(root):
+    return {Path(path).relative_to(root).as_posix(): Path(path).read_bytes() for path in find_html_files(root)}
+
+
+def test_rules_match_the_old_per_page_methods(site, tmp_path):
+    legacy_root = tmp_path / 'legacy'
+    shutil.copytree(site, legacy_root)
+    original = read_pages(site)
+    legacy_auto_update.apply_all(legacy_root)
+    apply_registry(site)
+
+    expected = read_pages(legacy_root)
+    actual = read_pages(site)
+    assert actual.keys() == expected.keys()
+
+    # The old compare disclaimer regex expected three closing </div>s the page
+    # does not have, so it never matched; the selector rule inserts the
+    # disclaimer. Apart from that insertion the page must be identical.
+    disclaimer = next(rule for rule in RULES if rule.name == 'Added disclaimer after comparison table')
+    inserted = disclaimer.html.encode('utf-8')
+    assert actual['compare/index.html'].count(inserted) == 1
+    actual['compare/index.html'] = actual['compare/index.html'].replace(inserted, b'')
+
+    for rel_path in expected:
+        assert actual[rel_path] == expected[rel_path], rel_path
+    # The shipped pages do have copy to update, so the comparison is not vacuous
+    assert actual != original
+
+
+def test_rules_are_idempotent(site):
+    apply_registry(site)
+    before = read_pages(site)
+    hits = apply_registry(site)
+    assert read_pages(site) == before
+    assert not any(hits.values())
+
+
+def test_no_match_is_reported_on_every_run(site):
+    for _ in range(2):
+        updater = InsurioUpdater(site)
+        updater.apply_plan(updater.rules_by_file())
+        assert any('404.html' in error and 'Could not find patterns' in error for error in updater.errors)
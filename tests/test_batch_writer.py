@@ -0,0 +1,82 @@
+import os
+from unittest import mock
+
+import pytest
+
+from batch_writer import BatchWriteError, BatchWriter
+
+
+def fail_replacing(target):
+    """An os.replace that fails when a staged file is moved onto target."""
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if os.fspath(dst) == os.fspath(target) and os.fspath(src).endswith('.tmp'):
+            raise OSError('disk full')
+        return real_replace(src, dst)
+    return replace
+
+
+def test_commit_replaces_every_target(tmp_path):
+    a, b = tmp_path / 'a.html', tmp_path / 'b.html'
+    a.write_text('old a')
+    writer = BatchWriter()
+    writer.stage(a, b'new a')
+    writer.stage(b, b'new b')
+    assert a.read_text() == 'old a'
+    assert writer.commit() == [str(a), str(b)]
+    assert (a.read_text(), b.read_text()) == ('new a', 'new b')
+    assert sorted(os.listdir(tmp_path)) == ['a.html', 'b.html']
+
+
+def test_failed_commit_restores_and_removes_created_files(tmp_path):
+    created, existing, last = tmp_path / 'a_new.html', tmp_path / 'b.html', tmp_path / 'c.html'
+    existing.write_text('old b')
+    last.write_text('old c')
+    writer = BatchWriter()
+    for path in (created, existing, last):
+        writer.stage(path, b'new')
+
+    with mock.patch('os.replace', side_effect=fail_replacing(last)):
+        with pytest.raises(BatchWriteError) as error:
+            writer.commit()
+
+    assert error.value.path == str(last)
+    assert existing.read_text() == 'old b'
+    assert last.read_text() == 'old c'
+    assert not created.exists()
+    assert sorted(os.listdir(tmp_path)) == ['b.html', 'c.html']
+
+
+def test_backups_are_copied_without_hard_links(tmp_path):
+    a, b = tmp_path / 'a.html', tmp_path / 'b.html'
+    a.write_text('old a')
+    b.write_text('old b')
+    writer = BatchWriter()
+    writer.stage(a, b'new a')
+    writer.stage(b, b'new b')
+
+    with mock.patch('os.link', side_effect=PermissionError('no hard links')), \
+            mock.patch('os.replace', side_effect=fail_replacing(b)):
+        with pytest.raises(BatchWriteError):
+            writer.commit()
+    assert (a.read_text(), b.read_text()) == ('old a', 'old b')
+    assert sorted(os.listdir(tmp_path)) == ['a.html', 'b.html']
+
+    writer.stage(a, b'new a')
+    with mock.patch('os.link', side_effect=PermissionError('no hard links')):
+        writer.commit()
+    assert a.read_text() == 'new a'
+    assert sorted(os.listdir(tmp_path)) == ['a.html', 'b.html']
+
+
+def test_failed_stage_drops_the_whole_batch(tmp_path):
+    a = tmp_path / 'a.html'
+    a.write_text('old a')
+    writer = BatchWriter()
+    writer.stage(a, b'new a')
+    with pytest.raises(BatchWriteError):
+        writer.stage(tmp_path / 'missing-dir' / 'b.html', b'new b')
+    assert len(writer) == 0
+    assert a.read_text() == 'old a'
+    assert os.listdir(tmp_path) == ['a.html']
@@ -0,0 +1,67 @@
+import pytest
+
+from html_index import HtmlIndex, apply_splices, splice
+
+PAGE = """<!DOCTYPE html>
+<html><head><style>p > a { color: red }</style></head>
+<body>
+  <nav class="main-nav"><ul class="nav-links"><li><a href="/">Home</a></li></ul></nav>
+  <!-- Stats -->
+  <section id="stats" class="stats dark"><p>One <b>two</b></p><img src="a.png" alt=""></section>
+  <script>if (a < b) { document.write('<div class="fake">') }</script>
+  <div class="container"><table class="comparison-table"></table></div>
+  <div class="container"><p>other</p></div>
+</body></html>
+"""
+
+
+@pytest.fixture
+def index():
+    return HtmlIndex(PAGE)
+
+
+def test_selectors(index):
+    assert index.select_one('ul.nav-links').attrs['class'] == 'nav-links'
+    assert index.select_one('#stats').tag == 'section'
+    assert index.select_one('section.stats.dark') is index.select_one('#stats')
+    assert index.select_one('img[alt]').attrs['src'] == 'a.png'
+    assert index.select_one('img[src="a.png"]') is not None
+    assert [node.tag for node in index.select('nav a')] == ['a']
+    assert len(index.select('div.container')) == 2
+    assert len(index.select('div.container:has(table.comparison-table)')) == 1
+    assert index.select_one('section.missing') is None
+
+
+def test_script_and_style_bodies_are_not_markup(index):
+    assert index.select('div.fake') == []
+    assert index.select('a') == index.select('nav a')
+
+
+def test_inner_outer_and_attribute_spans(index):
+    section = index.select_one('#stats')
+    assert section.inner(PAGE).startswith('<p>One')
+    assert section.outer(PAGE).endswith('</section>')
+    start, end = section.attr_span('class', PAGE)
+    assert PAGE[start:end] == 'stats dark'
+    assert [c.text for c in index.comments] == ['Stats']
+
+
+def test_splices_apply_in_one_pass(index):
+    section = index.select_one('#stats')
+    nav = index.select_one('ul.nav-links')
+    edits = [
+        splice(section, 'after', '\n  <hr>'),
+        splice(nav, 'append', '<li><a href="/enterprise/">Enterprise</a></li>'),
+        splice(section, 'before', '<h2>Stats</h2>\n  '),
+    ]
+    html = apply_splices(PAGE, edits)
+    new_index = HtmlIndex(html)
+    assert [a.attrs['href'] for a in new_index.select('ul.nav-links a')] == ['/', '/enterprise/']
+    assert '<h2>Stats</h2>\n  <section id="stats"' in html
+    assert '</section>\n  <hr>' in html
+
+
+def test_overlapping_splices_are_rejected(index):
+    section = index.select_one('#stats')
+    with pytest.raises(ValueError):
+        apply_splices(PAGE, [splice(section, 'replace', ''), splice(section, 'inner', 'x')])
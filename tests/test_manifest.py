@@ -0,0 +1,65 @@
+import os
+
+from manifest import Manifest, content_hash, file_state, ruleset_version
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_recorded_file_is_fresh_until_it_changes(tmp_path):
+    page = write(tmp_path / 'index.html', '<p>one</p>')
+    manifest = Manifest(tmp_path, 'test')
+    assert not manifest.is_fresh(page, 'v1')
+
+    manifest.record(page, 'v1', file_state(page, (tmp_path / 'index.html').read_bytes()))
+    assert manifest.is_fresh(page, 'v1')
+
+    write(tmp_path / 'index.html', '<p>two, longer</p>')
+    assert not manifest.is_fresh(page, 'v1')
+
+
+def test_touched_file_keeps_its_hash(tmp_path):
+    page = write(tmp_path / 'index.html', '<p>one</p>')
+    data = (tmp_path / 'index.html').read_bytes()
+    manifest = Manifest(tmp_path, 'test')
+    manifest.record(page, 'v1', file_state(page, data))
+
+    st = os.stat(page)
+    os.utime(page, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert not manifest.is_fresh(page, 'v1')
+    assert manifest.known_hash(page, 'v1') == content_hash(data)
+
+
+def test_new_version_invalidates_entries(tmp_path):
+    page = write(tmp_path / 'index.html', '<p>one</p>')
+    manifest = Manifest(tmp_path, 'test')
+    manifest.record(page, 'v1', file_state(page, (tmp_path / 'index.html').read_bytes()))
+    assert not manifest.is_fresh(page, 'v2')
+    assert manifest.known_hash(page, 'v2') is None
+
+
+def test_save_and_reload(tmp_path):
+    (tmp_path / 'compare').mkdir()
+    page = write(tmp_path / 'compare' / 'index.html', 'x')
+    manifest = Manifest(tmp_path, 'test')
+    manifest.record(page, 'v1', file_state(page, b'x'))
+    manifest.save()
+
+    reloaded = Manifest(tmp_path, 'test')
+    assert list(reloaded.entries) == ['compare/index.html']
+    assert reloaded.is_fresh(page, 'v1')
+
+
+def test_unreadable_manifest_is_empty(tmp_path):
+    manifest = Manifest(tmp_path, 'test')
+    manifest.path.parent.mkdir(parents=True)
+    manifest.path.write_text('{not json', encoding='utf-8')
+    assert Manifest(tmp_path, 'test').entries == {}
+
+
+def test_ruleset_version_is_stable_and_sensitive():
+    assert ruleset_version('nav', 1, ['a', 'b']) == ruleset_version('nav', 1, ['a', 'b'])
+    assert ruleset_version('nav', 1, ['a', 'b']) != ruleset_version('nav', 2, ['a', 'b'])
+    assert ruleset_version({'b': 1, 'a': 2}) == ruleset_version({'a': 2, 'b': 1})
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from serve import MAX_HEADERS, RequestError, StaticServer, read_request
+
+
+def parse(data):
+    """read_request() over raw bytes. Returns: (result or RequestError status, bytes left unread)"""
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        try:
+            result = await read_request(reader)
+        except RequestError as e:
+            result = e.status
+        return result, await reader.read()
+    return asyncio.run(run())
+
+
+def test_simple_request():
+    (method, target, version, headers), rest = parse(b'GET /compare/ HTTP/1.1\r\nHost: x\r\nAccept-Encoding: br\r\n\r\n')
+    assert (method, target, version) == ('GET', '/compare/', 'HTTP/1.1')
+    assert headers == {'host': 'x', 'accept-encoding': 'br'}
+    assert rest == b''
+
+
+def test_body_is_consumed_so_it_is_not_read_as_the_next_request():
+    smuggled = b'GET /robots.txt HTTP/1.1\r\nHost: x\r\n\r\n'
+    request = b'POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(smuggled) + smuggled
+    (method, _, _, _), rest = parse(request + b'GET / HTTP/1.1\r\n\r\n')
+    assert method == 'POST'
+    assert rest == b'GET / HTTP/1.1\r\n\r\n'
+
+
+@pytest.mark.parametrize('data, status', [
+    (b'POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n0\r\n\r\n', 411),
+    (b'POST / HTTP/1.1\r\nContent-Length: 10000000\r\n\r\n', 413),
+    (b'POST / HTTP/1.1\r\nContent-Length: nope\r\n\r\n', 400),
+    (b'GET /\r\n\r\n', 400),
+    (b'GET / HTTP/1.1\r\n' + b''.join(b'X-%d: y\r\n' % i for i in range(MAX_HEADERS + 1)) + b'\r\n', 431),
+    (b'GET / HTTP/1.1\r\nX: ' + b'a' * 70000 + b'\r\n\r\n', 431),
+])
+def test_requests_the_connection_cannot_continue_after(data, status):
+    result, _ = parse(data)
+    assert result == status
+
+
+def test_closed_connection():
+    assert parse(b'')[0] is None
+
+
+@pytest.fixture
+def server(site):
+    (site / '.insurio-cache').mkdir()
+    (site / '.insurio-cache' / 'build.json').write_text('{}')
+    (site / 'partials').mkdir()
+    (site / 'partials' / 'footer.html').write_text('<footer></footer>')
+    return StaticServer(site)
+
+
+@pytest.mark.parametrize('path', ['/.insurio-cache/build.json', '/%2einsurio-cache/build.json',
+                                  '/partials/footer.html', '/nope/'])
+def test_private_and_missing_paths_are_404(server, path):
+    status, _, body = asyncio.run(server.respond('GET', path, {}))
+    assert status == 404
+
+
+def test_directory_redirect_keeps_the_query(server):
+    status, headers, _ = asyncio.run(server.respond('GET', '/compare?x=1', {}))
+    assert status == 301
+    assert dict(headers)['Location'] == '/compare/?x=1'
+
+
+def test_etag_revalidation(server):
+    status, headers, body = asyncio.run(server.respond('GET', '/robots.txt', {}))
+    assert status == 200 and body
+    etag = dict(headers)['ETag']
+    status, _, body = asyncio.run(server.respond('GET', '/robots.txt', {'if-none-match': etag}))
+    assert (status, body) == (304, b'')
@@ -6,12 +6,21 @@ Run this from your website's root directory (insurio-repo2).
 Usage:
     python update_nav.py           # Dry run (preview changes)
     python update_nav.py --apply   # Apply changes
+    python update_nav.py --apply --jobs 8   # Apply changes using 8 processes
 """
 
 import os
-import re
+import sys
+import time
 import argparse
 
+from batch_writer import BatchWriteError, BatchWriter
+from html_index import HtmlIndex, apply_splices, splice
+from manifest import Manifest, content_hash, file_state, ruleset_version
+from parallel import map_files, resolve_jobs
+from run_report import RunReport, new_file_stats, rule_stats
+from watch import Watcher
+
 
 # New desktop navigation HTML
 NEW_NAV_LINKS = '''<ul class="nav-links">
@@ -35,42 +44,108 @@ NEW_MOBILE_NAV = '''<nav class="mobile-nav">
         </nav>'''
 
 
-def update_html_file(file_path, dry_run=True):
+# (selector, replacement, label) -- elements are located with html_index, not regex
+NAV_RULES = [
+    ('ul.nav-links', NEW_NAV_LINKS, "desktop nav"),
+    ('nav.mobile-nav', NEW_MOBILE_NAV, "mobile nav"),
+]
+
+# Any change to the nav markup or selectors invalidates every manifest entry
+RULESET_VERSION = ruleset_version(NAV_RULES)
+
+
+def process_file(task):
     """
     Update navigation in a single HTML file.
-    Returns: (was_modified, message)
+    task is (file_path, dry_run, known_hash, profile); known_hash is the
+    manifest hash of the file, if any.
+    Returns: (was_modified, message, state, stats, output) where state is the
+    file's manifest entry if it is left as is, message is None if the content
+    matched known_hash and was skipped, stats is a run_report file stats dict
+    if profile is set, and output is the new content to write (not dry_run).
+    Nothing is written here; the caller commits outputs as one batch.
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    file_path, dry_run, known_hash, profile = task
+    stats = new_file_stats() if profile else None
+    
+    start = time.perf_counter()
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if stats:
+        stats['read_s'] = time.perf_counter() - start
+        stats['bytes_read'] = len(data)
+    
+    if known_hash is not None and content_hash(data) == known_hash:
+        return False, None, file_state(file_path, data), stats, None
     
+    start = time.perf_counter()
+    content = data.decode('utf-8')
     original_content = content
     changes = []
     
     # Check if already updated (has /enterprise/ link)
     if '/enterprise/' in content and '/integrate/' in content:
-        return False, f"✓ Already updated: {file_path}"
+        if stats:
+            for _, _, label in NAV_RULES:
+                rule = rule_stats(stats, label)
+                rule['attempts'] += 1
+                rule['guarded'] += 1
+        return False, f"✓ Already updated: {file_path}", file_state(file_path, data), stats, None
     
-    # Update desktop nav (nav-links)
-    nav_pattern = r'<ul class="nav-links">.*?</ul>'
-    if re.search(nav_pattern, content, re.DOTALL):
-        content = re.sub(nav_pattern, NEW_NAV_LINKS, content, flags=re.DOTALL)
-        changes.append("desktop nav")
+    # Tokenize once, then replace the desktop and mobile navs by offset
+    index = HtmlIndex(content)
+    if stats:
+        stats['tokenize_s'] = time.perf_counter() - start
+    splices = []
+    for selector, replacement, label in NAV_RULES:
+        searched = time.perf_counter()
+        nodes = index.select(selector)
+        if nodes:
+            splices.extend(splice(node, 'replace', replacement) for node in nodes)
+            changes.append(label)
+        if stats:
+            rule = rule_stats(stats, label)
+            rule['attempts'] += 1
+            rule['hits'] += 1 if nodes else 0
+            rule['substitutions'] += len(nodes)
+            rule['search_s'] += time.perf_counter() - searched
+    spliced = time.perf_counter()
+    content = apply_splices(content, splices)
     
-    # Update mobile nav
-    mobile_pattern = r'<nav class="mobile-nav">.*?</nav>'
-    if re.search(mobile_pattern, content, re.DOTALL):
-        content = re.sub(mobile_pattern, NEW_MOBILE_NAV, content, flags=re.DOTALL)
-        changes.append("mobile nav")
+    if stats:
+        done = time.perf_counter()
+        stats['transform_s'] = done - start
+        # Splicing is one pass shared by both rules; attribute it evenly
+        for label in changes:
+            rule_stats(stats, label)['substitute_s'] += (done - spliced) / len(changes)
     
     if content == original_content:
-        return False, f"⚠ No nav found: {file_path}"
+        return False, f"⚠ No nav found: {file_path}", file_state(file_path, data), stats, None
     
     if dry_run:
-        return True, f"→ Would update {', '.join(changes)}: {file_path}"
+        return True, f"→ Would update {', '.join(changes)}: {file_path}", None, stats, None
     else:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return True, f"✓ Updated {', '.join(changes)}: {file_path}"
+        output = content.encode('utf-8')
+        if stats:
+            stats['bytes_written'] = len(output)
+        return True, f"✓ Updated {', '.join(changes)}: {file_path}", None, stats, output
+
+
+def update_html_file(file_path, dry_run=True):
+    """
+    Update navigation in a single HTML file.
+    Returns: (was_modified, message)
+    """
+    was_modified, message, _, _, output = process_file((file_path, dry_run, None, False))
+    if output is not None:
+        writer = BatchWriter()
+        writer.stage(file_path, output)
+        writer.commit()
+    return was_modified, message
+
+
+# Directories that never contain pages to process
+SKIP_DIRS = ['.git', 'node_modules', '__pycache__', '.venv', 'venv', 'js', 'images', 'partials', 'dist']
 
 
 def find_html_files(root_dir):
@@ -78,7 +153,7 @@ def find_html_files(root_dir):
     html_files = []
     for root, dirs, files in os.walk(root_dir):
         # Skip directories that shouldn't be processed
-        dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__', '.venv', 'venv', 'js', 'images']]
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
         
         for file in files:
             if file.endswith(('.html', '.htm')):
@@ -87,6 +162,115 @@ def find_html_files(root_dir):
     return sorted(html_files)
 
 
+def update_files(root_dir, html_files, dry_run, jobs, manifest, report, profile=False, force=False):
+    """
+    Update the nav in html_files, skipping files the manifest says are unchanged
+    (unless force). A dry run never writes the manifest.
+    Returns: dict of counts (updated, already, no_nav, unchanged, failed)
+    """
+    counts = dict.fromkeys(['updated', 'already', 'no_nav', 'unchanged', 'failed'], 0)
+    
+    # Files untouched since the current nav was last applied cost one stat
+    tasks = []
+    with report.phase('check'):
+        for file_path in html_files:
+            if not force and manifest.is_fresh(file_path, RULESET_VERSION):
+                counts['unchanged'] += 1
+                report.add_file(os.path.relpath(file_path, root_dir), 'skipped')
+            else:
+                known_hash = None if force else manifest.known_hash(file_path, RULESET_VERSION)
+                tasks.append((file_path, dry_run, known_hash, profile))
+    
+    # Updated pages are staged next to their targets and committed together
+    writer = BatchWriter()
+    pending = []  # (file_path, rel_path, digest, stats)
+    aborted = None
+    
+    with report.phase('process'):
+        for (file_path, _, _, _), result, error in map_files(process_file, tasks, jobs):
+            rel_path = os.path.relpath(file_path, root_dir)
+            if error:
+                print(f"✗ Failed: {file_path}: {error}")
+                counts['failed'] += 1
+                report.add_file(rel_path, 'failed', error=error)
+                continue
+            
+            was_modified, message, state, stats, output = result
+            if state is not None and not dry_run:
+                manifest.record(file_path, RULESET_VERSION, state)
+            if message is None:
+                counts['unchanged'] += 1
+                report.add_file(rel_path, 'unchanged', stats)
+                continue
+            print(message)
+            
+            if output is not None:
+                if not aborted:
+                    start = time.perf_counter()
+                    try:
+                        writer.stage(file_path, output)
+                    except BatchWriteError as e:
+                        aborted = e
+                    if stats:
+                        stats['write_s'] = time.perf_counter() - start
+                pending.append((file_path, rel_path, content_hash(output), stats))
+            elif was_modified:
+                counts['updated'] += 1
+                report.add_file(rel_path, 'changed', stats)
+            elif message.startswith('✓'):
+                counts['already'] += 1
+                report.add_file(rel_path, 'already-updated', stats)
+            else:
+                counts['no_nav'] += 1
+                report.add_file(rel_path, 'no-match', stats)
+    
+    with report.phase('commit'):
+        if pending and not aborted:
+            try:
+                writer.commit()
+            except BatchWriteError as e:
+                aborted = e
+    
+    for file_path, rel_path, digest, stats in pending:
+        if aborted:
+            counts['failed'] += 1
+            report.add_file(rel_path, 'failed', stats, error=str(aborted))
+        else:
+            counts['updated'] += 1
+            manifest.record(file_path, RULESET_VERSION, file_state(file_path, digest=digest))
+            report.add_file(rel_path, 'changed', stats)
+    if aborted:
+        print(f"\n✗ Write failed, no files were changed (all {len(pending)} updates rolled back): {aborted}")
+    
+    if not dry_run:
+        with report.phase('save'):
+            manifest.save()
+    
+    return counts
+
+
+def watch(root_dir, dry_run, jobs, manifest, poll=False):
+    """Re-apply the nav to pages as they change. The manifest stays loaded between events."""
+    watcher = Watcher(root_dir, SKIP_DIRS, use_polling=poll)
+    print(f"\n👀 Watching {root_dir} for changes ({watcher.mode}). Press Ctrl+C to stop.")
+    try:
+        for changed in watcher.batches():
+            html_files = sorted(path for path in changed if os.path.isfile(path))
+            if not html_files:
+                continue
+            report = RunReport('update_nav', root_dir)
+            counts = update_files(root_dir, html_files, dry_run, jobs, manifest, report)
+            if counts['unchanged'] == len(html_files):
+                continue  # our own writes coming back, or a save without changes
+            print(f"[{time.strftime('%H:%M:%S')}] {len(html_files)} changed: "
+                  f"{counts['updated']} {'would update' if dry_run else 'updated'}, "
+                  f"{counts['already']} already up to date, "
+                  f"{counts['no_nav']} without nav, {counts['failed']} failed")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Update navigation menus in all HTML files.',
@@ -95,12 +279,26 @@ def main():
 Examples:
     python update_nav.py                    # Preview changes
     python update_nav.py --apply            # Apply changes
+    python update_nav.py --apply --jobs 0   # Apply changes, one process per CPU
+    python update_nav.py --apply --watch    # Apply, then keep applying to pages as they are saved
         """
     )
     parser.add_argument('--apply', action='store_true', 
                         help='Actually modify files (default is dry run)')
     parser.add_argument('--dir', type=str, default='.', 
                         help='Root directory of your website (default: current directory)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of worker processes (0 = one per CPU, default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='Ignore the incremental manifest and re-scan every file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print per-rule and per-phase timings')
+    parser.add_argument('--report', metavar='FILE',
+                        help='Write a JSON run report (per rule and file stats) to FILE')
+    parser.add_argument('--watch', action='store_true',
+                        help='After the first run, watch the site and re-apply to changed pages')
+    parser.add_argument('--poll', action='store_true',
+                        help='With --watch, poll the tree instead of using inotify')
     
     args = parser.parse_args()
     
@@ -111,50 +309,56 @@ Examples:
         print(f"Error: Directory not found: {root_dir}")
         return 1
     
-    print(f"{'DRY RUN - ' if dry_run else ''}Scanning: {root_dir}\n")
+    print(f"{'DRY RUN - ' if dry_run else ''}Scanning: {root_dir} (jobs: {resolve_jobs(args.jobs)})\n")
     print("Adding new nav links:")
     print("  • /enterprise/ (For Platforms)")
     print("  • /integrate/ (Integration & API)\n")
     
-    html_files = find_html_files(root_dir)
+    profile = args.profile or bool(args.report)
+    report = RunReport('update_nav', root_dir, jobs=resolve_jobs(args.jobs), dry_run=dry_run)
+    
+    with report.phase('discovery'):
+        html_files = find_html_files(root_dir)
     
-    if not html_files:
+    if not html_files and not args.watch:
         print("No HTML files found.")
         return 0
     
-    updated_count = 0
-    skipped_count = 0
-    error_count = 0
-    
-    for file_path in html_files:
-        was_modified, message = update_html_file(file_path, dry_run)
-        print(message)
-        
-        if was_modified:
-            updated_count += 1
-        elif message.startswith('✓'):
-            skipped_count += 1
-        else:
-            error_count += 1
+    manifest = Manifest(root_dir, 'update_nav')
+    counts = update_files(root_dir, html_files, dry_run, args.jobs, manifest, report, profile, force=args.force)
     
     print(f"\n{'=' * 50}")
     print(f"Summary:")
     print(f"  Total HTML files: {len(html_files)}")
-    print(f"  {'Would update' if dry_run else 'Updated'}: {updated_count}")
-    print(f"  Already updated: {skipped_count}")
-    print(f"  No nav found: {error_count}")
+    print(f"  {'Would update' if dry_run else 'Updated'}: {counts['updated']}")
+    print(f"  Already updated: {counts['already']}")
+    print(f"  No nav found: {counts['no_nav']}")
+    print(f"  Unchanged since last run: {counts['unchanged']}")
+    if counts['failed']:
+        print(f"  Failed: {counts['failed']}")
     
-    if dry_run and updated_count > 0:
+    if dry_run and counts['updated'] > 0:
         print(f"\nTo apply these changes, run:")
         print(f"  python update_nav.py --apply")
-    elif not dry_run and updated_count > 0:
+    elif not dry_run and counts['updated'] > 0 and not counts['failed']:
         print(f"\n✓ Navigation updated in all files!")
     
-    return 0
+    if args.profile:
+        report.print_profile()
+    if args.report:
+        report.write(args.report)
+        print(f"\nRun report written to {args.report}")
+    
+    if args.watch:
+        return watch(root_dir, dry_run, args.jobs, manifest, poll=args.poll)
+    
+    return 1 if counts['failed'] else 0
 
 
 if __name__ == '__main__':
     result = main()
-    print("\n")
-    input("Press Enter to close...")
+    # Keep the window open when launched by double-click, but never block a terminal session
+    if '--watch' not in sys.argv and sys.stdin.isatty():
+        print("\n")
+        input("Press Enter to close...")
     exit(result)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Watch a site tree for changed HTML files.
+
+Used by the --watch mode of update_nav.py and auto_update.py. On Linux the
+tree is watched with inotify (through ctypes, no extra packages); elsewhere,
+or if inotify is unavailable, the tree is polled. Bursts of events (an editor
+saving several files, a git checkout) are debounced into one batch.
+
+Usage:
+    for changed in Watcher(root, skip_dirs).batches():
+        ...  # set of absolute paths that were written, created or deleted
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Watcher:
+    def __init__(self, root, skip_dirs=(), suffixes=('.html', '.htm'),
+                 debounce=0.3, poll_interval=1.0, use_polling=False):
+        self.root = os.path.abspath(root)
+        self.skip_dirs = set(skip_dirs)
+        self.suffixes = tuple(suffixes)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = None if use_polling else _Inotify.create()
+        self.mode = 'inotify' if self.backend else 'polling'
+
+    def wanted(self, path):
+        return path.endswith(self.suffixes)
+
+    def _walk_dirs(self, top):
+        for dirpath, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in self.skip_dirs]
+            yield dirpath
+
+    def batches(self):
+        """Yield sets of changed file paths, one set per debounced burst. Runs until interrupted."""
+        if self.backend:
+            yield from self._inotify_batches()
+        else:
+            yield from self._poll_batches()
+
+    def _inotify_batches(self):
+        backend = self.backend
+        for directory in self._walk_dirs(self.root):
+            backend.add_watch(directory)
+
+        while True:
+            changed = set()
+            timeout = None  # block until the first event of a burst
+            while True:
+                events = backend.read(timeout)
+                if not events:
+                    if changed:
+                        break
+                    timeout = None
+                    continue
+                for path, mask in events:
+                    if mask & IN_Q_OVERFLOW:
+                        # Kernel queue overflowed: fall back to a full rescan of the tree
+                        changed.update(self._scan())
+                    elif mask & IN_ISDIR:
+                        if mask & (IN_CREATE | IN_MOVED_TO) and os.path.basename(path) not in self.skip_dirs:
+                            for directory in self._walk_dirs(path):
+                                backend.add_watch(directory)
+                            changed.update(self._scan(path))
+                    elif self.wanted(path):
+                        changed.add(path)
+                if changed:
+                    timeout = self.debounce
+            yield changed
+
+    def _scan(self, top=None):
+        """{path: (mtime_ns, size)} for every wanted file under top."""
+        snapshot = {}
+        for dirpath in self._walk_dirs(top or self.root):
+            try:
+                names = os.listdir(dirpath)
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith(self.suffixes):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def _poll_batches(self):
+        previous = self._scan()
+        while True:
+            changed = set()
+            while True:
+                time.sleep(self.debounce if changed else self.poll_interval)
+                current = self._scan()
+                diff = {path for path in previous.keys() | current.keys()
+                        if previous.get(path) != current.get(path)}
+                previous = current
+                if not diff:
+                    if changed:
+                        break
+                    continue
+                changed |= diff
+            yield changed
+
+
+class _Inotify:
+    """Minimal inotify binding over ctypes."""
+
+    def __init__(self, libc, fd):
+        self.libc = libc
+        self.fd = fd
+        self.paths = {}  # watch descriptor -> directory
+
+    @classmethod
+    def create(cls):
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.paths[wd] = directory
+        elif ctypes.get_errno() == errno.ENOSPC:
+            print(f"⚠ inotify watch limit reached; not watching {directory} "
+                  f"(raise fs.inotify.max_user_watches or use --poll)")
+
+    def read(self, timeout):
+        """Events as [(path, mask)], waiting up to timeout seconds (None = forever)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            directory = self.paths.get(wd)
+            if directory is None and not mask & IN_Q_OVERFLOW:
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if directory and name else directory
+            events.append((path, mask))
+        return events